@@ -3,14 +3,13 @@
 
 """
 增强版文章处理模块
-集成句子分割、token分割、难度评估和词汇解释功能
+在主项目的处理流水线上配置难度评估和词汇解释阶段
 """
 
 import json
 import os
 from typing import Dict, Any, List, Optional
-from .sentence_processor import split_sentences
-from .token_processor import split_tokens, create_token_with_id
+from .token_processor import create_token_with_id
 
 class EnhancedArticleProcessor:
     """增强版文章处理器"""
@@ -29,6 +28,8 @@ class EnhancedArticleProcessor:
         self.difficulty_estimator = None
         # 初始化lemma处理器（可选）
         self.lemma_processor = None
+        # token规范化函数（lemma和词汇key都由规范化后的形式得到）
+        self.canonicalize = None
         # 词汇转换/存储（可选，若主项目提供）
         self.vocab_converter = None
         self.vocab_counter = 1
@@ -52,6 +53,9 @@ class EnhancedArticleProcessor:
         self.enable_difficulty_estimation = enable_difficulty
         self.enable_vocab_explanation = enable_vocab
         
+        if enable_difficulty or enable_vocab:
+            self._init_canonicalizer()
+        
         if enable_difficulty:
             self._init_difficulty_estimator()
             self._init_lemma_processor()  # lemma功能通常与难度评估一起使用
@@ -70,13 +74,21 @@ class EnhancedArticleProcessor:
             print(f"❌ 无法导入难度评估器: {e}")
             self.enable_difficulty_estimation = False
     
+    def _init_canonicalizer(self):
+        """初始化token规范化函数（缺少时无法得到一致的lemma和词汇key，不启用高级功能）"""
+        try:
+            from src.utils.canonical import canonicalize_token  # type: ignore
+            self.canonicalize = canonicalize_token
+        except ImportError as e:
+            print(f"❌ 无法导入token规范化函数: {e}")
+            self.enable_difficulty_estimation = False
+            self.enable_vocab_explanation = False
+    
     def _init_lemma_processor(self):
         """初始化lemma处理器"""
         try:
-            # 这里需要根据你的主项目结构调整导入路径
-            # from src.utils.get_lemma import get_lemma
-            # self.lemma_processor = get_lemma
-            print("⚠️  Lemma处理器需要根据主项目结构调整导入路径")
+            from src.utils.lemma_service import LemmaService  # type: ignore
+            self.lemma_processor = LemmaService.instance().lemmatize
         except ImportError as e:
             print(f"❌ 无法导入lemma处理器: {e}")
             self.lemma_processor = None
@@ -154,9 +166,9 @@ class EnhancedArticleProcessor:
             return None
     
     def _get_vocab_key(self, token_body: str, lemma: Optional[str]) -> str:
-        """得到用于归并的词汇key（lemma优先，均小写）"""
+        """得到用于归并的词汇key（lemma优先，lemma由规范化后的token得到，两者形式一致）"""
         base = lemma if lemma and lemma.strip() else token_body
-        return (base or "").lower()
+        return self.canonicalize(base or "")
     
     def _call_vocab_explanation(self, sentence_body: str, vocab_body: str) -> Optional[str]:
         """调用词汇解释Agent，失败则返回None"""
@@ -277,62 +289,30 @@ class EnhancedArticleProcessor:
         self.vocab_expressions = []
         self.lemma_to_vocab_id = {}
         
-        # 步骤1: 分割句子
-        print("\n步骤1: 分割句子...")
-        sentences_text = split_sentences(raw_text)
-        print(f"分割得到 {len(sentences_text)} 个句子")
-        
-        # 步骤2: 为每个句子分割tokens并创建结构化数据
-        print("\n步骤2: 分割tokens并创建结构化数据...")
-        sentences = []
-        global_token_id = 0
+        # 分句 -> 分词 -> 难度和lemma -> 词汇解释；未启用的阶段不会运行
+        from src.core.pipeline import Pipeline, PipelineContext, Stage, SplitStage, TokenizeStage, CollectSink  # type: ignore
+        pipeline = Pipeline([
+            SplitStage(),
+            TokenizeStage(),
+            Stage("difficulty", self._assess_sentences, enabled=self.enable_difficulty_estimation),
+            Stage("vocab", self._link_vocab,
+                  enabled=self.enable_difficulty_estimation and self.enable_vocab_explanation),
+            CollectSink(),
+        ])
+        pipeline.add_hook("tokenize", after=self._print_progress)
         
-        for sentence_id, sentence_text in enumerate(sentences_text, 1):
-            print(f"  处理句子 {sentence_id}/{len(sentences_text)}: {sentence_text[:50]}...")
-            
-            # 分割tokens
-            token_dicts = split_tokens(sentence_text)
-            
-            # 为每个token添加ID和高级信息
-            tokens_with_id = []
-            for token_id, token_dict in enumerate(token_dicts, 1):
-                # 基础token信息
-                token_with_id = create_token_with_id(token_dict, global_token_id, token_id)
-                
-                # 添加高级信息
-                if self.enable_difficulty_estimation and token_dict["token_type"] == "text":
-                    # 评估难度
-                    difficulty_level = self.assess_token_difficulty(token_dict["token_body"], sentence_text)
-                    token_with_id["difficulty_level"] = difficulty_level
-                    
-                    # 获取lemma
-                    lemma = self.get_token_lemma(token_dict["token_body"])
-                    token_with_id["lemma"] = lemma
-                    
-                    # 生成/追加词汇解释（如果是hard难度）
-                    if self.enable_vocab_explanation and difficulty_level == "hard":
-                        vocab = self.generate_vocab_for_token(
-                            token_with_id, sentence_text, text_id, sentence_id
-                        )
-                        if vocab:
-                            token_with_id["linked_vocab_id"] = vocab.get("vocab_id")
-                
-                # 添加其他字段
-                token_with_id["pos_tag"] = token_with_id.get("pos_tag")
-                token_with_id["is_grammar_marker"] = token_with_id.get("is_grammar_marker", False)
-                
-                tokens_with_id.append(token_with_id)
-                global_token_id += 1
-            
-            # 创建句子数据
-            sentence_data = {
-                "sentence_id": sentence_id,
-                "sentence_body": sentence_text,
-                "tokens": tokens_with_id,
-                "token_count": len(tokens_with_id)
+        print("\n分割句子和tokens并创建结构化数据...")
+        context = pipeline.run(PipelineContext(text_id, text_title, text=raw_text))
+        sentences = [
+            {
+                "sentence_id": sentence.sentence_id,
+                "sentence_body": sentence.sentence_body,
+                "tokens": [self._token_to_dict(token) for token in sentence.tokens],
+                "token_count": len(sentence.tokens)
             }
-            
-            sentences.append(sentence_data)
+            for sentence in context.sentences
+        ]
+        global_token_id = context.token_count
         
         # 步骤3: 创建最终结果
         print("\n步骤3: 创建结构化数据对象...")
@@ -352,6 +332,49 @@ class EnhancedArticleProcessor:
         
         return result
     
+    def _print_progress(self, sentences: List[Any], context: Any):
+        """分词阶段的钩子：输出每个句子的处理进度"""
+        for sentence in sentences:
+            print(f"  处理句子 {sentence.sentence_id}: {sentence.sentence_body[:50]}...")
+    
+    def _assess_sentences(self, sentences: List[Any], context: Any):
+        """难度阶段：评估text类型token的难度并获取规范化形式的lemma"""
+        for sentence in sentences:
+            for token in sentence.tokens:
+                if token.token_type == "text":
+                    token.difficulty_level = self.assess_token_difficulty(token.token_body, sentence.sentence_body)
+                    # 先规范化再取lemma（"John's" -> "john"），与词汇key使用同一形式
+                    token.lemma = self.get_token_lemma(self.canonicalize(token.token_body))
+    
+    def _link_vocab(self, sentences: List[Any], context: Any):
+        """词汇解释阶段：为hard难度的token生成/追加词汇解释"""
+        for sentence in sentences:
+            for token in sentence.tokens:
+                if token.token_type == "text" and token.difficulty_level == "hard":
+                    vocab = self.generate_vocab_for_token(
+                        {"token_body": token.token_body, "token_type": token.token_type,
+                         "difficulty_level": token.difficulty_level, "lemma": token.lemma,
+                         "sentence_token_id": token.sentence_token_id},
+                        sentence.sentence_body, context.text_id, sentence.sentence_id
+                    )
+                    if vocab:
+                        token.linked_vocab_id = vocab.get("vocab_id")
+    
+    def _token_to_dict(self, token: Any) -> Dict[str, Any]:
+        """把Token对象转换为输出的token字典（只包含已启用阶段填写的字段）"""
+        token_dict = create_token_with_id(
+            {"token_body": token.token_body, "token_type": token.token_type},
+            token.global_token_id, token.sentence_token_id
+        )
+        if self.enable_difficulty_estimation and token.token_type == "text":
+            token_dict["difficulty_level"] = token.difficulty_level
+            token_dict["lemma"] = token.lemma
+            if token.linked_vocab_id is not None:
+                token_dict["linked_vocab_id"] = token.linked_vocab_id
+        token_dict["pos_tag"] = token.pos_tag
+        token_dict["is_grammar_marker"] = bool(token.is_grammar_marker)
+        return token_dict
+    
     def save_enhanced_data(self, result: Dict[str, Any], output_dir: str = "data"):
         """
         保存增强版结构化数据到JSON文件
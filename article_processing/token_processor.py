@@ -7,7 +7,7 @@ Token处理模块
 """
 
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 def split_tokens(text: str) -> List[Dict[str, Any]]:
     """
@@ -22,6 +22,14 @@ def split_tokens(text: str) -> List[Dict[str, Any]]:
     if not text:
         return []
     
+    # 优先使用主项目的分词器（偏移数组实现，字典只在最后生成）
+    try:
+        from src.core.token_splitter import scan_tokens  # type: ignore
+    except ImportError:
+        scan_tokens = None
+    if scan_tokens is not None:
+        return scan_tokens(text).to_dicts()
+    
     tokens = []
     
     # 使用正则表达式匹配不同类型的token
@@ -60,6 +68,27 @@ def split_tokens(text: str) -> List[Dict[str, Any]]:
     
     return tokens
 
+def split_sentences_and_tokens(text: str) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    将文章分割成句子，并得到每个句子的tokens
+    
+    Args:
+        text: 文章内容
+        
+    Returns:
+        List[Tuple[str, List[Dict[str, Any]]]]: (句子内容, token列表) 的列表
+    """
+    # 优先使用主项目的单遍文档扫描（整篇只分词一次）
+    try:
+        from src.core.document_scanner import scan_document  # type: ignore
+    except ImportError:
+        scan_document = None
+    if scan_document is not None:
+        return list(scan_document(text).iter_sentences())
+    
+    from .sentence_processor import split_sentences
+    return [(sentence, split_tokens(sentence)) for sentence in split_sentences(text)]
+
 def create_token_with_id(token_dict: Dict[str, Any], global_token_id: int, sentence_token_id: int) -> Dict[str, Any]:
     """
     为token添加ID信息
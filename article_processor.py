@@ -3,15 +3,14 @@
 
 """
 完整的文章处理脚本
-整合句子分割和token分割功能，处理整个文章并输出结构化数据
+使用处理流水线的分句和分词阶段，处理整个文章并输出结构化数据
 """
 
 import json
 import os
 from typing import List, Dict, Any
-from src.core.sentence_splitter import split_sentences
-from src.core.token_splitter import split_tokens
-from src.core.token_data import OriginalText, Sentence, Token
+from src.core.token_data import OriginalText, Sentence
+from src.core.pipeline import Pipeline, PipelineContext, SplitStage, TokenizeStage, CollectSink
 
 def process_article(raw_text: str, text_id: int = 1, text_title: str = "Article") -> OriginalText:
     """
@@ -29,59 +28,25 @@ def process_article(raw_text: str, text_id: int = 1, text_title: str = "Article"
     print(f"文章ID: {text_id}")
     print(f"原始文本长度: {len(raw_text)} 字符")
     
-    # 步骤1: 分割句子
-    print("\n步骤1: 分割句子...")
-    sentences_text = split_sentences(raw_text)
-    print(f"分割得到 {len(sentences_text)} 个句子")
+    # 只做分句和分词的流水线，每个句子分词后输出进度
+    pipeline = Pipeline([SplitStage(), TokenizeStage(), CollectSink()])
+    pipeline.add_hook("tokenize", after=_print_progress)
     
-    # 步骤2: 为每个句子分割tokens并创建结构化数据
-    print("\n步骤2: 分割tokens并创建结构化数据...")
-    sentences = []
-    global_token_id = 0
-    
-    for sentence_id, sentence_text in enumerate(sentences_text, 1):
-        print(f"  处理句子 {sentence_id}/{len(sentences_text)}: {sentence_text[:50]}...")
-        
-        # 分割tokens
-        token_dicts = split_tokens(sentence_text)
-        
-        # 创建Token对象列表
-        tokens = []
-        for token_id, token_dict in enumerate(token_dicts, 1):
-            token = Token(
-                token_body=token_dict["token_body"],
-                token_type=token_dict["token_type"],
-                global_token_id=global_token_id,
-                sentence_token_id=token_id
-            )
-            tokens.append(token)
-            global_token_id += 1
-        
-        # 创建Sentence对象
-        sentence = Sentence(
-            text_id=text_id,
-            sentence_id=sentence_id,
-            sentence_body=sentence_text,
-            grammar_annotations=[],
-            vocab_annotations=[],
-            tokens=tokens
-        )
-        sentences.append(sentence)
-    
-    # 步骤3: 创建OriginalText对象
-    print("\n步骤3: 创建结构化数据对象...")
-    original_text = OriginalText(
-        text_id=text_id,
-        text_title=text_title,
-        text_by_sentence=sentences
-    )
+    print("\n分割句子和tokens并创建结构化数据...")
+    context = pipeline.run(PipelineContext(text_id, text_title, text=raw_text))
+    original_text = context.original_text()
     
     print(f"✅ 文章处理完成！")
-    print(f"   总句子数: {len(sentences)}")
-    print(f"   总token数: {global_token_id}")
+    print(f"   总句子数: {context.sentence_count}")
+    print(f"   总token数: {context.token_count}")
     
     return original_text
 
+def _print_progress(sentences: List[Sentence], context: PipelineContext):
+    """分词阶段的钩子：输出每个句子的处理进度"""
+    for sentence in sentences:
+        print(f"  处理句子 {sentence.sentence_id}: {sentence.sentence_body[:50]}...")
+
 def save_structured_data(original_text: OriginalText, output_dir: str = "data"):
     """
     保存结构化数据到JSON文件
@@ -3,12 +3,11 @@
 
 """
 简单的文章处理脚本
-直接使用现有的sentence_splitter和token_splitter处理文章
+使用处理流水线的分句和分词阶段处理文章
 """
 
 import json
-from src.core.sentence_splitter import split_sentences
-from src.core.token_splitter import split_tokens
+from src.core.pipeline import Pipeline, PipelineContext, SplitStage, TokenizeStage, CollectSink, sentences_to_result
 
 def process_article_simple(raw_text: str):
     """
@@ -23,49 +22,12 @@ def process_article_simple(raw_text: str):
     print("=== 简单文章处理 ===")
     print(f"原始文本长度: {len(raw_text)} 字符")
     
-    # 步骤1: 分割句子
-    print("\n1. 分割句子...")
-    sentences = split_sentences(raw_text)
-    print(f"分割得到 {len(sentences)} 个句子")
-    
-    # 步骤2: 为每个句子分割tokens
-    print("\n2. 分割tokens...")
-    result = {
-        "sentences": [],
-        "total_sentences": len(sentences),
-        "total_tokens": 0
-    }
-    
-    global_token_id = 0
-    
-    for sentence_id, sentence_text in enumerate(sentences, 1):
-        print(f"  处理句子 {sentence_id}: {sentence_text[:50]}...")
-        
-        # 分割tokens
-        tokens = split_tokens(sentence_text)
-        
-        # 为每个token添加ID
-        tokens_with_id = []
-        for token_id, token in enumerate(tokens, 1):
-            token_with_id = {
-                "token_body": token["token_body"],
-                "token_type": token["token_type"],
-                "global_token_id": global_token_id,
-                "sentence_token_id": token_id
-            }
-            tokens_with_id.append(token_with_id)
-            global_token_id += 1
-        
-        # 创建句子数据
-        sentence_data = {
-            "sentence_id": sentence_id,
-            "sentence_body": sentence_text,
-            "tokens": tokens_with_id,
-            "token_count": len(tokens_with_id)
-        }
-        
-        result["sentences"].append(sentence_data)
-        result["total_tokens"] = global_token_id
+    # 只做分句和分词的流水线，每个句子分词后输出进度
+    print("\n分割句子和tokens...")
+    pipeline = Pipeline([SplitStage(), TokenizeStage(), CollectSink()])
+    pipeline.add_hook("tokenize", after=_print_progress)
+    context = pipeline.run(PipelineContext(1, text=raw_text))
+    result = sentences_to_result(context.sentences)
     
     print(f"\n✅ 处理完成！")
     print(f"   总句子数: {result['total_sentences']}")
@@ -73,6 +35,11 @@ def process_article_simple(raw_text: str):
     
     return result
 
+def _print_progress(sentences, context):
+    """分词阶段的钩子：输出每个句子的处理进度"""
+    for sentence in sentences:
+        print(f"  处理句子 {sentence.sentence_id}: {sentence.sentence_body[:50]}...")
+
 def save_result(result, filename="article_result.json"):
     """保存结果到JSON文件"""
     with open(filename, 'w', encoding='utf-8') as f:
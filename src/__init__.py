@@ -1,7 +1,18 @@
 # -*- coding: utf-8 -*-
 """
 文本处理工具集
+
+子包在首次访问时才导入，只做分词时不会加载NLTK或OpenAI
 """
 
+import importlib
+
 __version__ = "1.0.0"
-__author__ = "Text Processing Team" 
\ No newline at end of file
+__author__ = "Text Processing Team"
+
+_SUBPACKAGES = ('core', 'utils', 'agents')
+
+def __getattr__(name):
+    if name in _SUBPACKAGES:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
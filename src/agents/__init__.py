@@ -1,18 +1,42 @@
 # -*- coding: utf-8 -*-
 """
 AI代理模块
+
+各助手依赖OpenAI SDK，在首次访问时才导入
 """
 
-from .single_token_difficulty_estimation import SingleTokenDifficultyEstimator
-from .sub_assistant import SubAssistant
-from .vocab_explanation import VocabExplanationAssistant
-from .vocab_example_explanation import VocabExampleExplanationAssistant
-from .grammar_analysis import GrammarAnalysisAssistant
+import importlib
+
+# 名称 -> 所在子模块（首次访问时导入）
+_LAZY_ATTRS = {
+    'SingleTokenDifficultyEstimator': '.single_token_difficulty_estimation',
+    'BatchTokenDifficultyEstimator': '.batch_token_difficulty_estimation',
+    'SubAssistant': '.sub_assistant',
+    'VocabExplanationAssistant': '.vocab_explanation',
+    'VocabExampleExplanationAssistant': '.vocab_example_explanation',
+    'GrammarAnalysisAssistant': '.grammar_analysis',
+    'BatchGrammarAnalysisAssistant': '.batch_grammar_analysis',
+    'BatchGrammarMarkerAssistant': '.batch_grammar_marker',
+}
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
 
 __all__ = [
     'SingleTokenDifficultyEstimator',
+    'BatchTokenDifficultyEstimator',
     'SubAssistant',
     'VocabExplanationAssistant',
     'VocabExampleExplanationAssistant',
-    'GrammarAnalysisAssistant'
-] 
\ No newline at end of file
+    'GrammarAnalysisAssistant',
+    'BatchGrammarAnalysisAssistant',
+    'BatchGrammarMarkerAssistant'
+] 
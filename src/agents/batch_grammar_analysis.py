@@ -0,0 +1,45 @@
+import json
+from typing import Any, Dict, Iterator, List, Tuple
+from .sub_assistant import SubAssistant
+from ..utils.promp import batch_grammar_analysis_sys_prompt, batch_grammar_analysis_prompt_template
+from ..utils.utility import iter_json_items
+
+class BatchGrammarAnalysisAssistant(SubAssistant):
+    """批量语法分析：一次请求分析多个句子，结果为按句子编号排列的JSON数组"""
+
+    def __init__(self, max_sentences: int = 8):
+        """
+        Args:
+            max_sentences: 每次请求的最大句子数（用于确定输出token上限）
+        """
+        super().__init__(
+            sys_prompt=batch_grammar_analysis_sys_prompt,
+            max_tokens=min(400 * max_sentences, 8000),
+            parse_json=True
+        )
+        self.max_sentences = max_sentences
+
+    def build_prompt(self, sentences: List[str]) -> str:
+        items = [{"index": index, "sentence": sentence} for index, sentence in enumerate(sentences)]
+        return batch_grammar_analysis_prompt_template.format(sentences=json.dumps(items, ensure_ascii=False))
+
+    def iter_run(self, sentences: List[str], verbose=False, handle=None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        流式分析一组句子，每个句子的结果一解析完成就立即产出
+
+        Args:
+            sentences: 待分析的句子列表
+            handle: 可选的ProcessingHandle
+
+        Yields:
+            Tuple[int, Dict[str, Any]]: (句子在sentences中的位置, {"rules": [...], "keywords": [...]})
+        """
+        for key, value in iter_json_items(self.stream(sentences, verbose=verbose, handle=handle)):
+            if not isinstance(value, dict):
+                continue
+            # 优先使用模型返回的index，其次使用数组位置
+            index = value.get("index", key)
+            if isinstance(index, str) and index.isdigit():
+                index = int(index)
+            if isinstance(index, int) and 0 <= index < len(sentences):
+                yield index, value
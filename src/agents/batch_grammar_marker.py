@@ -0,0 +1,47 @@
+import json
+from typing import Dict, Iterator, List, Tuple
+from .sub_assistant import SubAssistant
+from ..utils.promp import batch_grammar_marker_system_template, batch_grammar_marker_user_template
+from ..utils.utility import iter_json_items
+
+class BatchGrammarMarkerAssistant(SubAssistant):
+    """按句子批量判断token是否为语法标记：一次请求判断一个句子中所有有歧义的token"""
+
+    def __init__(self):
+        super().__init__(
+            sys_prompt=batch_grammar_marker_system_template,
+            max_tokens=300,
+            parse_json=True
+        )
+
+    def build_prompt(self, sentence: str, tokens: Dict[int, str]) -> str:
+        items = [{"index": index, "token": token} for index, token in tokens.items()]
+        return batch_grammar_marker_user_template.format(sentence=sentence, tokens=json.dumps(items, ensure_ascii=False))
+
+    def iter_run(self, sentence: str, tokens: Dict[int, str], verbose=False, handle=None) -> Iterator[Tuple[int, bool]]:
+        """
+        流式判断一个句子中的多个token，每个结果一解析完成就立即产出
+
+        Args:
+            sentence: 句子内容
+            tokens: 句内token编号 -> token内容
+            handle: 可选的ProcessingHandle
+
+        Yields:
+            Tuple[int, bool]: (token编号, 是否为语法标记)
+        """
+        indices: List[int] = list(tokens)
+        for key, value in iter_json_items(self.stream(sentence, tokens, verbose=verbose, handle=handle)):
+            if isinstance(value, dict):
+                # 数组形式：[{"index": 3, "answer": "Yes"}, ...]
+                key, value = value.get("index"), value.get("answer")
+            elif isinstance(key, int):
+                # 按顺序返回的数组：key为位置
+                key = indices[key] if key < len(indices) else None
+            try:
+                index = int(key)
+            except (TypeError, ValueError):
+                continue
+            answer = str(value).strip().lower()
+            if index in tokens and answer in ("yes", "no"):
+                yield index, answer == "yes"
@@ -0,0 +1,37 @@
+import json
+from typing import Iterator, List, Tuple
+from .sub_assistant import SubAssistant
+from ..utils.promp import batch_difficulty_estimation_system_template, batch_assessment_user_template
+from ..utils.utility import iter_json_items
+
+class BatchTokenDifficultyEstimator(SubAssistant):
+    """批量难度评估：一次请求评估多个token，结果以JSON对象流式返回"""
+
+    def __init__(self, language: str = "English"):
+        self.language = language
+        super().__init__(
+            sys_prompt=batch_difficulty_estimation_system_template.format(language=language),
+            max_tokens=1000,
+            parse_json=True
+        )
+
+    def build_prompt(self, words: List[str]) -> str:
+        return batch_assessment_user_template.format(words=json.dumps(words, ensure_ascii=False))
+
+    def iter_run(self, words: List[str], verbose=False, handle=None) -> Iterator[Tuple[str, str]]:
+        """
+        流式评估一组token，每个token的结果一解析完成就立即产出
+
+        Args:
+            words: 待评估的token列表
+            handle: 可选的ProcessingHandle
+
+        Yields:
+            Tuple[str, str]: (token, "easy"/"hard")
+        """
+        for key, value in iter_json_items(self.stream(words, verbose=verbose, handle=handle)):
+            # 模型也可能按顺序返回数组，此时key为索引
+            word = words[key] if isinstance(key, int) and 0 <= key < len(words) else key
+            level = str(value).strip().lower()
+            if level in ("easy", "hard"):
+                yield word, level
@@ -2,9 +2,10 @@ from .sub_assistant import SubAssistant
 from ..utils.promp import difficulty_estimation_system_template_specific_standard, difficulty_estimation_system_template_default, assessment_user_template
 
 class SingleTokenDifficultyEstimator(SubAssistant):
-    def __init__(self):
+    def __init__(self, language: str = "English"):
+        self.language = language
         super().__init__(
-            sys_prompt=difficulty_estimation_system_template_default.format(language="English"),
+            sys_prompt=difficulty_estimation_system_template_default.format(language=language),
             max_tokens=400,
             parse_json=False
         )
@@ -12,5 +13,5 @@ class SingleTokenDifficultyEstimator(SubAssistant):
     def build_prompt(self, word: str) -> str:
         return assessment_user_template.format(word=word)
 
-    def run(self, word: str, verbose=False) -> str:
-        return super().run(word, verbose=verbose)
\ No newline at end of file
+    def run(self, word: str, verbose=False, handle=None) -> str:
+        return super().run(word, verbose=verbose, handle=handle)
@@ -1,3 +1,4 @@
+from typing import Iterator
 from openai import OpenAI
 #, Sentence, GrammarRule, GrammarExample, GrammarBundle, VocabExpression, VocabExpressionExample
 from ..utils.utility import parse_json_from_text
@@ -10,7 +11,32 @@ class SubAssistant:
         self.parse_json = parse_json
         self.model = "deepseek-chat"
 
-    def run(self, *args, verbose=False, **kwargs) -> dict |list[dict] | str:
+    def _create_completion(self, messages, handle=None, **extra):
+        """发送chat completion请求；提供handle时可被取消并受截止时间约束"""
+        if handle is not None:
+            # 排队中的请求在发出前检查取消状态；进行中的请求受截止时间约束
+            # （没有截止时间时不传timeout，保留客户端默认的超时，显式传None会关闭超时）
+            remaining = handle.remaining()
+            if remaining is not None:
+                extra["timeout"] = remaining
+            return handle.call(
+                self.client.chat.completions.create,
+                model=self.model,
+                messages=messages,
+                max_tokens=self.max_tokens,
+                **extra
+            )
+        return self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=self.max_tokens,
+            **extra
+        )
+
+    def run(self, *args, verbose=False, handle=None, **kwargs) -> dict |list[dict] | str:
+        """
+        handle: 可选的ProcessingHandle，取消或超时时抛出ProcessingCancelled
+        """
         user_prompt = self.build_prompt(*args, **kwargs)
         if verbose:
             print("🧾 Prompt:\n", user_prompt)
@@ -19,11 +45,7 @@ class SubAssistant:
             {"role": "system", "content": self.sys_prompt},
             {"role": "user", "content": user_prompt}
         ]
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            max_tokens=self.max_tokens
-        )
+        response = self._create_completion(messages, handle=handle)
         content = response.choices[0].message.content.strip()
         if verbose:
             print("📬 Raw Response:\n", content)
@@ -32,6 +54,38 @@ class SubAssistant:
             return parse_json_from_text(content)
         return content
 
+    def stream(self, *args, verbose=False, handle=None, **kwargs) -> Iterator[str]:
+        """
+        以流式方式（stream=True）执行请求，逐段产出模型输出的文本
+
+        handle: 可选的ProcessingHandle，每收到一段输出都会检查取消状态，
+                取消时关闭连接并抛出ProcessingCancelled
+        """
+        user_prompt = self.build_prompt(*args, **kwargs)
+        if verbose:
+            print("🧾 Prompt:\n", user_prompt)
+
+        messages = [
+            {"role": "system", "content": self.sys_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        response = self._create_completion(messages, handle=handle, stream=True)
+        try:
+            for chunk in response:
+                if handle is not None:
+                    handle.check()
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if verbose:
+                        print(delta, end="", flush=True)
+                    yield delta
+        finally:
+            close = getattr(response, "close", None)
+            if close is not None:
+                close()
+
     def build_prompt(self, *args, **kwargs) -> str:
         """
         子类必须重写此方法构建 prompt。
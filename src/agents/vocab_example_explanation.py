@@ -1,5 +1,6 @@
 from .sub_assistant import SubAssistant
 from ..utils.promp import vocab_example_explanation_sys_prompt, vocab_example_explanation_template
+from ..utils.context_window import quote_window
 from typing import Optional
 from ..core.token_data import Sentence
 
@@ -14,22 +15,27 @@ class VocabExampleExplanationAssistant(SubAssistant):
     def build_prompt(
         self,
         vocab: str,
-        sentence: Sentence
+        sentence: Sentence,
+        position: Optional[int] = None
     ) -> str:
         return vocab_example_explanation_template.format(
-            quoted_sentence=sentence.sentence_body,
+            quoted_sentence=quote_window(sentence.sentence_body, vocab, position=position),
             vocab_knowledge_point=vocab,
         )
     
     def run(
         self,
         vocab: str,
-        sentence: Sentence
+        sentence: Sentence,
+        handle=None,
+        position: Optional[int] = None
     ) -> str:
         """
         执行对话历史总结。
         
         :param dialogue_history: 对话历史字符串
+        :param handle: 可选的ProcessingHandle
+        :param position: 词汇在句子中的位置（可选，token.start - sentence.start）
         """
-        return super().run(vocab, sentence)
+        return super().run(vocab, sentence, handle=handle, position=position)
     
\ No newline at end of file
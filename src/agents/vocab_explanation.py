@@ -1,4 +1,6 @@
 from ..utils.promp import vocab_explanation_sys_prompt, vocab_explanation_template
+from ..utils.utility import iter_json_string_field
+from ..utils.context_window import quote_window
 from .sub_assistant import SubAssistant
 
 class VocabExplanationAssistant(SubAssistant):
@@ -9,31 +11,52 @@ class VocabExplanationAssistant(SubAssistant):
             parse_json=True
         )
     
-    def build_prompt(self, sentence, vocab):
+    def build_prompt(self, sentence, vocab, position=None):
         """
-        构建词汇解释的prompt
+        构建词汇解释的prompt（句子超过PROMPT_CONTEXT_CHARS时只引用词汇附近的窗口）
         
         Args:
             sentence: 句子对象
             vocab: 词汇或表达
+            position: 词汇在句子中的位置（可选，token.start - sentence.start），窗口以这一处为中心
             
         Returns:
             str: 格式化的prompt
         """
         return vocab_explanation_template.format(
-            quoted_sentence=sentence.sentence_body,
+            quoted_sentence=quote_window(sentence.sentence_body, vocab, position=position),
             vocab_knowledge_point=vocab
         )
     
-    def run(self, sentence, vocab):
+    def run(self, sentence, vocab, handle=None, position=None):
         """
         根据句子和词汇生成词汇解释
         
         Args:
             sentence: 句子对象
             vocab: 词汇或表达
+            handle: 可选的ProcessingHandle
+            position: 词汇在句子中的位置（可选）
             
         Returns:
             str: 词汇解释
         """
-        return super().run(sentence, vocab) 
\ No newline at end of file
+        return super().run(sentence, vocab, handle=handle, position=position)
+
+    def stream_explanation(self, sentence, vocab, handle=None, position=None):
+        """
+        流式生成词汇解释，逐段产出解释文本
+
+        模型仍按 {"explanation": "..."} 格式输出，这里边接收边解码explanation字段，
+        首段文字无需等待整个回复结束即可显示。
+
+        Args:
+            sentence: 句子对象
+            vocab: 词汇或表达
+            handle: 可选的ProcessingHandle
+            position: 词汇在句子中的位置（可选）
+
+        Yields:
+            str: 解释文本片段
+        """
+        return iter_json_string_field(self.stream(sentence, vocab, handle=handle, position=position), "explanation")
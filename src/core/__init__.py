@@ -1,18 +1,64 @@
 # -*- coding: utf-8 -*-
 """
 核心文本处理模块
+
+各对象在首次访问时才导入，只做分词时不会加载难度评估、lemma等依赖
 """
 
-from .text_processor import TextProcessor
-from .token_data import OriginalText, Sentence, Token
-from .sentence_splitter import read_and_split_sentences
-from .token_splitter import split_tokens
+import importlib
+
+# 名称 -> 所在子模块（首次访问时导入）
+_LAZY_ATTRS = {
+    'TextProcessor': '.text_processor',
+    'OriginalText': '.token_data',
+    'Sentence': '.token_data',
+    'Token': '.token_data',
+    'fill_whitespace': '.token_data',
+    'read_and_split_sentences': '.sentence_splitter',
+    'split_tokens': '.token_splitter',
+    'scan_tokens': '.token_splitter',
+    'TokenSpans': '.token_splitter',
+    'scan_document': '.document_scanner',
+    'DocumentSpans': '.document_scanner',
+    'ChunkedDocumentReader': '.document_scanner',
+    'StructuredDataWriter': '.structured_output',
+    'TokenTable': '.token_table',
+    'Pipeline': '.pipeline',
+    'PipelineContext': '.pipeline',
+    'Stage': '.pipeline',
+    'ProcessingHandle': '.processing_handle',
+    'ProcessingCancelled': '.processing_handle',
+}
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
 
 __all__ = [
     'TextProcessor',
     'OriginalText', 
     'Sentence', 
     'Token',
+    'fill_whitespace',
     'read_and_split_sentences',
-    'split_tokens'
-] 
\ No newline at end of file
+    'split_tokens',
+    'scan_tokens',
+    'TokenSpans',
+    'scan_document',
+    'DocumentSpans',
+    'ChunkedDocumentReader',
+    'StructuredDataWriter',
+    'TokenTable',
+    'Pipeline',
+    'PipelineContext',
+    'Stage',
+    'ProcessingHandle',
+    'ProcessingCancelled'
+]
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+单遍文档扫描
+整篇文档只分词一次，在同一遍中根据token确定句子边界；
+句子和token都用相对整篇文档的字符偏移表示，各处理流程按句子取用，不再对句子字符串重新分词
+"""
+
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .token_splitter import TokenSpans, scan_tokens, TOKEN_TYPE_NAMES, PUNCTUATION, SPACE
+from ..utils.language import detect_language
+
+# 句末标点：后面跟空白时分句（与 split_sentences 的 (?<=[.!?])\s+ 一致）
+_SENTENCE_END = frozenset(".!?")
+# 中日文句末标点：后面不需要空白
+_CJK_SENTENCE_END = frozenset("。！？")
+# 超长句子优先在从句标点之后切分（中日文标点后没有空白，直接在标点后切分）
+_CLAUSE_END = frozenset(",;:，、；：")
+
+
+class DocumentSpans:
+    """
+    文档扫描结果：整篇文档的TokenSpans，加上每个句子的字符偏移和token区间
+    第i个句子是 text[sentence_starts[i]:sentence_ends[i]]，
+    包含 tokens 中下标为 [token_starts[i], token_ends[i]) 的token（句首句尾没有空白token）
+    """
+    __slots__ = ("text", "tokens", "sentence_starts", "sentence_ends", "token_starts", "token_ends",
+                 "max_sentence_length")
+
+    def __init__(self, text: str, tokens: TokenSpans, max_sentence_length: Optional[int] = None):
+        self.text = text
+        self.tokens = tokens
+        self.max_sentence_length = max_sentence_length
+        self.sentence_starts = array('I')
+        self.sentence_ends = array('I')
+        self.token_starts = array('I')
+        self.token_ends = array('I')
+
+    def _add_sentence(self, first: int, end: int):
+        if self.max_sentence_length:
+            first = self._split_long_sentence(first, end)
+        self._append_sentence(first, end)
+
+    def _split_long_sentence(self, first: int, end: int) -> int:
+        """
+        把超过max_sentence_length的句子 [first, end) 从前往后切分，除最后一段外的各段直接加入，返回最后一段的起点
+
+        每段优先在窗口后半部分的最后一个从句标点之后切分，其次在最后一个空白处，
+        都没有时在token边界处切分（单个token超长时自成一段）；各段首尾不含空白token。
+        每段至少前进半个窗口或一个token，总耗时与句子长度成正比
+        """
+        text, starts, ends, types = self.text, self.tokens.starts, self.tokens.ends, self.tokens.types
+        max_length = self.max_sentence_length
+        while ends[end - 1] - starts[first] > max_length:
+            limit = starts[first] + max_length
+            half = starts[first] + max_length // 2
+            clause_cut = space_cut = None
+            index = first
+            while ends[index] <= limit:
+                code = types[index]
+                if code == SPACE:
+                    space_cut = index
+                elif code == PUNCTUATION and text[starts[index]] in _CLAUSE_END and ends[index] >= half:
+                    clause_cut = index + 1
+                index += 1
+            cut = clause_cut or space_cut or max(index, first + 1)
+            if cut >= end:
+                # 剩下的是单个超长token
+                break
+            piece_end = cut
+            while types[piece_end - 1] == SPACE:
+                piece_end -= 1
+            self._append_sentence(first, piece_end)
+            first = cut
+            while types[first] == SPACE:
+                first += 1
+        return first
+
+    def _append_sentence(self, first: int, end: int):
+        self.token_starts.append(first)
+        self.token_ends.append(end)
+        self.sentence_starts.append(self.tokens.starts[first])
+        self.sentence_ends.append(self.tokens.ends[end - 1])
+
+    def __len__(self) -> int:
+        return len(self.token_starts)
+
+    def sentence_text(self, index: int) -> str:
+        """第index个句子的内容"""
+        return self.text[self.sentence_starts[index]:self.sentence_ends[index]]
+
+    def sentence_texts(self) -> List[str]:
+        """所有句子的内容（与 split_sentences 的结果相同）"""
+        text = self.text
+        return [text[start:end] for start, end in zip(self.sentence_starts, self.sentence_ends)]
+
+    def sentence_token_range(self, index: int) -> range:
+        """第index个句子的token在tokens中的下标范围"""
+        return range(self.token_starts[index], self.token_ends[index])
+
+    def sentence_token_offsets(self, index: int) -> Tuple[array, array]:
+        """第index个句子各token的起始偏移和结束偏移（相对整篇文档）"""
+        token_range = self.sentence_token_range(index)
+        return (self.tokens.starts[token_range.start:token_range.stop],
+                self.tokens.ends[token_range.start:token_range.stop])
+
+    def sentence_tokens(self, index: int) -> List[Dict[str, Any]]:
+        """
+        第index个句子的token字典（与对句子调用 split_tokens 的结果相同）
+
+        Args:
+            index: 句子下标（从0开始）
+
+        Returns:
+            List[Dict[str, Any]]: 包含token_body和token_type的token列表
+        """
+        text, starts, ends, types = self.text, self.tokens.starts, self.tokens.ends, self.tokens.types
+        return [{"token_body": text[starts[i]:ends[i]], "token_type": TOKEN_TYPE_NAMES[types[i]]}
+                for i in self.sentence_token_range(index)]
+
+    def iter_sentences(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """依次产出 (句子内容, 句子的token字典列表)"""
+        for index in range(len(self)):
+            yield self.sentence_text(index), self.sentence_tokens(index)
+
+    def sentence_spans(self, count: Optional[int] = None,
+                       base: int = 0) -> Iterator[Tuple[str, List[Dict[str, Any]], array, array]]:
+        """
+        依次产出前count个句子的 (句子内容, token字典列表, token起始偏移, token结束偏移)
+
+        Args:
+            count: 句子数（可选，默认全部）
+            base: 加到偏移上的值（本文档是更大文档的一部分时，为它在其中的起点）
+
+        Yields:
+            Tuple: 句子内容、token列表和偏移数组
+        """
+        for index in range(len(self) if count is None else count):
+            starts, ends = self.sentence_token_offsets(index)
+            if base:
+                starts = array('I', [base + start for start in starts])
+                ends = array('I', [base + end for end in ends])
+            yield self.sentence_text(index), self.sentence_tokens(index), starts, ends
+
+
+def scan_document(text: str, language: Optional[str] = None,
+                  max_sentence_length: Optional[int] = None) -> DocumentSpans:
+    """
+    扫描整篇文档，得到句子和token（均为文档内的绝对偏移）
+
+    Args:
+        text: 文档内容
+        language: 文档语言（可选，未指定时根据字符分布检测）
+        max_sentence_length: 句子最大长度（字符数，可选）。超长的句子在从句标点或空白处切分为多个句子
+
+    Returns:
+        DocumentSpans: 扫描结果
+    """
+    tokens = scan_tokens(text or "", language)
+    document = DocumentSpans(text or "", tokens, max_sentence_length)
+    starts, types = tokens.starts, tokens.types
+    first = -1          # 当前句子的第一个token（-1表示还没开始）
+    last = -1           # 当前句子最后一个非空白token
+    after_end_mark = False
+    for index, code in enumerate(types):
+        if code == SPACE:
+            if after_end_mark and first >= 0:
+                document._add_sentence(first, index)
+                first = -1
+            after_end_mark = False
+            continue
+        if first < 0:
+            first = index
+        last = index
+        if code == PUNCTUATION:
+            mark = text[starts[index]]
+            if mark in _CJK_SENTENCE_END:
+                document._add_sentence(first, index + 1)
+                first = -1
+                after_end_mark = False
+                continue
+            after_end_mark = mark in _SENTENCE_END
+        else:
+            after_end_mark = False
+    if first >= 0:
+        document._add_sentence(first, last + 1)
+    return document
+
+
+# 流式读取时每次读取的字符数
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class ChunkedDocumentReader:
+    """
+    分块读取文档并逐句产出（内存只与块大小和最长句子有关，与文档大小无关）
+    每读入一块就扫描“上一块留下的未完成句子 + 新块”，除最后一句外的句子都已完整，立即产出；
+    最后一句（可能被块边界截断）留到下一块继续扫描。耗时与文档长度成正比（超长句子见sentence_spans）
+    """
+
+    def __init__(self, source, chunk_size: int = DEFAULT_CHUNK_SIZE, language: Optional[str] = None,
+                 max_sentence_length: Optional[int] = None):
+        """
+        Args:
+            source: 以文本模式打开的文件对象（或任何有read(size)方法的对象）
+            chunk_size: 每次读取的字符数
+            language: 文档语言（可选，未指定时只根据第一块检测，不是全文）
+            max_sentence_length: 句子最大长度（字符数，可选，见scan_document）
+        """
+        self.source = source
+        self.chunk_size = chunk_size
+        self.language = language
+        self.max_sentence_length = max_sentence_length
+
+    def sentences(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        依次产出 (句子内容, 句子的token字典列表)，结果与对全文调用 scan_document 相同
+        （未指定language时语言只根据第一块检测；chunk_size小于detect_language的样本长度时，
+        检测结果可能与对全文检测不同）
+
+        Yields:
+            Tuple[str, List[Dict[str, Any]]]: 句子内容和token列表
+        """
+        for sentence_text, token_dicts, _, _ in self.sentence_spans():
+            yield sentence_text, token_dicts
+
+    def sentence_spans(self) -> Iterator[Tuple[str, List[Dict[str, Any]], array, array]]:
+        """
+        依次产出 (句子内容, token字典列表, token起始偏移, token结束偏移)，偏移相对整个文档
+
+        Yields:
+            Tuple: 句子内容、token列表和偏移数组
+        """
+        carry = ""
+        base = 0    # buffer开头在整个文档中的偏移
+        read_size = self.chunk_size
+        while True:
+            chunk = self.source.read(read_size)
+            if self.language is None and chunk:
+                self.language = detect_language(chunk)
+            buffer = carry + chunk
+            if not chunk:
+                if buffer:
+                    document = scan_document(buffer, self.language, self.max_sentence_length)
+                    yield from document.sentence_spans(base=base)
+                return
+            document = scan_document(buffer, self.language, self.max_sentence_length)
+            complete = len(document) - 1
+            yield from document.sentence_spans(complete, base)
+            carry_start = document.sentence_starts[complete] if complete >= 0 else len(buffer)
+            carry = buffer[carry_start:]
+            base += carry_start
+            # 没有找到完整句子时（超长句子）下一次读取加倍，未完成的句子被重复扫描的总长度不超过其长度的常数倍，
+            # 整体仍是线性时间；找到完整句子后恢复原来的块大小
+            read_size = read_size * 2 if complete == 0 else self.chunk_size
@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分阶段的文本处理流水线
+一次处理由若干声明式的阶段组成：分句（split）-> 分词（tokenize）-> 各标注阶段（POS/lemma、难度、vocab、语法……）-> 输出（sink）。
+分句阶段按批产出句子，其余阶段依次处理每一批；未启用的阶段在组装时就被去掉，不产生任何开销。
+
+每个阶段可以：
+- 通过 before/after 钩子在处理一批前后插入逻辑（缓存查询与回写、进度输出、分窗口保存等）
+- 通过 cache 登记自己的缓存（Pipeline.caches() 统一取出，便于统计和持久化）
+- 设置 parallel=True 在后台线程中按顺序处理各批，不阻塞后续阶段（只适用于不改变批内容、
+  结果在finish之前写回即可的阶段，例如语法分析）；workers>1 时各批并发处理
+- 后台阶段可以跨批缓冲（例如凑满一次请求的句子数）：process 返回一个Future，该批在Future完成后才算完成；
+  所有批都提交后调用 flush 处理缓冲中剩下的部分
+- 通过 iter_batches/iter_sentences 在每批完成所有阶段后立即取得结果（按原文顺序或按完成顺序）
+
+TextProcessor、sentence_splitter 和各文章处理脚本都是这个流水线的不同配置
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .token_data import OriginalText, Sentence, build_tokens
+from .processing_handle import ProcessingHandle
+from .document_scanner import scan_document, ChunkedDocumentReader, DEFAULT_CHUNK_SIZE
+from ..utils.language import detect_language
+
+# 钩子：hook(batch, context)
+Hook = Callable[[List[Any], "PipelineContext"], None]
+
+
+class PipelineContext:
+    """一次处理（一篇文本）的状态，在各阶段之间传递"""
+
+    def __init__(self, text_id: int, text_title: str = "", text: Optional[str] = None, source=None,
+                 language: Optional[str] = None, handle: Optional[ProcessingHandle] = None):
+        """
+        Args:
+            text_id: 文本ID
+            text_title: 文本标题
+            text: 文本内容（一次性处理）
+            source: 以文本模式打开的文件对象（分块读取，指定时忽略text）
+            language: 文本语言（可选，未指定时由分句阶段检测）
+            handle: 可选的处理句柄（取消或超时时各阶段抛出ProcessingCancelled）
+        """
+        self.text_id = text_id
+        self.text_title = text_title
+        self.text = text
+        self.source = source
+        self.language = language
+        self.handle = handle
+        self.sentence_count = 0     # 已创建的句子数（下一个句子ID减1）
+        self.token_count = 0        # 已创建的token数（下一个token的全局ID）
+        self.sentences: List[Sentence] = []
+        self.token_table = None
+        self.vocab_expressions: List[Any] = []
+        # 各阶段自己的状态，键为阶段名
+        self.state: Dict[str, Any] = {}
+
+    def original_text(self) -> OriginalText:
+        """用已收集的句子创建OriginalText"""
+        return OriginalText(
+            text_id=self.text_id,
+            text_title=self.text_title,
+            text_by_sentence=self.sentences,
+            token_table=self.token_table,
+            text=self.text
+        )
+
+
+class Stage:
+    """
+    流水线阶段：按批处理句子
+
+    既可以直接传入函数声明一个阶段（Stage("difficulty", assess)），也可以继承并重写
+    setup/process/finish/close。process 返回新的列表时替换当前批，返回None时批保持不变
+    """
+    name = "stage"
+
+    def __init__(self, name: Optional[str] = None, process: Optional[Callable] = None, *,
+                 setup: Optional[Callable] = None, flush: Optional[Callable] = None, finish: Optional[Callable] = None,
+                 close: Optional[Callable] = None, enabled: bool = True, parallel: bool = False,
+                 workers: int = 1, cache: Any = None):
+        """
+        Args:
+            name: 阶段名（可选，默认使用类的name）
+            process: process(batch, context)，处理一批句子；后台阶段缓冲了这一批时返回Future
+                     （批处理完时完成，出错时必须设置异常，不能一直不完成）
+            setup: setup(context)，处理开始前调用
+            flush: flush(context)，所有批都提交后调用（后台阶段在自己的线程中、排在最后一批之后），处理缓冲中剩下的部分
+            finish: finish(context)，所有批都处理完后调用（取消或出错时不调用）
+            close: close(context)，无论成功与否最后都会调用（保存数据等）
+            enabled: 是否启用；未启用的阶段在组装流水线时去掉
+            parallel: 是否在后台线程中处理各批（不等待结果，finish之前等待全部完成）
+            workers: parallel=True 时的后台线程数；大于1时各批并发处理、可能乱序完成（阶段本身须线程安全）
+            cache: 阶段使用的缓存（可选，只登记，由阶段自己读写）
+        """
+        if name is not None:
+            self.name = name
+        self._process = process
+        self._setup = setup
+        self._flush = flush
+        self._finish = finish
+        self._close = close
+        self.enabled = enabled
+        self.parallel = parallel
+        self.workers = max(1, workers)
+        self.cache = cache
+        self.before: List[Hook] = []
+        self.after: List[Hook] = []
+
+    def setup(self, context: PipelineContext):
+        if self._setup is not None:
+            self._setup(context)
+
+    def process(self, batch: List[Any], context: PipelineContext) -> Optional[List[Any]]:
+        if self._process is not None:
+            return self._process(batch, context)
+        return None
+
+    def flush(self, context: PipelineContext):
+        if self._flush is not None:
+            self._flush(context)
+
+    def finish(self, context: PipelineContext):
+        if self._finish is not None:
+            self._finish(context)
+
+    def close(self, context: PipelineContext):
+        if self._close is not None:
+            self._close(context)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+
+class SplitStage(Stage):
+    """
+    分句阶段（流水线的数据源）：扫描文本，按批产出 (句子内容, token字典列表, token起始偏移, token结束偏移)
+    context.source 不为None时分块读取（内存与文档大小无关），否则一次扫描 context.text
+    """
+    name = "split"
+
+    def __init__(self, max_sentence_length: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            max_sentence_length: 句子最大长度（字符数，可选，见scan_document）
+            chunk_size: 分块读取时每次读取的字符数
+        """
+        super().__init__()
+        self.max_sentence_length = max_sentence_length
+        self.chunk_size = chunk_size
+
+    def batches(self, context: PipelineContext, batch_size: int) -> Iterator[List[tuple]]:
+        """
+        按批产出句子（每批最多batch_size句），并把检测到的语言写入context.language
+
+        Yields:
+            List[tuple]: 一批句子
+        """
+        if context.source is not None:
+            reader = ChunkedDocumentReader(context.source, self.chunk_size, context.language,
+                                           max_sentence_length=self.max_sentence_length)
+            spans = reader.sentence_spans()
+        else:
+            reader = None
+            if context.language is None:
+                context.language = detect_language(context.text or "")
+            document = scan_document(context.text or "", context.language, self.max_sentence_length)
+            spans = document.sentence_spans()
+        batch = []
+        for span in spans:
+            batch.append(span)
+            if len(batch) >= batch_size:
+                if reader is not None:
+                    context.language = reader.language
+                yield batch
+                batch = []
+        if batch:
+            if reader is not None:
+                context.language = reader.language
+            yield batch
+
+
+class TokenizeStage(Stage):
+    """分词阶段：把分句阶段产出的句子转换为Sentence对象（Token带有全局ID和字符偏移）"""
+    name = "tokenize"
+
+    def __init__(self, implicit_whitespace: bool = False):
+        """
+        Args:
+            implicit_whitespace: 是否不为空白创建token（见build_tokens）
+        """
+        super().__init__()
+        self.implicit_whitespace = implicit_whitespace
+
+    def process(self, batch: List[tuple], context: PipelineContext) -> List[Sentence]:
+        sentences = []
+        for sentence_text, token_dicts, starts, ends in batch:
+            # difficulty_level和linked_vocab_id初始为None，由后续阶段填写
+            tokens = build_tokens(token_dicts, context.token_count, starts, ends,
+                                  implicit_whitespace=self.implicit_whitespace)
+            context.token_count += len(tokens)
+            context.sentence_count += 1
+            sentence = Sentence(
+                text_id=context.text_id,
+                sentence_id=context.sentence_count,
+                sentence_body=sentence_text,
+                grammar_annotations=[],
+                vocab_annotations=[],
+                tokens=tokens
+            )
+            if tokens:
+                sentence.start, sentence.end = tokens[0].start, tokens[-1].end
+            sentences.append(sentence)
+        return sentences
+
+
+class CollectSink(Stage):
+    """输出阶段：把句子收集到context.sentences中（可选存入列式TokenTable）"""
+    name = "sink"
+
+    def __init__(self, columnar_tokens: bool = False):
+        """
+        Args:
+            columnar_tokens: 是否把token存入列式的TokenTable（Sentence.tokens替换为表上的视图）
+        """
+        super().__init__()
+        self.columnar_tokens = columnar_tokens
+
+    def setup(self, context: PipelineContext):
+        if self.columnar_tokens:
+            from .token_table import TokenTable
+            context.token_table = TokenTable(context.text or "")
+
+    def process(self, batch: List[Sentence], context: PipelineContext):
+        table = context.token_table
+        for sentence in batch:
+            if table is not None:
+                sentence.tokens = table.append_sentence(sentence.tokens)
+            context.sentences.append(sentence)
+
+
+def sentences_to_result(sentences: List[Sentence]) -> Dict[str, Any]:
+    """
+    把CollectSink收集的Sentence对象转换为文章处理脚本输出的简单字典结构
+
+    Args:
+        sentences: Sentence对象列表
+
+    Returns:
+        dict: 包含sentences、total_sentences和total_tokens的结构化数据
+    """
+    result = {
+        "sentences": [],
+        "total_sentences": len(sentences),
+        "total_tokens": 0
+    }
+    for sentence in sentences:
+        tokens_with_id = [
+            {
+                "token_body": token.token_body,
+                "token_type": token.token_type,
+                "global_token_id": token.global_token_id,
+                "sentence_token_id": token.sentence_token_id
+            }
+            for token in sentence.tokens
+        ]
+        result["sentences"].append({
+            "sentence_id": sentence.sentence_id,
+            "sentence_body": sentence.sentence_body,
+            "tokens": tokens_with_id,
+            "token_count": len(tokens_with_id)
+        })
+        result["total_tokens"] += len(tokens_with_id)
+    return result
+
+
+class WriterSink(Stage):
+    """输出阶段：每批句子处理完立即写出（StructuredDataWriter），不在内存中保留"""
+    name = "sink"
+
+    def __init__(self, writer):
+        """
+        Args:
+            writer: StructuredDataWriter（或任何有write_sentence方法的对象）
+        """
+        super().__init__()
+        self.writer = writer
+
+    def process(self, batch: List[Sentence], context: PipelineContext):
+        for sentence in batch:
+            self.writer.write_sentence(sentence)
+
+
+class Pipeline:
+    """
+    由阶段组成的处理流水线
+
+    用法:
+        pipeline = Pipeline([SplitStage(), TokenizeStage(), Stage("difficulty", assess), CollectSink()])
+        context = pipeline.run(PipelineContext(text_id, title, text=text))
+        original_text = context.original_text()
+    """
+
+    def __init__(self, stages: Iterable[Stage], batch_size: int = 16):
+        """
+        Args:
+            stages: 阶段列表，第一个必须是数据源（SplitStage或其他提供batches方法的阶段）；未启用的阶段被去掉
+            batch_size: 每批的句子数
+        """
+        stages = [stage for stage in stages if stage.enabled]
+        if not stages or not hasattr(stages[0], "batches"):
+            raise ValueError("流水线的第一个阶段必须是数据源（如SplitStage）")
+        self.source = stages[0]
+        self.stages = stages[1:]
+        self.batch_size = max(1, batch_size)
+
+    def stage(self, name: str) -> Optional[Stage]:
+        """按名称查找已启用的阶段（未启用或不存在时返回None）"""
+        for stage in [self.source] + self.stages:
+            if stage.name == name:
+                return stage
+        return None
+
+    def add_hook(self, name: str, before: Optional[Hook] = None, after: Optional[Hook] = None) -> bool:
+        """
+        为阶段添加处理一批之前/之后调用的钩子 hook(batch, context)
+
+        Args:
+            name: 阶段名
+            before: 处理之前调用
+            after: 处理之后调用（参数为处理后的批）
+
+        Returns:
+            bool: 是否添加成功（阶段未启用时不添加，也就没有开销）
+        """
+        stage = self.stage(name)
+        if stage is None or stage is self.source:
+            return False
+        if before is not None:
+            stage.before.append(before)
+        if after is not None:
+            stage.after.append(after)
+        return True
+
+    def caches(self) -> Dict[str, Any]:
+        """各阶段登记的缓存，键为阶段名"""
+        return {stage.name: stage.cache for stage in self.stages if stage.cache is not None}
+
+    def iter_batches(self, context: PipelineContext, ordered: bool = True) -> Iterator[Tuple[int, List[Any]]]:
+        """
+        产出完成了所有阶段（包括后台阶段）的批
+
+        每处理完一批就检查一次后台阶段，已完成的批立即产出；ordered=True 时按原文顺序产出
+        （前面的批完成之前，后面已完成的批等待），False 时哪一批先完成就先产出。
+        所有批都处理完后等待后台阶段，并调用各阶段的finish
+
+        Args:
+            context: 处理状态
+            ordered: 是否按原文顺序产出
+
+        Yields:
+            Tuple[int, List[Any]]: (批中第一个句子的下标（从0开始）, 处理完的一批（通常是Sentence列表）)
+        """
+        waiting: List[Tuple[int, List[Any], List[Future]]] = []
+        for item in self._run_batches(context):
+            if item is not None:
+                waiting.append(item)
+                yield from self._pop_completed(waiting, ordered)
+                continue
+            # 所有批都已提交：等待后台阶段，每完成一批就检查一次
+            while waiting:
+                candidates = waiting[:1] if ordered else waiting
+                running = [_outcome(future) for _, _, futures in candidates for future in futures
+                           if not _outcome(future).done()]
+                if running:
+                    wait(running, return_when=FIRST_COMPLETED)
+                yield from self._pop_completed(waiting, ordered)
+
+    def iter_sentences(self, context: PipelineContext, ordered: bool = True) -> Iterator[Tuple[int, Any]]:
+        """
+        逐句产出完成了所有阶段的句子（见iter_batches）
+
+        Args:
+            context: 处理状态
+            ordered: 是否按原文顺序产出
+
+        Yields:
+            Tuple[int, Any]: (句子下标（从0开始）, 句子)
+        """
+        for index, batch in self.iter_batches(context, ordered):
+            for offset, item in enumerate(batch):
+                yield index + offset, item
+
+    def run(self, context: PipelineContext) -> PipelineContext:
+        """
+        处理整篇文本
+
+        Args:
+            context: 处理状态
+
+        Returns:
+            PipelineContext: 同一个context（输出阶段的结果在其中）
+        """
+        for _ in self._run_batches(context):
+            pass
+        return context
+
+    def _run_batches(self, context: PipelineContext) -> Iterator[Optional[Tuple[int, List[Any], List[Future]]]]:
+        """依次产出 (下标, 经过所有同步阶段的批, 该批在后台阶段中的Future列表)，所有批都提交后产出None"""
+        executors: Dict[int, ThreadPoolExecutor] = {}
+        pending: List[Future] = []
+        completed = False
+        try:
+            for stage in self.stages:
+                stage.setup(context)
+                if stage.parallel:
+                    executors[id(stage)] = ThreadPoolExecutor(max_workers=stage.workers)
+            index = 0
+            for batch in self.source.batches(context, self.batch_size):
+                futures: List[Future] = []
+                for stage in self.stages:
+                    batch = self._run_stage(stage, batch, context, executors.get(id(stage)), futures)
+                pending.extend(futures)
+                yield index, batch, futures
+                index += len(batch)
+            for stage in self.stages:
+                executor = executors.get(id(stage))
+                if executor is not None:
+                    pending.append(executor.submit(stage.flush, context))
+                else:
+                    stage.flush(context)
+            yield None
+            for future in pending:
+                _outcome(future).result()
+            for stage in self.stages:
+                stage.finish(context)
+            completed = True
+        finally:
+            # 取消、出错或提前停止迭代时尚未开始的批直接丢弃；正在处理的批要等它结束，
+            # 否则close保存数据时后台阶段还在写（取消时后台阶段通过处理句柄尽快停止）
+            for executor in executors.values():
+                executor.shutdown(wait=True, cancel_futures=not completed)
+            for stage in self.stages:
+                stage.close(context)
+
+    @staticmethod
+    def _pop_completed(waiting: List[Tuple[int, List[Any], List[Future]]],
+                       ordered: bool) -> Iterator[Tuple[int, List[Any]]]:
+        """取出后台阶段都已完成的批（后台阶段出错时立即抛出）"""
+        while waiting:
+            candidates = waiting[:1] if ordered else list(waiting)
+            ready = [item for item in candidates if all(_outcome(future).done() for future in item[2])]
+            if not ready:
+                return
+            for item in ready:
+                for future in item[2]:
+                    _outcome(future).result()
+                waiting.remove(item)
+                yield item[0], item[1]
+            if not ordered:
+                return
+
+    @staticmethod
+    def _run_stage(stage: Stage, batch: List[Any], context: PipelineContext,
+                   executor: Optional[ThreadPoolExecutor], futures: List[Future]) -> List[Any]:
+        if executor is not None:
+            # 后台阶段（连同钩子）在自己的线程池中处理（单线程时按提交顺序），当前批原样交给下一阶段
+            futures.append(executor.submit(Pipeline._process_batch, stage, list(batch), context))
+            return batch
+        return Pipeline._process_batch(stage, batch, context)
+
+    @staticmethod
+    def _process_batch(stage: Stage, batch: List[Any], context: PipelineContext) -> Any:
+        for hook in stage.before:
+            hook(batch, context)
+        result = stage.process(batch, context)
+        if isinstance(result, Future):
+            # 后台阶段缓冲了这一批：Future完成时这一批才算处理完
+            for hook in stage.after:
+                hook(batch, context)
+            return result
+        if result is not None:
+            batch = result
+        for hook in stage.after:
+            hook(batch, context)
+        return batch
+
+
+def _outcome(future: Future) -> Future:
+    """后台阶段的Future：处理完成且返回了Future（缓冲了这一批）时取该Future，否则是它本身"""
+    if future.done() and not future.cancelled() and future.exception() is None and isinstance(future.result(), Future):
+        return future.result()
+    return future
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+可取消的处理句柄
+用于在用户放弃文章时取消正在进行的文本处理，并支持可选的截止时间
+"""
+
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+class ProcessingCancelled(Exception):
+    """处理被取消或超过截止时间时抛出"""
+
+    def __init__(self, reason: str = "cancelled"):
+        self.reason = reason
+        super().__init__(f"文本处理已终止: {reason}")
+
+
+class ProcessingHandle:
+    """
+    文本处理句柄
+
+    - cancel(): 取消处理。排队中的LLM请求不再发出，进行中的请求被放弃
+    - timeout: 可选的截止时间（秒），超时后等同于取消
+    - partial_result: 取消时已完成部分的结构化结果（OriginalText）
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        初始化处理句柄
+
+        Args:
+            timeout: 截止时间（秒），None表示不设截止时间
+        """
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.partial_result = None
+        self._cancel_event = threading.Event()
+        self._done_event = threading.Event()
+        self._lock = threading.Lock()
+        self._inflight = set()
+        self._result = None
+        self._error = None
+        self._thread = None
+
+    @property
+    def cancelled(self) -> bool:
+        """是否已被取消"""
+        return self._cancel_event.is_set()
+
+    @property
+    def expired(self) -> bool:
+        """是否已超过截止时间"""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining(self) -> Optional[float]:
+        """距离截止时间的剩余秒数，没有截止时间时返回None"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def cancel(self):
+        """取消处理，并唤醒所有等待中的请求"""
+        self._cancel_event.set()
+        with self._lock:
+            waiters = list(self._inflight)
+        for waiter in waiters:
+            waiter.set()
+
+    def check(self):
+        """
+        检查是否应继续处理
+
+        Raises:
+            ProcessingCancelled: 已取消或已超时
+        """
+        if self.cancelled:
+            raise ProcessingCancelled("cancelled")
+        if self.expired:
+            raise ProcessingCancelled("deadline exceeded")
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        以可取消的方式执行一次（通常是LLM）请求
+
+        请求在后台线程中执行；取消或超时时调用方立即得到ProcessingCancelled，不再等待。
+        注意：已经发出的请求无法中止，后台线程会继续等到服务端返回（非流式请求的额度照常消耗），
+        结果被丢弃；流式请求在返回后立即关闭连接，不再接收后续输出。
+        在请求发出前取消则完全不会发出。
+
+        Args:
+            func: 要执行的函数
+            *args, **kwargs: 传给func的参数
+
+        Returns:
+            Any: func的返回值
+        """
+        self.check()
+
+        waiter = threading.Event()
+        outcome = {}
+        outcome_lock = threading.Lock()
+
+        def _worker():
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                with outcome_lock:
+                    outcome["error"] = e
+            else:
+                with outcome_lock:
+                    abandoned = outcome.get("abandoned", False)
+                    if not abandoned:
+                        outcome["result"] = result
+                # 调用方已放弃：关闭流式响应，不再接收输出
+                close = getattr(result, "close", None) if abandoned else None
+                if close is not None:
+                    close()
+            finally:
+                waiter.set()
+
+        with self._lock:
+            self._inflight.add(waiter)
+        try:
+            threading.Thread(target=_worker, daemon=True).start()
+            waiter.wait(timeout=self.remaining())
+        finally:
+            with self._lock:
+                self._inflight.discard(waiter)
+
+        with outcome_lock:
+            if "error" in outcome:
+                raise outcome["error"]
+            if "result" in outcome:
+                return outcome["result"]
+            outcome["abandoned"] = True
+        self.check()
+        raise ProcessingCancelled("deadline exceeded")
+
+    def start(self, func: Callable[..., Any], *args, **kwargs):
+        """在后台线程中运行处理函数，结果通过result()获取"""
+
+        def _runner():
+            try:
+                self._result = func(*args, **kwargs)
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._done_event.set()
+
+        self._thread = threading.Thread(target=_runner, daemon=True)
+        self._thread.start()
+        return self
+
+    def done(self) -> bool:
+        """处理是否已结束（完成、失败或取消）"""
+        return self._done_event.is_set()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """
+        等待并返回处理结果
+
+        Args:
+            timeout: 最长等待秒数
+
+        Returns:
+            Any: 处理结果
+
+        Raises:
+            ProcessingCancelled: 处理被取消或超时
+            TimeoutError: 在timeout内未完成
+        """
+        if not self._done_event.wait(timeout):
+            raise TimeoutError("等待处理结果超时")
+        if self._error is not None:
+            raise self._error
+        return self._result
@@ -2,8 +2,8 @@ import re
 import json
 import os
 from typing import List, Union
-from .token_data import OriginalText, Sentence, Token
-from .token_splitter import split_tokens
+from .token_data import OriginalText
+from .pipeline import Pipeline, PipelineContext, SplitStage, TokenizeStage, CollectSink
 
 def split_sentences(text: str) -> List[str]:
     """
@@ -12,7 +12,7 @@ def split_sentences(text: str) -> List[str]:
     """
     # 使用正则表达式分割句子
     # 匹配句号、问号、感叹号，后面跟着空格或换行符
-    sentences = re.split(r'(?<=[.!?])\s+', text)
+    sentences = re.split(r'(?<=[.!?])\s+|(?<=[。！？])', text)
     
     # 过滤掉空字符串并去除首尾空白
     sentences = [sentence.strip() for sentence in sentences if sentence.strip()]
@@ -60,48 +60,10 @@ def process_text_to_structured_data(text: Union[str, str], text_id: int, text_ti
         if not text_title:
             text_title = f"Text_{text_id}"
     
-    # 分割句子
-    sentence_texts = split_sentences(text_content)
-    
-    # 创建句子对象列表
-    sentences = []
-    global_token_id = 0
-    
-    for sentence_id, sentence_text in enumerate(sentence_texts, 1):
-        # 分割tokens
-        token_dicts = split_tokens(sentence_text)
-        
-        # 创建Token对象列表
-        tokens = []
-        for token_id, token_dict in enumerate(token_dicts, 1):
-            token = Token(
-                token_body=token_dict["token_body"],
-                token_type=token_dict["token_type"],
-                global_token_id=global_token_id,
-                sentence_token_id=token_id
-            )
-            tokens.append(token)
-            global_token_id += 1
-        
-        # 创建Sentence对象
-        sentence = Sentence(
-            text_id=text_id,
-            sentence_id=sentence_id,
-            sentence_body=sentence_text,
-            grammar_annotations=[],
-            vocab_annotations=[],
-            tokens=tokens
-        )
-        sentences.append(sentence)
-    
-    # 创建OriginalText对象
-    original_text = OriginalText(
-        text_id=text_id,
-        text_title=text_title,
-        text_by_sentence=sentences
-    )
-    
-    return original_text
+    # 只做分句和分词的流水线（单遍扫描整篇文本，Token带有在原文中的偏移）
+    context = PipelineContext(text_id, text_title, text=text_content)
+    Pipeline([SplitStage(), TokenizeStage(), CollectSink()]).run(context)
+    return context.original_text()
 
 def save_structured_data(original_text: OriginalText, output_dir: str):
     """
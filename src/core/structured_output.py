@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+结构化数据的增量写出
+original_texts.json、sentences.json、tokens.json 逐句追加写入，
+不需要把整篇文本的Sentence/Token保留在内存中；输出格式与一次性json.dump(indent=2)相同
+
+句子和token记录带有 start/end 字符偏移。omit_bodies=True 时不写 sentence_body 和 token_body，
+original_texts.json 的 text_body 保存原文本身（而不是逐句拼接），内容由 原文[start:end] 得到（见 restore_bodies）
+"""
+
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, TextIO
+
+from .token_data import Sentence
+
+
+def _dump_item(item: Any) -> str:
+    """数组元素按 indent=2 缩进一层"""
+    return "  " + json.dumps(item, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+
+
+class _JSONArrayWriter:
+    """逐个写入JSON数组元素"""
+
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.count = 0
+
+    def append(self, item: Any):
+        self.f.write("[\n" if self.count == 0 else ",\n")
+        self.f.write(_dump_item(item))
+        self.count += 1
+
+    def close(self):
+        self.f.write("\n]" if self.count else "[]")
+
+
+class StructuredDataWriter:
+    """
+    增量写出一个文本的结构化数据
+
+    用法:
+        with StructuredDataWriter(output_dir, text_id, text_title) as writer:
+            for sentence in sentences:
+                writer.write_sentence(sentence)
+    """
+
+    def __init__(self, output_dir: str, text_id: int, text_title: str, omit_bodies: bool = False):
+        """
+        Args:
+            output_dir: 输出目录路径
+            text_id: 文本ID
+            text_title: 文本标题
+            omit_bodies: 是否省略句子和token的内容（原文通过write_text写入text_body）
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.text_id = text_id
+        self.omit_bodies = omit_bodies
+        self.sentence_count = 0
+        self.token_count = 0
+        self._text_file = open(os.path.join(output_dir, "original_texts.json"), 'w', encoding='utf-8')
+        self._sentences_file = open(os.path.join(output_dir, "sentences.json"), 'w', encoding='utf-8')
+        self._tokens_file = open(os.path.join(output_dir, "tokens.json"), 'w', encoding='utf-8')
+        self._sentences = _JSONArrayWriter(self._sentences_file)
+        self._tokens = _JSONArrayWriter(self._tokens_file)
+        # original_texts.json：text_body逐句追加，sentence_ids在结束时写出
+        header = json.dumps({"text_id": text_id, "text_title": text_title}, ensure_ascii=False, indent=2)
+        self._text_file.write(header[:-2] + ',\n  "text_body": "')
+        # 句子ID先写入临时文件，结束时再复制到text_body之后
+        self._sentence_ids = tempfile.TemporaryFile('w+', encoding='utf-8')
+
+    def write_text(self, text: str):
+        """
+        追加原文到text_body（仅omit_bodies模式；可分多次写入）
+
+        Args:
+            text: 原文或其中的一段
+        """
+        self._text_file.write(json.dumps(text, ensure_ascii=False)[1:-1])
+
+    def write_sentence(self, sentence: Sentence):
+        """
+        写出一个句子及其tokens
+
+        Args:
+            sentence: 已完成标注的句子
+        """
+        if not self.omit_bodies:
+            if self.sentence_count:
+                self._text_file.write("\\n")
+            self._text_file.write(json.dumps(sentence.sentence_body, ensure_ascii=False)[1:-1])
+        self._sentence_ids.write(f"{',' if self.sentence_count else ''}\n    {sentence.sentence_id}")
+        self.sentence_count += 1
+
+        record = {
+            "sentence_id": sentence.sentence_id,
+            "text_id": sentence.text_id,
+            "sentence_body": sentence.sentence_body,
+            "start": sentence.start,
+            "end": sentence.end,
+            "token_ids": [token.global_token_id for token in sentence.tokens],
+            "grammar_annotations": sentence.grammar_annotations,
+            "vocab_annotations": sentence.vocab_annotations
+        }
+        if self.omit_bodies:
+            del record["sentence_body"]
+        self._sentences.append(record)
+        for token_index, token in enumerate(sentence.tokens):
+            self._tokens.append(token_record(sentence, token, token_index, self.omit_bodies))
+        self.token_count += len(sentence.tokens)
+
+    def close(self):
+        """补全三个文件的结尾并关闭"""
+        if self._text_file.closed:
+            return
+        self._text_file.write('",\n  "sentence_ids": ')
+        if self.sentence_count:
+            self._sentence_ids.seek(0)
+            self._text_file.write("[")
+            for block in iter(lambda: self._sentence_ids.read(1 << 16), ""):
+                self._text_file.write(block)
+            self._text_file.write("\n  ]")
+        else:
+            self._text_file.write("[]")
+        self._text_file.write("\n}")
+        self._sentences.close()
+        self._tokens.close()
+        for f in (self._text_file, self._sentences_file, self._tokens_file, self._sentence_ids):
+            f.close()
+
+    def __enter__(self) -> "StructuredDataWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def token_record(sentence: Sentence, token, token_index: int, omit_body: bool = False) -> Dict[str, Any]:
+    """tokens.json中的一条记录"""
+    record = {
+        "text_id": sentence.text_id,
+        "token_id": token.global_token_id,
+        "sentence_id": sentence.sentence_id,
+        "token_body": token.token_body,
+        "token_type": token.token_type,
+        "start": token.start,
+        "end": token.end,
+        "sentence_token_index": token_index,
+        "difficulty_level": token.difficulty_level,
+        "linked_vocab_id": token.linked_vocab_id,
+        "pos_tag": token.pos_tag,
+        "lemma": token.lemma,
+        "is_grammar_marker": token.is_grammar_marker
+    }
+    if omit_body:
+        del record["token_body"]
+    return record
+
+
+def restore_bodies(text: str, records: List[Dict[str, Any]], key: str = "token_body") -> List[Dict[str, Any]]:
+    """
+    为omit_bodies模式写出的记录补回内容（原文[start:end]）
+
+    Args:
+        text: 原文（original_texts.json的text_body）
+        records: tokens.json或sentences.json中的记录
+        key: 补回的字段名（token记录为token_body，句子记录为sentence_body）
+
+    Returns:
+        List[Dict[str, Any]]: 补回内容后的记录（原地修改）
+    """
+    for record in records:
+        record[key] = text[record["start"]:record["end"]]
+    return records
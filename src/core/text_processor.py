@@ -5,29 +5,127 @@ import re
 import json
 import os
 import sys
-from typing import List, Union, Dict, Any, Optional
+import math
+import tempfile
+import threading
+from concurrent.futures import Future
+from contextlib import nullcontext
+from typing import List, Union, Dict, Any, Optional, Iterable, Iterator, Tuple
 from dataclasses import dataclass, asdict
-from .token_data import OriginalText, Sentence, Token, VocabExpression, VocabExpressionExample
-from ..agents.single_token_difficulty_estimation import SingleTokenDifficultyEstimator
-from ..utils.get_lemma import get_lemma
+from .token_data import (OriginalText, Sentence, Token, VocabExpression, VocabExpressionExample,
+                         GrammarRule, GrammarExample, intern_string)
+from .processing_handle import ProcessingHandle, ProcessingCancelled
+from ..utils.lemma_service import LemmaService
+from ..utils.get_pos_tag import tag_sentence_tokens
+from ..utils.nltk_resources import NLTKResourceMissingError
+from ..utils.lexicon import get_default_lexicon
+from ..utils.utility import get_memory_usage_kb
+from ..utils.canonical import canonicalize_token, canonicalize_sentence, sentence_hash
+from ..utils.complexity import sentence_complexity, DEFAULT_COMPLEXITY_THRESHOLD
+from ..utils.grammar_markers import classify_grammar_marker
+from ..utils.known_words import KnownWordsStore
+from ..utils.language import detect_language, has_pos_tagger, is_cjk_language, ENGLISH
+from ..utils.cjk_segmenter import get_default_segmenter
+from ..utils.config import MAX_SENTENCE_LENGTH
+from ..utils.context_window import token_position
+from .token_splitter import split_tokens as split_tokens_for_language
+from .document_scanner import DEFAULT_CHUNK_SIZE
+from .structured_output import StructuredDataWriter
+from .pipeline import Pipeline, PipelineContext, Stage, SplitStage, TokenizeStage, CollectSink, WriterSink
 
 class TextProcessor:
     """文本处理器：将原始文本分割成结构化数据"""
     
-    def __init__(self, output_base_dir: str = "data"):
+    def __init__(self, output_base_dir: str = "data", batch_difficulty: bool = False,
+                 grammar_analysis: bool = False, grammar_batch_size: int = 8,
+                 grammar_min_complexity: Optional[float] = DEFAULT_COMPLEXITY_THRESHOLD,
+                 grammar_marker_fallback: bool = False, learner_id: Optional[str] = None,
+                 columnar_tokens: bool = False, omit_bodies: bool = False, implicit_whitespace: bool = False,
+                 max_sentence_length: Optional[int] = MAX_SENTENCE_LENGTH, sentence_batch_size: int = 16):
         """
         初始化文本处理器
         
         Args:
             output_base_dir: 输出基础目录
+            batch_difficulty: 是否按句子批量评估难度（流式返回，结果到达即写入token）
+            grammar_analysis: 是否进行语法分析（与token处理并行，结果写入grammar_annotations）
+            grammar_batch_size: 每次语法分析请求包含的句子数
+            grammar_min_complexity: 本地复杂度分数低于该阈值的句子不做语法分析；None表示分析所有句子
+            grammar_marker_fallback: 本地规则无法确定的语法标记词是否按句子批量交给LLM判断
+            learner_id: 学习者ID（可选，只能包含字母、数字、下划线和连字符）。指定时加载该学习者的已掌握词汇，已掌握的词不再评估难度、不生成vocab
+            columnar_tokens: 是否把token存入列式的TokenTable（Sentence.tokens为表上的视图，适合很长的文本）
+            omit_bodies: 保存时是否省略token_body和sentence_body（只写偏移，原文在original_texts.json中只保存一份）
+            implicit_whitespace: 是否不为空白创建token（空白由相邻token偏移之间的空隙表示，可用fill_whitespace还原）
+            max_sentence_length: 句子最大长度（字符数），超长的句子在从句标点或空白处切分；None表示不切分
+            sentence_batch_size: 处理流水线中每批的句子数（各阶段按批处理；流式处理时使用window_size）
         """
         self.output_base_dir = output_base_dir
         os.makedirs(output_base_dir, exist_ok=True)
-        # 初始化难度评估器
-        self.difficulty_estimator = SingleTokenDifficultyEstimator()
+        # 难度评估器在首次使用时创建（避免导入时加载OpenAI）
+        self._difficulty_estimator = None
+        # 难度评估结果缓存，键为规范化后的token（取消处理后已获得的结果仍可复用）
+        self.difficulty_cache: Dict[str, str] = {}
+        # 词汇解释缓存，键为规范化后的lemma（或token）
+        self.explanation_cache: Dict[str, str] = {}
+        self.batch_difficulty = batch_difficulty
+        self.batch_difficulty_estimator = None
+        # 当前文本的语言（处理每个文本时根据字符分布检测），决定分词方式和难度评估提示词
+        self.language = ENGLISH
+        # lemma服务（进程内单例，带缓存）
+        self.lemma_service = LemmaService.instance()
+        # 预编译词典（可选）：已有难度结论的词不再调用难度评估器
+        self.lexicon = get_default_lexicon()
         # 初始化vocab转换器
         self.vocab_converter = None
         self.vocab_counter = 1
+        # 缺少NLTK数据时只提示一次
+        self._nltk_warning_shown = False
+        # 多进程处理时保护vocab/语法数据文件的读-改-写
+        self._vocab_file_lock = None
+        # 多进程处理时进程间共享的ID计数器（属性名 -> multiprocessing.Value），保证各进程分配的ID不重复
+        self._shared_counters: Dict[str, Any] = {}
+        # 语法分析（批量请求，按规范化句子的哈希缓存）
+        self.grammar_analysis = grammar_analysis
+        self.grammar_batch_size = grammar_batch_size
+        self.grammar_assistant = None
+        self.grammar_cache: Dict[str, List[Dict[str, Any]]] = {}   # 句子哈希 -> [{"rule_id", "explanation"}]
+        self.grammar_rules: Dict[str, GrammarRule] = {}            # 规范化的规则名 -> GrammarRule
+        self.grammar_rule_counter = 1
+        self.grammar_min_complexity = grammar_min_complexity
+        self._grammar_data_loaded = False
+        self._grammar_lock = threading.Lock()
+        # 语法标记词识别：本地规则表 -> 按 (lemma, POS标签) 的缓存 -> 按句子批量的LLM判断
+        self.grammar_marker_fallback = grammar_marker_fallback
+        self.grammar_marker_assistant = None
+        self.grammar_marker_cache: Dict[Tuple[str, Optional[str]], bool] = {}
+        self.columnar_tokens = columnar_tokens
+        self.omit_bodies = omit_bodies
+        self.implicit_whitespace = implicit_whitespace
+        self.max_sentence_length = max_sentence_length
+        self.sentence_batch_size = sentence_batch_size
+        # 学习者已掌握词汇（已标星的vocab自动加入）
+        self.learner_id = learner_id
+        self.known_words: Optional[KnownWordsStore] = None
+        if learner_id:
+            self.known_words = KnownWordsStore.load(learner_id, output_base_dir)
+            self.known_words.seed_from_vocab_file(os.path.join(output_base_dir, "vocab_data", "vocab_data.json"))
+        # 语法分析统计：句子数、因简单跳过的句子数、缓存命中数、实际请求数、节省的请求数
+        self.grammar_stats: Dict[str, int] = {
+            "sentences": 0, "skipped_simple": 0, "cache_hits": 0, "requests": 0, "requests_saved": 0
+        }
+    
+    @property
+    def difficulty_estimator(self):
+        """单token难度评估器（首次访问或文本语言变化时创建）"""
+        estimator = self._difficulty_estimator
+        if estimator is None or getattr(estimator, "language", self.language) != self.language:
+            from ..agents.single_token_difficulty_estimation import SingleTokenDifficultyEstimator
+            self._difficulty_estimator = SingleTokenDifficultyEstimator(language=self.language)
+        return self._difficulty_estimator
+    
+    @difficulty_estimator.setter
+    def difficulty_estimator(self, estimator):
+        self._difficulty_estimator = estimator
         
     def _init_vocab_converter(self, vocab_data_file: str = None):
         """初始化vocab转换器"""
@@ -38,6 +136,22 @@ class TextProcessor:
             self.vocab_converter = TokenToVocabConverter(vocab_data_file)
             self.vocab_counter = self.vocab_converter.vocab_counter
     
+    def _next_id(self, counter_name: str) -> int:
+        """
+        分配下一个ID（vocab_counter或grammar_rule_counter）
+        
+        多进程处理时从共享计数器分配：各进程启动时从文件读到的计数器相同，只用本进程的计数器会分配出重复的ID
+        """
+        shared = self._shared_counters.get(counter_name)
+        if shared is None:
+            next_id = getattr(self, counter_name)
+        else:
+            with shared.get_lock():
+                next_id = max(shared.value, getattr(self, counter_name))
+                shared.value = next_id + 1
+        setattr(self, counter_name, next_id + 1)
+        return next_id
+    
     def split_sentences(self, text: str) -> List[str]:
         """
         将文本按句子分隔
@@ -48,68 +162,37 @@ class TextProcessor:
         Returns:
             List[str]: 句子列表
         """
-        # 使用正则表达式分割句子
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        # 使用正则表达式分割句子（中日文句末标点后通常没有空格）
+        sentences = re.split(r'(?<=[.!?])\s+|(?<=[。！？])', text)
         
         # 过滤掉空字符串并去除首尾空白
         sentences = [sentence.strip() for sentence in sentences if sentence.strip()]
         
         return sentences
     
-    def split_tokens(self, text: str) -> List[Dict[str, Any]]:
+    def split_tokens(self, text: str, language: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        将文本分割成tokens
+        将文本分割成tokens（按语言选择分词器：以空格分词的语言按单词切分，中日文按词典分词）
         
         Args:
             text: 输入文本
+            language: 文本语言（可选，默认使用当前文本的语言）
             
         Returns:
             List[Dict[str, Any]]: token列表
         """
-        if not text:
-            return []
-        
-        tokens = []
-        
-        # 使用正则表达式匹配不同类型的token
-        word_pattern = r'\b[\w\'-]+\b'
-        punctuation_pattern = r'[^\w\s]'
-        space_pattern = r'\s+'
-        
-        # 组合所有模式
-        combined_pattern = f'({word_pattern})|({punctuation_pattern})|({space_pattern})'
-        
-        matches = re.finditer(combined_pattern, text)
-        
-        for match in matches:
-            token_body = match.group(0)
-            
-            # 确定token类型
-            if match.group(1):  # 单词
-                token_type = "text"
-            elif match.group(2):  # 标点符号
-                token_type = "punctuation"
-            elif match.group(3):  # 空白字符
-                token_type = "space"
-            else:
-                continue
-            
-            token = {
-                "token_body": token_body,
-                "token_type": token_type
-            }
-            
-            tokens.append(token)
-        
-        return tokens
+        return split_tokens_for_language(text, language or self.language)
     
-    def assess_token_difficulty(self, token_body: str, context: str = "") -> str:
+    def assess_token_difficulty(self, token_body: str, context: str = "", handle: Optional[ProcessingHandle] = None,
+                                lemma: Optional[str] = None) -> str:
         """
         评估token的难度级别
         
         Args:
             token_body: token内容
             context: 上下文（可选）
+            handle: 可选的处理句柄，取消或超时时抛出ProcessingCancelled
+            lemma: token的lemma（可选，用于查询学习者已掌握词汇）
             
         Returns:
             str: 难度级别 ("easy" 或 "hard")
@@ -119,28 +202,126 @@ class TextProcessor:
             if not token_body or not token_body.strip():
                 return None
             
+            # 优先使用已掌握词汇、缓存结果和词典中的难度结论
+            cached = self._known_difficulty(token_body, lemma)
+            if cached:
+                return cached
+            
             # 调用难度评估器
-            difficulty_result = self.difficulty_estimator.run(token_body, verbose=False)
+            difficulty_result = self.difficulty_estimator.run(token_body, verbose=False, handle=handle)
             
             # 清理结果，确保只返回 "easy" 或 "hard"
             difficulty_result = difficulty_result.strip().lower()
             if difficulty_result in ["easy", "hard"]:
+                self.difficulty_cache[canonicalize_token(token_body)] = difficulty_result
                 return difficulty_result
             else:
                 # 如果结果不是预期的格式，返回默认值
                 print(f"⚠️  警告：token '{token_body}' 的难度评估结果格式异常: '{difficulty_result}'")
                 return "easy"  # 默认返回easy
                 
+        except ProcessingCancelled:
+            raise
         except Exception as e:
             print(f"❌ 评估token '{token_body}' 难度时发生错误: {e}")
             return None
     
-    def get_token_lemma(self, token_body: str) -> str:
+    def assess_tokens_difficulty(self, tokens: List[Token], handle: Optional[ProcessingHandle] = None):
+        """
+        批量评估一组token（通常是一个句子）的难度
+        
+        未缓存的text类型token合并为一次流式请求，每个结果一解析完成就写入
+        对应的token和缓存；批量结果中缺失的token回退到逐个评估。
+        
+        Args:
+            tokens: Token对象列表
+            handle: 可选的处理句柄
+        """
+        # 规范形式 -> 等待结果的token；每个规范形式只发送第一次出现的原文
+        pending: Dict[str, List[Token]] = {}
+        for token in tokens:
+            if not self._needs_difficulty(token):
+                continue
+            cached = self._known_difficulty(token.token_body, token.lemma)
+            if cached:
+                token.difficulty_level = cached
+            else:
+                pending.setdefault(canonicalize_token(token.token_body), []).append(token)
+        if not pending:
+            return
+        surface_to_key = {waiting[0].token_body: key for key, waiting in pending.items()}
+        
+        estimator = self.batch_difficulty_estimator
+        if estimator is None or getattr(estimator, "language", self.language) != self.language:
+            from ..agents.batch_token_difficulty_estimation import BatchTokenDifficultyEstimator
+            self.batch_difficulty_estimator = BatchTokenDifficultyEstimator(language=self.language)
+        try:
+            for word, level in self.batch_difficulty_estimator.iter_run(list(surface_to_key), handle=handle):
+                key = surface_to_key.get(word, canonicalize_token(word))
+                waiting = pending.pop(key, None)
+                if waiting is None:
+                    continue
+                self.difficulty_cache[key] = level
+                for token in waiting:
+                    token.difficulty_level = level
+        except ProcessingCancelled:
+            raise
+        except Exception as e:
+            print(f"⚠️  批量难度评估失败，回退到逐个评估: {e}")
+        
+        for waiting in pending.values():
+            difficulty_level = self.assess_token_difficulty(waiting[0].token_body, handle=handle, lemma=waiting[0].lemma)
+            for token in waiting:
+                token.difficulty_level = difficulty_level
+    
+    def _needs_difficulty(self, token: Token) -> bool:
+        """
+        判断token是否需要评估难度：中日文中词典没有覆盖的单字不是确定的词，
+        不评估难度（difficulty_level保持None），因此也不生成vocab
+        
+        Args:
+            token: Token对象
+            
+        Returns:
+            bool: 是否需要评估
+        """
+        if token.token_type != "text" or not token.token_body.strip():
+            return False
+        return not (is_cjk_language(self.language) and get_default_segmenter().is_fallback(token.token_body))
+    
+    def _known_difficulty(self, token_body: str, lemma: Optional[str] = None) -> Optional[str]:
+        """
+        不调用评估器时已知的难度：先查缓存，再查预编译词典；学习者已掌握的词一律为easy
+        
+        Args:
+            token_body: token内容
+            lemma: token的lemma（可选）
+            
+        Returns:
+            Optional[str]: "easy"/"hard"，未知时返回None
+        """
+        key = canonicalize_token(token_body)
+        cached = self.difficulty_cache.get(key)
+        if cached is None and self.lexicon is not None:
+            cached = self.lexicon.difficulty(key)
+            if cached:
+                self.difficulty_cache[key] = cached
+        if self.known_words is not None and self.known_words.knows(token_body, lemma):
+            # 未知难度时省去一次难度评估；已知为hard时省去一次vocab生成
+            if cached is None:
+                self.known_words.record_saved("difficulty", lemma or token_body)
+            elif cached == "hard":
+                self.known_words.record_saved("vocab", lemma or token_body)
+            return "easy"
+        return cached
+    
+    def get_token_lemma(self, token_body: str, pos_tag: Optional[str] = None) -> str:
         """
         获取token的lemma形式
         
         Args:
             token_body: token内容
+            pos_tag: 句子级POS标注得到的标签（可选）
             
         Returns:
             str: lemma形式，如果无法获取则返回None
@@ -150,15 +331,133 @@ class TextProcessor:
             if not token_body or not token_body.strip():
                 return None
             
-            # 调用get_lemma函数
-            lemma = get_lemma(token_body)
+            # 调用lemma服务
+            lemma = self.lemma_service.lemmatize(token_body, pos_tag)
             return lemma
             
         except Exception as e:
             print(f"❌ 获取token '{token_body}' 的lemma时发生错误: {e}")
             return None
     
-    def process_text_to_structured_data(self, text: Union[str, str], text_id: int, text_title: str = "") -> OriginalText:
+    def tag_and_lemmatize_tokens(self, tokens: List[Token]):
+        """
+        对一个句子的text类型token进行一次整句POS标注，并据此获取lemma
+        
+        Args:
+            tokens: 句子的Token对象列表
+        """
+        if not has_pos_tagger(self.language):
+            # 英语POS标注和WordNet lemma不适用于中日韩文（韩文虽然按空格分词，也不能用英语标注器）
+            return
+        try:
+            tag_sentence_tokens([tokens])
+            text_tokens = [token for token in tokens if token.token_type == "text"]
+            lemmas = self.lemma_service.lemmatize_many(
+                [token.token_body for token in text_tokens],
+                [token.pos_tag for token in text_tokens]
+            )
+        except NLTKResourceMissingError as e:
+            # 离线且缺少数据时不下载：只使用预编译词典，词典中没有的词跳过pos_tag和lemma
+            if not self._nltk_warning_shown:
+                print(f"⚠️  {e}")
+                self._nltk_warning_shown = True
+            if self.lexicon is not None:
+                for token in tokens:
+                    if token.token_type == "text":
+                        entry = self.lexicon.lookup(token.token_body)
+                        if entry is not None:
+                            token.pos_tag = entry.pos_tag
+                            token.lemma = intern_string(entry.lemma())
+            return
+        for token, lemma in zip(text_tokens, lemmas):
+            token.lemma = intern_string(lemma)
+    
+    def detect_grammar_markers(self, tokens: List[Token], sentence_text: str,
+                               handle: Optional[ProcessingHandle] = None):
+        """
+        识别一个句子中的语法标记词，写入token.is_grammar_marker
+        
+        1. 封闭词类（连词、情态动词、关系词等）由本地规则表结合句子POS标签判断
+        2. 规则无法确定的词先查 (lemma, POS标签) 缓存
+        3. 仍未确定的词（启用grammar_marker_fallback时）合并为一次按句子的LLM请求，结果写入缓存；
+           未启用或请求失败时保持False
+        
+        Args:
+            tokens: 句子的Token对象列表（已完成POS标注）
+            sentence_text: 句子内容
+            handle: 可选的处理句柄
+        """
+        ambiguous: Dict[Tuple[str, Optional[str]], List[Token]] = {}
+        for token in tokens:
+            if token.token_type != "text":
+                continue
+            decision = classify_grammar_marker(token.token_body, token.pos_tag, token.lemma)
+            if decision is None:
+                key = (canonicalize_token(token.lemma or token.token_body), token.pos_tag)
+                decision = self.grammar_marker_cache.get(key)
+                if decision is None:
+                    ambiguous.setdefault(key, []).append(token)
+                    decision = False
+            token.is_grammar_marker = decision
+        
+        if not ambiguous or not self.grammar_marker_fallback:
+            return
+        if self.grammar_marker_assistant is None:
+            from ..agents.batch_grammar_marker import BatchGrammarMarkerAssistant
+            self.grammar_marker_assistant = BatchGrammarMarkerAssistant()
+        
+        # 每个 (lemma, POS标签) 只发送句中第一次出现的token
+        requested = {waiting[0].sentence_token_id: key for key, waiting in ambiguous.items()}
+        words = {index: ambiguous[key][0].token_body for index, key in requested.items()}
+        try:
+            for index, is_marker in self.grammar_marker_assistant.iter_run(sentence_text, words, handle=handle):
+                key = requested[index]
+                self.grammar_marker_cache[key] = is_marker
+                for token in ambiguous[key]:
+                    token.is_grammar_marker = is_marker
+        except ProcessingCancelled:
+            raise
+        except Exception as e:
+            print(f"⚠️  语法标记词判断失败: {e}")
+    
+    def build_pipeline(self, writer: Optional[StructuredDataWriter] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       batch_size: Optional[int] = None) -> Pipeline:
+        """
+        按当前配置组装处理流水线：分句 -> 分词 -> POS/lemma和语法标记词 -> 语法 -> 难度 -> vocab -> 输出
+        
+        Args:
+            writer: 输出目标（可选）。指定时每批处理完立即写出（流式处理），语法分析同步进行；
+                    未指定时句子收集在context中，语法分析在后台线程中与其他阶段并行
+            chunk_size: 分块读取时每次读取的字符数
+            batch_size: 每批的句子数（可选，默认sentence_batch_size）
+            
+        Returns:
+            Pipeline: 处理流水线
+        """
+        streaming = writer is not None
+        pipeline = Pipeline([
+            SplitStage(self.max_sentence_length, chunk_size),
+            TokenizeStage(self.implicit_whitespace),
+            Stage("tagging", self._tag_sentences, cache=self.grammar_marker_cache),
+            # 语法分析只依赖POS标注：紧跟在标注之后提交，与难度评估和vocab生成并行
+            # 后台处理时请求跨批凑满grammar_batch_size句；流式处理时按窗口同步进行（写出前需要结果）
+            Stage("grammar", self._analyze_sentences_grammar if streaming else self._pool_sentences_grammar,
+                  enabled=self.grammar_analysis, parallel=not streaming,
+                  flush=None if streaming else self._flush_grammar_pool,
+                  finish=lambda context: self.print_grammar_report(),
+                  close=lambda context: self._save_grammar_data(), cache=self.grammar_cache),
+            Stage("difficulty", self._assess_sentences, cache=self.difficulty_cache),
+            # 取消时已生成的vocab照常保存
+            Stage("vocab", self._generate_vocab, close=self._flush_vocab, cache=self.explanation_cache),
+            WriterSink(writer) if streaming else CollectSink(self.columnar_tokens),
+        ], batch_size or self.sentence_batch_size)
+        if streaming:
+            # 流式处理时每个窗口的vocab处理完就移出内存，结束时一次保存
+            pipeline.add_hook("vocab", after=lambda batch, context: self._spill_vocab(context))
+        return pipeline
+    
+    def process_text_to_structured_data(self, text: Union[str, str], text_id: int, text_title: str = "",
+                                        handle: Optional[ProcessingHandle] = None) -> OriginalText:
         """
         将文本处理成结构化数据
         
@@ -166,10 +465,42 @@ class TextProcessor:
             text: 文本内容或文件路径
             text_id: 文本ID
             text_title: 文本标题
+            handle: 可选的处理句柄。取消或超时时停止发出LLM请求，
+                    已完成部分保存在handle.partial_result中并抛出ProcessingCancelled
             
         Returns:
             OriginalText: 结构化的文本数据
         """
+        context = self._create_context(text, text_id, text_title, handle)
+        for _ in self._iter_context(context):
+            pass
+        return context.original_text()
+    
+    def process_iter(self, text: Union[str, str], text_id: int, text_title: str = "",
+                     handle: Optional[ProcessingHandle] = None,
+                     batch_size: Optional[int] = None) -> Iterator[Sentence]:
+        """
+        处理文本，每个句子完成所有阶段（包括后台的语法分析）后立即产出，不必等整篇文本处理完
+        
+        句子按批完成（每批 batch_size 句），调用方可以先渲染或保存前面的段落。提前停止迭代时
+        后续的句子不再处理，等正在进行的语法请求结束后，已生成的vocab和语法数据照常保存
+        
+        Args:
+            text: 文本内容或文件路径
+            text_id: 文本ID
+            text_title: 文本标题
+            handle: 可选的处理句柄（取消时抛出ProcessingCancelled，已完成部分在handle.partial_result中）
+            batch_size: 每批的句子数（可选，默认sentence_batch_size）
+            
+        Yields:
+            Sentence: 按原文顺序，标注完成的句子
+        """
+        context = self._create_context(text, text_id, text_title, handle)
+        yield from self._iter_context(context, batch_size)
+    
+    def _create_context(self, text: str, text_id: int, text_title: str,
+                        handle: Optional[ProcessingHandle]) -> PipelineContext:
+        """读取文本（或文件）、检测语言，创建处理状态"""
         # 如果输入是文件路径，先读取文件
         if os.path.isfile(text):
             with open(text, 'r', encoding='utf-8') as file:
@@ -184,72 +515,373 @@ class TextProcessor:
         # 初始化vocab转换器
         self._init_vocab_converter()
         
-        # 分割句子
-        sentence_texts = self.split_sentences(text_content)
-        
-        # 创建句子对象列表
-        sentences = []
-        global_token_id = 0
-        vocab_expressions = []  # 存储生成的vocab
-        
-        for sentence_id, sentence_text in enumerate(sentence_texts, 1):
-            # 分割tokens
-            token_dicts = self.split_tokens(sentence_text)
-            
-            # 创建Token对象列表
-            tokens = []
-            for token_id, token_dict in enumerate(token_dicts, 1):
-                # 评估难度级别和获取lemma（只对text类型的token）
-                difficulty_level = None
-                lemma = None
-                if token_dict["token_type"] == "text":
-                    difficulty_level = self.assess_token_difficulty(token_dict["token_body"], sentence_text)
-                    lemma = self.get_token_lemma(token_dict["token_body"])
-                
-                token = Token(
-                    token_body=token_dict["token_body"],
-                    token_type=token_dict["token_type"],
-                    global_token_id=global_token_id,
-                    sentence_token_id=token_id,
-                    difficulty_level=difficulty_level,
-                    lemma=lemma,
-                    linked_vocab_id=None  # 初始化为None，稍后更新
-                )
-                tokens.append(token)
-                global_token_id += 1
-            
-            # 创建Sentence对象
-            sentence = Sentence(
-                text_id=text_id,
-                sentence_id=sentence_id,
-                sentence_body=sentence_text,
-                grammar_annotations=[],
-                vocab_annotations=[],
-                tokens=tokens
-            )
-            sentences.append(sentence)
-            
-            # 为hard难度的token生成vocab
-            for token in tokens:
+        # 检测语言（决定分词器和难度评估提示词），再单遍扫描整篇文本得到句子和token
+        self.language = detect_language(text_content)
+        return PipelineContext(text_id, text_title, text=text_content, language=self.language, handle=handle)
+    
+    def _iter_context(self, context: PipelineContext, batch_size: Optional[int] = None) -> Iterator[Sentence]:
+        """运行处理流水线，按原文顺序逐句产出"""
+        try:
+            for _, sentence in self.build_pipeline(batch_size=batch_size).iter_sentences(context):
+                yield sentence
+        except ProcessingCancelled:
+            # 保留已完成的部分：已生成的vocab照常保存，难度和语法结果留在缓存中
+            if context.handle is not None:
+                context.handle.partial_result = context.original_text()
+            raise
+        finally:
+            if self.known_words is not None:
+                self.known_words.save(self._vocab_file_lock)
+        
+        self.print_known_words_report()
+    
+    def _tag_sentences(self, sentences: List[Sentence], context: PipelineContext):
+        """
+        POS/lemma阶段：每个句子整句一次POS标注（标签同时用于pos_tag和lemma），再识别语法标记词
+        
+        Args:
+            sentences: 一批句子
+            context: 处理状态
+        """
+        # 流式处理时语言在读入第一块后才确定
+        self.language = context.language or self.language
+        for sentence in sentences:
+            self.tag_and_lemmatize_tokens(sentence.tokens)
+            self.detect_grammar_markers(sentence.tokens, sentence.sentence_body, handle=context.handle)
+    
+    def _assess_sentences(self, sentences: List[Sentence], context: PipelineContext):
+        """
+        难度阶段：评估text类型token的难度（lemma已知，可查询已掌握词汇）
+        
+        Args:
+            sentences: 一批句子
+            context: 处理状态
+        """
+        for sentence in sentences:
+            if self.batch_difficulty:
+                self.assess_tokens_difficulty(sentence.tokens, handle=context.handle)
+                continue
+            for token in sentence.tokens:
+                if self._needs_difficulty(token):
+                    token.difficulty_level = self.assess_token_difficulty(
+                        token.token_body, sentence.sentence_body, handle=context.handle, lemma=token.lemma)
+    
+    def _generate_vocab(self, sentences: List[Sentence], context: PipelineContext):
+        """
+        vocab阶段：为hard难度的token生成vocab，追加到context.vocab_expressions
+        
+        Args:
+            sentences: 一批句子
+            context: 处理状态
+        """
+        for sentence in sentences:
+            for token in sentence.tokens:
                 if token.token_type == "text" and token.difficulty_level == "hard":
-                    vocab = self._generate_vocab_for_token(token, sentence, text_id)
+                    vocab = self._generate_vocab_for_token(token, sentence, context.text_id, handle=context.handle)
                     if vocab:
-                        vocab_expressions.append(vocab)
+                        context.vocab_expressions.append(vocab)
                         # 更新token的linked_vocab_id
                         token.linked_vocab_id = vocab.vocab_id
+    
+    def _flush_vocab(self, context: PipelineContext):
+        """保存context中尚未保存的vocab（连同流式处理时暂存在临时文件中的vocab），vocab_data.json只写一次"""
+        vocab_dicts = [self._vocab_to_dict(vocab) for vocab in context.vocab_expressions]
+        context.vocab_expressions = []
+        spill = context.state.pop("vocab_spill", None)
+        if spill is not None:
+            with spill:
+                spill.seek(0)
+                vocab_dicts = [json.loads(line) for line in spill] + vocab_dicts
+        if vocab_dicts:
+            self._save_vocab_dicts(vocab_dicts)
+    
+    def _spill_vocab(self, context: PipelineContext):
+        """
+        流式处理时把一个窗口的vocab逐行追加到临时文件，不留在内存中
+        
+        每个窗口都重写vocab_data.json会使读写量随窗口数平方增长，所以处理结束时（_flush_vocab）才写一次
+        """
+        if not context.vocab_expressions:
+            return
+        spill = context.state.get("vocab_spill")
+        if spill is None:
+            spill = context.state["vocab_spill"] = tempfile.TemporaryFile('w+', encoding='utf-8')
+        for vocab in context.vocab_expressions:
+            spill.write(json.dumps(self._vocab_to_dict(vocab), ensure_ascii=False) + "\n")
+        context.vocab_expressions = []
+    
+    def _analyze_sentences_grammar(self, sentences: List[Sentence], context: PipelineContext):
+        """
+        语法阶段（流式处理时同步进行）：按本地复杂度分数筛选后批量分析，结果写入grammar_annotations
+        
+        Args:
+            sentences: 一批句子（已完成POS标注）
+            context: 处理状态
+        """
+        results = self.analyze_grammar([sentence.sentence_body for sentence in sentences], context.handle,
+                                       [sentence_complexity(sentence.tokens) for sentence in sentences])
+        self._apply_grammar_results(sentences, results, context.text_id)
+    
+    def _pool_sentences_grammar(self, sentences: List[Sentence], context: PipelineContext) -> Future:
+        """
+        语法阶段（后台线程）：句子加入请求缓冲，凑满grammar_batch_size句才发出请求，剩下的句子与后面的批一起请求；
+        一批句子的结果都到达后写入grammar_annotations
+        
+        Args:
+            sentences: 一批句子（已完成POS标注）
+            context: 处理状态
+            
+        Returns:
+            Future: 这一批句子都写入结果后完成
+        """
+        state = context.state.get("grammar")
+        if state is None:
+            self._load_grammar_data()
+            state = context.state["grammar"] = {"pool": _GrammarRequestPool(self, context.handle), "waiting": []}
+        done = Future()
+        state["waiting"].append((sentences, [], done))
+        try:
+            keys = state["waiting"][-1][1]
+            for sentence in sentences:
+                keys.append(state["pool"].add(sentence.sentence_body, sentence_complexity(sentence.tokens)))
+            self._apply_pooled_grammar(state, context.text_id)
+        except BaseException as e:
+            # 缓冲中的批不会再有结果
+            self._fail_pooled_grammar(state, e)
+            raise
+        return done
+    
+    def _flush_grammar_pool(self, context: PipelineContext):
+        """所有批都提交后请求缓冲中剩下的句子"""
+        state = context.state.get("grammar")
+        if state is None:
+            return
+        try:
+            state["pool"].flush()
+        except BaseException as e:
+            self._fail_pooled_grammar(state, e)
+            raise
+        state["pool"].record_stats()
+        self._apply_pooled_grammar(state, context.text_id)
+    
+    def _apply_pooled_grammar(self, state: Dict[str, Any], text_id: int):
+        """把结果写入句子都已有结果（不在请求缓冲中）的批"""
+        pending = state["pool"].pending
+        for item in list(state["waiting"]):
+            sentences, keys, done = item
+            if any(key in pending for key in keys if key):
+                continue
+            state["waiting"].remove(item)
+            self._apply_grammar_results(sentences, [self.grammar_cache.get(key, []) if key else [] for key in keys],
+                                        text_id)
+            done.set_result(sentences)
+    
+    @staticmethod
+    def _fail_pooled_grammar(state: Dict[str, Any], error: BaseException):
+        for _, _, done in state["waiting"]:
+            done.set_exception(error)
+        state["waiting"].clear()
+    
+    def process_file_streaming(self, input_path: str, text_id: int, output_dir: str = None,
+                               chunk_size: int = DEFAULT_CHUNK_SIZE, window_size: int = 64,
+                               handle: Optional[ProcessingHandle] = None) -> int:
+        """
+        流式处理文本文件：分块读取，按窗口标注句子，每个窗口处理完立即写出
         
-        # 创建OriginalText对象
-        original_text = OriginalText(
-            text_id=text_id,
-            text_title=text_title,
-            text_by_sentence=sentences
-        )
+        内存占用只与块大小、窗口大小和最长句子有关，与文件大小无关（缓存和规则库随词汇量增长）；
+        生成的vocab逐窗口暂存到临时文件，结束时一次写入vocab_data.json。语法分析按窗口同步进行。
         
-        # 保存vocab数据
-        if vocab_expressions:
-            self._save_vocab_data(vocab_expressions)
+        输出文件与 process_file 相同。语言只根据读入的第一块检测，不是全文：process_file取全文开头
+        的字符样本（detect_language），chunk_size小于样本长度时流式处理的样本更短，两者的分词方式可能不同
         
-        return original_text
+        Args:
+            input_path: 输入文件路径
+            text_id: 文本ID
+            output_dir: 输出目录路径，如果为None则使用默认路径
+            chunk_size: 每次读取的字符数
+            window_size: 每个窗口的句子数（语法分析和写出的单位）
+            handle: 可选的处理句柄
+            
+        Returns:
+            int: 处理的句子数量
+        """
+        if output_dir is None:
+            output_dir = os.path.join(self.output_base_dir, f"text_{text_id:03d}")
+        self._init_vocab_converter()
+        
+        with open(input_path, 'r', encoding='utf-8') as source, \
+                StructuredDataWriter(output_dir, text_id, os.path.basename(input_path),
+                                     omit_bodies=self.omit_bodies) as writer:
+            context = PipelineContext(text_id, os.path.basename(input_path), source=source, handle=handle)
+            try:
+                self.build_pipeline(writer, chunk_size, window_size).run(context)
+                if self.omit_bodies:
+                    # 原文再顺序读一遍写入original_texts.json（偏移指向它）
+                    source.seek(0)
+                    for chunk in iter(lambda: source.read(chunk_size), ""):
+                        writer.write_text(chunk)
+            finally:
+                if self.known_words is not None:
+                    self.known_words.save(self._vocab_file_lock)
+        
+        self.print_known_words_report()
+        print(f"✅ 流式处理完成: {writer.sentence_count} 个句子，{writer.token_count} 个token -> {output_dir}")
+        return writer.sentence_count
+    
+    def analyze_grammar(self, sentence_texts: List[str], handle: Optional[ProcessingHandle] = None,
+                        complexities: Optional[List[float]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        批量分析句子的语法规则
+        
+        Args:
+            sentence_texts: 句子列表
+            handle: 可选的处理句柄
+            complexities: 与句子对应的复杂度分数（可选）；低于grammar_min_complexity的句子跳过
+            
+        Returns:
+            List[List[Dict[str, Any]]]: 每个句子的 [{"rule_id", "explanation"}]，跳过的句子为空列表
+        """
+        if complexities is None:
+            complexities = [None] * len(sentence_texts)
+        return self._analyze_grammar_stream(zip(sentence_texts, complexities), handle)
+    
+    def _analyze_grammar_stream(self, items: Iterable[Tuple[str, Optional[float]]],
+                                handle: Optional[ProcessingHandle] = None) -> List[List[Dict[str, Any]]]:
+        """
+        逐句接收 (句子, 复杂度分数)，凑满grammar_batch_size句就发出一次流式请求（见_GrammarRequestPool）
+        
+        Returns:
+            List[List[Dict[str, Any]]]: 与输入顺序一致的分析结果
+        """
+        self._load_grammar_data()
+        pool = _GrammarRequestPool(self, handle)
+        keys = [pool.add(text, complexity) for text, complexity in items]
+        pool.flush()
+        pool.record_stats()
+        return [self.grammar_cache.get(key, []) if key else [] for key in keys]
+    
+    def grammar_report(self) -> Dict[str, int]:
+        """
+        语法分析统计
+        
+        Returns:
+            Dict[str, int]: sentences（句子数）、skipped_simple（因复杂度低跳过）、cache_hits（缓存命中）、
+                            requests（实际请求数）、requests_saved（相比分析所有句子节省的请求数）
+        """
+        return dict(self.grammar_stats)
+    
+    def print_grammar_report(self):
+        """打印语法分析统计"""
+        stats = self.grammar_report()
+        print(f"📊 语法分析: 共 {stats['sentences']} 句，跳过简单句 {stats['skipped_simple']} 句，"
+              f"缓存命中 {stats['cache_hits']} 句，请求 {stats['requests']} 次，节省 {stats['requests_saved']} 次")
+    
+    def print_known_words_report(self):
+        """打印学习者已掌握词汇的统计（未指定学习者时不打印）"""
+        if self.known_words is None:
+            return
+        report = self.known_words.report()
+        print(f"📊 学习者 {self.learner_id}: 已掌握 {report['known_words']} 个词，"
+              f"累计省去 {report['difficulty_calls_saved']} 次难度评估、{report['vocab_calls_saved']} 次vocab生成")
+    
+    def _register_grammar_rules(self, analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """把一个句子的分析结果中的规则登记到规则库（同名规则归并），返回 [{"rule_id", "explanation"}]"""
+        entries = []
+        rules = analysis.get("rules") or []
+        for rule in rules if isinstance(rules, list) else []:
+            if not isinstance(rule, dict) or not str(rule.get("name", "")).strip():
+                continue
+            name = str(rule["name"]).strip()
+            explanation = str(rule.get("explanation", ""))
+            key = canonicalize_sentence(name)
+            with self._grammar_lock:
+                grammar_rule = self.grammar_rules.get(key)
+                if grammar_rule is None:
+                    grammar_rule = GrammarRule(rule_id=self._next_id("grammar_rule_counter"), name=name,
+                                               explanation=explanation)
+                    self.grammar_rules[key] = grammar_rule
+            entries.append({"rule_id": grammar_rule.rule_id, "explanation": explanation})
+        return entries
+    
+    def _apply_grammar_results(self, sentences: List[Sentence], results: List[List[Dict[str, Any]]], text_id: int):
+        """把语法分析结果写入句子的grammar_annotations，并为规则添加例句"""
+        rules_by_id = {rule.rule_id: rule for rule in self.grammar_rules.values()}
+        for sentence, entries in zip(sentences, results):
+            rule_ids = []
+            for entry in entries:
+                rule_id = entry["rule_id"]
+                if rule_id in rule_ids:
+                    continue
+                rule_ids.append(rule_id)
+                rule = rules_by_id.get(rule_id)
+                if rule is not None:
+                    rule.examples.append(GrammarExample(
+                        rule_id=rule_id,
+                        text_id=text_id,
+                        sentence_id=sentence.sentence_id,
+                        explanation_context=entry.get("explanation", "")
+                    ))
+            sentence.grammar_annotations = rule_ids
+    
+    def _grammar_data_file(self) -> str:
+        return os.path.join(self.output_base_dir, "grammar_data", "grammar_data.json")
+    
+    def _load_grammar_data(self):
+        """首次使用时读取已保存的规则库和句子缓存"""
+        with self._grammar_lock:
+            if self._grammar_data_loaded:
+                return
+            self._grammar_data_loaded = True
+            grammar_data_file = self._grammar_data_file()
+            if not os.path.exists(grammar_data_file):
+                return
+            try:
+                with open(grammar_data_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for rule_dict in data.get('grammar_rules', []):
+                    examples = [GrammarExample(**example) for example in rule_dict.get('examples', [])]
+                    rule = GrammarRule(**{**rule_dict, 'examples': examples})
+                    self.grammar_rules[canonicalize_sentence(rule.name)] = rule
+                self.grammar_cache.update(data.get('sentence_cache', {}))
+                self.grammar_rule_counter = data.get('next_rule_id', len(self.grammar_rules) + 1)
+            except Exception as e:
+                print(f"读取现有语法数据失败: {e}")
+    
+    def _save_grammar_data(self):
+        """
+        保存规则库（含例句）和句子缓存
+        
+        在文件锁内重新读取文件并按rule_id合并：多进程处理时其他进程可能已写入了本进程没有的规则和例句
+        """
+        if not self._grammar_data_loaded:
+            return
+        try:
+            grammar_data_file = self._grammar_data_file()
+            os.makedirs(os.path.dirname(grammar_data_file), exist_ok=True)
+            with self._vocab_file_lock or nullcontext():
+                saved = {}
+                if os.path.exists(grammar_data_file):
+                    with open(grammar_data_file, 'r', encoding='utf-8') as f:
+                        saved = json.load(f)
+                rules = {rule_dict['rule_id']: rule_dict for rule_dict in saved.get('grammar_rules', [])}
+                with self._grammar_lock:
+                    for rule in self.grammar_rules.values():
+                        rule_dict = asdict(rule)
+                        known = {(example['text_id'], example['sentence_id']) for example in rule_dict['examples']}
+                        rule_dict['examples'] = [
+                            example for example in rules.get(rule.rule_id, {}).get('examples', [])
+                            if (example['text_id'], example['sentence_id']) not in known
+                        ] + rule_dict['examples']
+                        rules[rule.rule_id] = rule_dict
+                    grammar_data = {
+                        'grammar_rules': [rules[rule_id] for rule_id in sorted(rules)],
+                        'sentence_cache': {**saved.get('sentence_cache', {}), **self.grammar_cache},
+                        'next_rule_id': max(saved.get('next_rule_id', 1), self.grammar_rule_counter)
+                    }
+                with open(grammar_data_file, 'w', encoding='utf-8') as f:
+                    json.dump(grammar_data, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"❌ 保存语法数据失败: {e}")
     
     def save_structured_data(self, original_text: OriginalText, output_dir: str):
         """
@@ -259,62 +891,18 @@ class TextProcessor:
             original_text: 结构化的文本数据
             output_dir: 输出目录路径
         """
-        # 创建输出目录
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # 1. 保存 original_texts.json（只保留整体文本和 metadata）
-        original_text_data = {
-            "text_id": original_text.text_id,
-            "text_title": original_text.text_title,
-            "text_body": "\n".join([sentence.sentence_body for sentence in original_text.text_by_sentence]),
-            "sentence_ids": [sentence.sentence_id for sentence in original_text.text_by_sentence]
-        }
-        
-        with open(os.path.join(output_dir, "original_texts.json"), 'w', encoding='utf-8') as f:
-            json.dump(original_text_data, f, ensure_ascii=False, indent=2)
-        
-        # 2. 保存 sentences.json（按 sentence 拆分，避免重复 text_id）
-        sentences_data = []
-        for sentence in original_text.text_by_sentence:
-            # 收集该句子的所有token IDs
-            token_ids = [token.global_token_id for token in sentence.tokens]
-            
-            sentence_data = {
-                "sentence_id": sentence.sentence_id,
-                "text_id": sentence.text_id,
-                "sentence_body": sentence.sentence_body,
-                "token_ids": token_ids,
-                "grammar_annotations": sentence.grammar_annotations,
-                "vocab_annotations": sentence.vocab_annotations
-            }
-            sentences_data.append(sentence_data)
-        
-        with open(os.path.join(output_dir, "sentences.json"), 'w', encoding='utf-8') as f:
-            json.dump(sentences_data, f, ensure_ascii=False, indent=2)
-        
-        # 3. 保存 tokens.json（独立保存所有 token 信息，提供全局索引）
-        all_tokens = []
-        for sentence in original_text.text_by_sentence:
-            for token_index, token in enumerate(sentence.tokens):
-                token_data = {
-                    "text_id": sentence.text_id,
-                    "token_id": token.global_token_id,
-                    "sentence_id": sentence.sentence_id,
-                    "token_body": token.token_body,
-                    "token_type": token.token_type,
-                    "sentence_token_index": token_index,
-                    "difficulty_level": token.difficulty_level,
-                    "linked_vocab_id": token.linked_vocab_id,
-                    "pos_tag": token.pos_tag,
-                    "lemma": token.lemma,
-                    "is_grammar_marker": token.is_grammar_marker
-                }
-                all_tokens.append(token_data)
-        
-        with open(os.path.join(output_dir, "tokens.json"), 'w', encoding='utf-8') as f:
-            json.dump(all_tokens, f, ensure_ascii=False, indent=2)
+        # 逐句写出 original_texts.json（整体文本和metadata）、sentences.json（token_ids索引）
+        # 和 tokens.json（所有token信息，提供全局索引）
+        # 省略token/句子内容时必须有原文（偏移指向原文）
+        omit_bodies = self.omit_bodies and original_text.text is not None
+        with StructuredDataWriter(output_dir, original_text.text_id, original_text.text_title,
+                                  omit_bodies=omit_bodies) as writer:
+            if omit_bodies:
+                writer.write_text(original_text.text)
+            for sentence in original_text.text_by_sentence:
+                writer.write_sentence(sentence)
     
-    def process_file(self, input_path: str, text_id: int, output_dir: str = None) -> bool:
+    def process_file(self, input_path: str, text_id: int, output_dir: str = None, streaming: bool = False) -> bool:
         """
         处理文本文件并保存结构化数据
         
@@ -322,6 +910,7 @@ class TextProcessor:
             input_path: 输入文件路径
             text_id: 文本ID
             output_dir: 输出目录路径，如果为None则使用默认路径
+            streaming: 是否流式处理（分块读取、逐窗口写出，适合很大的文件）
             
         Returns:
             bool: 处理是否成功
@@ -335,6 +924,10 @@ class TextProcessor:
                 print(f"❌ 错误：找不到文件 '{input_path}'")
                 return False
             
+            if streaming:
+                self.process_file_streaming(input_path, text_id, output_dir)
+                return True
+            
             # 处理文本
             original_text = self.process_text_to_structured_data(input_path, text_id)
             
@@ -352,17 +945,21 @@ class TextProcessor:
             print(f"❌ 处理文件时发生错误：{e}")
             return False
     
-    def process_multiple_files(self, input_files: List[str], start_text_id: int = 1) -> int:
+    def process_multiple_files(self, input_files: List[str], start_text_id: int = 1, workers: int = 1) -> int:
         """
         批量处理多个文件
         
         Args:
             input_files: 输入文件路径列表
             start_text_id: 起始文本ID
+            workers: 工作进程数；大于1时并行处理，只读的词法资源在进程间共享
             
         Returns:
             int: 成功处理的文件数量
         """
+        if workers > 1 and len(input_files) > 1:
+            return self._process_files_in_workers(input_files, start_text_id, workers)
+        
         success_count = 0
         
         print(f"🔄 开始批量处理 {len(input_files)} 个文件...")
@@ -379,7 +976,118 @@ class TextProcessor:
         print(f"\n📊 批量处理完成！成功处理 {success_count}/{len(input_files)} 个文件")
         return success_count
 
-    def _generate_vocab_for_token(self, token: Token, sentence: Sentence, text_id: int) -> Optional[VocabExpression]:
+    def _process_files_in_workers(self, input_files: List[str], start_text_id: int, workers: int) -> int:
+        """
+        用多个工作进程处理文件
+        
+        只读为主的资源只发布一次、由各工作进程共享读取：
+        - 已有的lemma缓存和难度结论编译成词典，放入共享内存，工作进程直接映射
+        - 词典文件本身通过mmap由页缓存共享
+        - 支持fork时，NLTK模型在父进程中预加载，子进程写时复制共享
+        
+        Args:
+            input_files: 输入文件路径列表
+            start_text_id: 起始文本ID
+            workers: 工作进程数
+            
+        Returns:
+            int: 成功处理的文件数量
+        """
+        import gc
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from ..utils.lexicon import build_lexicon, entries_from_caches, publish_shared_lexicon
+        
+        use_fork = "fork" in multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if use_fork else None)
+        workers = min(workers, len(input_files))
+        
+        print(f"🔄 开始用 {workers} 个工作进程批量处理 {len(input_files)} 个文件...")
+        print("=" * 50)
+        
+        if use_fork and not self.lemma_service.preload():
+            print("⚠️  缺少NLTK数据，工作进程只使用词典")
+        snapshot = build_lexicon(entries_from_caches(self.lemma_service.snapshot(), self.difficulty_cache))
+        shm = publish_shared_lexicon(snapshot)
+        print(f"📦 共享词典快照: {len(snapshot) / 1024:.1f} KB")
+        # vocab和语法规则的ID由各进程从共享计数器分配，起点为文件中已记录的下一个ID
+        self._init_vocab_converter()
+        self._load_grammar_data()
+        shared_counters = {name: context.Value('q', getattr(self, name))
+                           for name in ("vocab_counter", "grammar_rule_counter")}
+        
+        success_count = 0
+        memory_by_worker: Dict[int, List[Dict[str, int]]] = {}
+        if use_fork:
+            # 已加载的对象移出GC跟踪，避免子进程中的垃圾回收触发写时复制
+            gc.freeze()
+        try:
+            options = {
+                "output_base_dir": self.output_base_dir,
+                "batch_difficulty": self.batch_difficulty,
+                "grammar_analysis": self.grammar_analysis,
+                "grammar_batch_size": self.grammar_batch_size,
+                "grammar_min_complexity": self.grammar_min_complexity,
+                "grammar_marker_fallback": self.grammar_marker_fallback,
+                "learner_id": self.learner_id,
+                "columnar_tokens": self.columnar_tokens,
+                "omit_bodies": self.omit_bodies,
+                "implicit_whitespace": self.implicit_whitespace,
+                "max_sentence_length": self.max_sentence_length,
+                "sentence_batch_size": self.sentence_batch_size,
+            }
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                     initargs=(shm.name, options, context.Lock(), shared_counters)) as executor:
+                futures = [
+                    (file_path, executor.submit(_process_file_in_worker, file_path, text_id))
+                    for text_id, file_path in enumerate(input_files, start_text_id)
+                ]
+                for file_path, future in futures:
+                    try:
+                        success, pid, memory_before, memory_after, verdicts = future.result()
+                    except Exception as e:
+                        print(f"❌ 工作进程处理 {file_path} 时发生错误：{e}")
+                        success = False
+                    else:
+                        memory_by_worker.setdefault(pid, [memory_before, memory_after])[1] = memory_after
+                        self.difficulty_cache.update(verdicts)
+                    if success:
+                        success_count += 1
+                    else:
+                        print(f"⚠️  跳过文件: {file_path}")
+        finally:
+            if use_fork:
+                gc.unfreeze()
+            shm.close()
+            shm.unlink()
+        for name, counter in shared_counters.items():
+            setattr(self, name, max(getattr(self, name), counter.value))
+        
+        print("\n📊 工作进程内存（KB，RSS / 私有匿名页）:")
+        for pid, (before, after) in sorted(memory_by_worker.items()):
+            print(f"   pid {pid}: 开始 {before.get('rss', 0)} / {before.get('anon', '-')}"
+                  f" -> 结束 {after.get('rss', 0)} / {after.get('anon', '-')}")
+        print(f"\n📊 批量处理完成！成功处理 {success_count}/{len(input_files)} 个文件")
+        return success_count
+
+    def submit_text(self, text: str, text_id: int, text_title: str = "", timeout: Optional[float] = None) -> ProcessingHandle:
+        """
+        在后台线程中处理文本，返回可取消的处理句柄
+        
+        Args:
+            text: 文本内容或文件路径
+            text_id: 文本ID
+            text_title: 文本标题
+            timeout: 可选的截止时间（秒）
+            
+        Returns:
+            ProcessingHandle: 处理句柄，通过result()获取OriginalText，通过cancel()取消
+        """
+        handle = ProcessingHandle(timeout=timeout)
+        return handle.start(self.process_text_to_structured_data, text, text_id, text_title, handle=handle)
+
+    def _generate_vocab_for_token(self, token: Token, sentence: Sentence, text_id: int,
+                                  handle: Optional[ProcessingHandle] = None) -> Optional[VocabExpression]:
         """
         为单个token生成vocab
         
@@ -387,6 +1095,7 @@ class TextProcessor:
             token: Token对象
             sentence: 句子对象
             text_id: 文本ID
+            handle: 可选的处理句柄
             
         Returns:
             VocabExpression: 生成的vocab对象，如果生成失败返回None
@@ -394,6 +1103,10 @@ class TextProcessor:
         # 检查token是否为hard难度的text类型
         if not (token.token_type == "text" and token.difficulty_level == "hard"):
             return None
+        # 学习者已掌握的词不生成vocab
+        if self.known_words is not None and self.known_words.knows(token.token_body, token.lemma):
+            self.known_words.record_saved("vocab", token.lemma or token.token_body)
+            return None
         
         try:
             # 延迟导入以避免循环导入
@@ -403,19 +1116,28 @@ class TextProcessor:
             vocab_explanation_assistant = VocabExplanationAssistant()
             vocab_example_assistant = VocabExampleExplanationAssistant()
             
-            # 获取词汇解释
-            vocab_explanation_result = vocab_explanation_assistant.run(sentence, token.token_body)
+            # 长句的prompt以这个token所在的位置为中心（同一个词可能在句中出现多次）
+            position = token_position(token, sentence)
             
-            # 获取上下文解释
-            context_explanation_result = vocab_example_assistant.run(token.token_body, sentence)
+            # 获取词汇解释（同一规范形式只请求一次）
+            explanation_key = canonicalize_token(token.lemma or token.token_body)
+            explanation = self.explanation_cache.get(explanation_key)
+            if explanation is None:
+                vocab_explanation_result = vocab_explanation_assistant.run(sentence, token.token_body, handle=handle,
+                                                                           position=position)
+                explanation = self._parse_explanation(vocab_explanation_result)
+                if explanation:
+                    self.explanation_cache[explanation_key] = explanation
             
-            # 解析解释结果
-            explanation = self._parse_explanation(vocab_explanation_result)
+            # 获取上下文解释（与句子相关，不缓存）
+            context_explanation_result = vocab_example_assistant.run(token.token_body, sentence, handle=handle,
+                                                                     position=position)
             context_explanation = self._parse_context_explanation(context_explanation_result)
             
             # 创建VocabExpression对象
+            vocab_id = self._next_id("vocab_counter")
             vocab_expression = VocabExpression(
-                vocab_id=self.vocab_counter,
+                vocab_id=vocab_id,
                 vocab_body=token.lemma if token.lemma else token.token_body,  # 使用lemma
                 explanation=explanation,
                 source="auto",  # 标注为auto
@@ -426,7 +1148,7 @@ class TextProcessor:
             # 创建VocabExpressionExample
             if context_explanation:
                 vocab_example = VocabExpressionExample(
-                    vocab_id=self.vocab_counter,
+                    vocab_id=vocab_id,
                     text_id=text_id,
                     sentence_id=sentence.sentence_id,
                     context_explanation=context_explanation,
@@ -434,11 +1156,10 @@ class TextProcessor:
                 )
                 vocab_expression.examples.append(vocab_example)
             
-            # 更新计数器
-            self.vocab_counter += 1
-            
             return vocab_expression
             
+        except ProcessingCancelled:
+            raise
         except Exception as e:
             print(f"转换token '{token.token_body}' 到vocab失败: {e}")
             return None
@@ -469,6 +1190,27 @@ class TextProcessor:
                 return result
         return str(result)
 
+    @staticmethod
+    def _vocab_to_dict(vocab: VocabExpression) -> Dict[str, Any]:
+        """vocab在vocab_data.json中的格式"""
+        return {
+            'vocab_id': vocab.vocab_id,
+            'vocab_body': vocab.vocab_body,
+            'explanation': vocab.explanation,
+            'source': vocab.source,
+            'is_starred': vocab.is_starred,
+            'examples': [
+                {
+                    'vocab_id': example.vocab_id,
+                    'text_id': example.text_id,
+                    'sentence_id': example.sentence_id,
+                    'context_explanation': example.context_explanation,
+                    'token_indices': example.token_indices
+                }
+                for example in vocab.examples
+            ]
+        }
+
     def _save_vocab_data(self, vocab_expressions: List[VocabExpression]):
         """
         保存vocab数据到指定路径
@@ -476,56 +1218,152 @@ class TextProcessor:
         Args:
             vocab_expressions: vocab表达式列表
         """
-        try:
-            # 创建vocab数据目录
-            vocab_output_dir = os.path.join(self.output_base_dir, "vocab_data")
-            os.makedirs(vocab_output_dir, exist_ok=True)
-            
-            # 读取现有数据（如果存在）
-            vocab_data_file = os.path.join(vocab_output_dir, "vocab_data.json")
-            existing_vocabs = []
-            if os.path.exists(vocab_data_file):
-                try:
-                    with open(vocab_data_file, 'r', encoding='utf-8') as f:
-                        existing_data = json.load(f)
-                        existing_vocabs = existing_data.get('vocab_expressions', [])
-                except Exception as e:
-                    print(f"读取现有vocab数据失败: {e}")
-            
-            # 添加新的vocab数据
-            for vocab in vocab_expressions:
-                vocab_dict = {
-                    'vocab_id': vocab.vocab_id,
-                    'vocab_body': vocab.vocab_body,
-                    'explanation': vocab.explanation,
-                    'source': vocab.source,
-                    'is_starred': vocab.is_starred,
-                    'examples': [
-                        {
-                            'vocab_id': example.vocab_id,
-                            'text_id': example.text_id,
-                            'sentence_id': example.sentence_id,
-                            'context_explanation': example.context_explanation,
-                            'token_indices': example.token_indices
-                        }
-                        for example in vocab.examples
-                    ]
+        self._save_vocab_dicts([self._vocab_to_dict(vocab) for vocab in vocab_expressions])
+    
+    def _save_vocab_dicts(self, vocab_dicts: List[Dict[str, Any]]):
+        """
+        把vocab（已转换为vocab_data.json中的格式）追加到vocab_data.json（读取、追加、整体写回）
+        
+        Args:
+            vocab_dicts: vocab字典列表
+        """
+        # 多进程处理时各进程写同一个文件，需要加锁
+        with self._vocab_file_lock or nullcontext():
+            try:
+                # 创建vocab数据目录
+                vocab_output_dir = os.path.join(self.output_base_dir, "vocab_data")
+                os.makedirs(vocab_output_dir, exist_ok=True)
+                
+                # 读取现有数据（如果存在）
+                vocab_data_file = os.path.join(vocab_output_dir, "vocab_data.json")
+                existing_data = {}
+                existing_vocabs = []
+                if os.path.exists(vocab_data_file):
+                    try:
+                        with open(vocab_data_file, 'r', encoding='utf-8') as f:
+                            existing_data = json.load(f)
+                            existing_vocabs = existing_data.get('vocab_expressions', [])
+                    except Exception as e:
+                        print(f"读取现有vocab数据失败: {e}")
+                
+                # 添加新的vocab数据
+                existing_vocabs.extend(vocab_dicts)
+                
+                # 保存vocab数据
+                # 其他进程可能已分配了更大的ID
+                vocab_data = {
+                    'vocab_expressions': existing_vocabs,
+                    'next_vocab_id': max(existing_data.get('next_vocab_id', 1), self.vocab_counter)
                 }
-                existing_vocabs.append(vocab_dict)
-            
-            # 保存vocab数据
-            vocab_data = {
-                'vocab_expressions': existing_vocabs,
-                'next_vocab_id': self.vocab_counter
-            }
-            
-            with open(vocab_data_file, 'w', encoding='utf-8') as f:
-                json.dump(vocab_data, f, ensure_ascii=False, indent=2)
-            
-            print(f"✅ 成功保存 {len(vocab_expressions)} 个vocab到 {vocab_data_file}")
-            
+                
+                with open(vocab_data_file, 'w', encoding='utf-8') as f:
+                    json.dump(vocab_data, f, ensure_ascii=False, indent=2)
+                
+                print(f"✅ 成功保存 {len(vocab_dicts)} 个vocab到 {vocab_data_file}")
+                
+            except Exception as e:
+                print(f"❌ 保存vocab数据失败: {e}")
+
+
+class _GrammarRequestPool:
+    """
+    语法分析请求的缓冲：逐句加入，凑满grammar_batch_size句就发出一次流式请求
+    
+    - 复杂度低于阈值的简单句不发送
+    - 规范化后相同的句子（重复句、模板句）只分析一次，结果按句子哈希缓存并跨文本复用
+    - 分析失败的句子不写入缓存，下次仍会重试
+    """
+    
+    def __init__(self, processor: TextProcessor, handle: Optional[ProcessingHandle] = None):
+        self.processor = processor
+        self.handle = handle
+        self.pending: Dict[str, str] = {}   # 句子哈希 -> 句子，等待请求
+        self.candidates = set()             # 不做复杂度筛选时需要请求的句子（用于计算节省的请求数）
+        self.requests = 0
+    
+    def add(self, text: str, complexity: Optional[float] = None) -> Optional[str]:
+        """
+        加入一个句子（缓冲满时发出请求）
+        
+        Returns:
+            Optional[str]: 句子哈希（空句子为None），结果请求完成后在grammar_cache中
+        """
+        processor = self.processor
+        processor.grammar_stats["sentences"] += 1
+        if not text.strip():
+            return None
+        key = sentence_hash(text)
+        if key in processor.grammar_cache:
+            processor.grammar_stats["cache_hits"] += 1
+            return key
+        self.candidates.add(key)
+        if (processor.grammar_min_complexity is not None and complexity is not None
+                and complexity < processor.grammar_min_complexity):
+            processor.grammar_stats["skipped_simple"] += 1
+            return key
+        self.pending.setdefault(key, text)
+        if len(self.pending) >= processor.grammar_batch_size:
+            self.flush()
+        return key
+    
+    def flush(self):
+        """请求缓冲中的句子"""
+        processor = self.processor
+        batch = list(self.pending.items())
+        if not batch:
+            return
+        if processor.grammar_assistant is None:
+            from ..agents.batch_grammar_analysis import BatchGrammarAnalysisAssistant
+            processor.grammar_assistant = BatchGrammarAnalysisAssistant(max_sentences=processor.grammar_batch_size)
+        self.requests += 1
+        try:
+            for index, analysis in processor.grammar_assistant.iter_run([text for _, text in batch], handle=self.handle):
+                entries = processor._register_grammar_rules(analysis)
+                with processor._grammar_lock:
+                    processor.grammar_cache[batch[index][0]] = entries
+        except ProcessingCancelled:
+            raise
         except Exception as e:
-            print(f"❌ 保存vocab数据失败: {e}")
+            print(f"⚠️  批量语法分析失败: {e}")
+        finally:
+            self.pending.clear()
+    
+    def record_stats(self):
+        """把请求数和节省的请求数计入grammar_stats"""
+        stats = self.processor.grammar_stats
+        stats["requests"] += self.requests
+        stats["requests_saved"] += max(math.ceil(len(self.candidates) / self.processor.grammar_batch_size)
+                                       - self.requests, 0)
+
+
+# 工作进程内的状态（每个工作进程一份）
+_worker_processor: Optional[TextProcessor] = None
+_worker_shm = None
+_worker_memory_before: Dict[str, int] = {}
+
+def _init_worker(shm_name: str, options: Dict[str, Any], vocab_file_lock, shared_counters: Dict[str, Any]):
+    """工作进程初始化：映射共享词典，创建本进程的TextProcessor"""
+    global _worker_processor, _worker_shm, _worker_memory_before
+    from ..utils.lexicon import LexiconChain, attach_shared_lexicon
+    _worker_memory_before = get_memory_usage_kb()
+    _worker_shm, shared_lexicon = attach_shared_lexicon(shm_name)
+    lexicon = LexiconChain([shared_lexicon, get_default_lexicon()])
+    LemmaService.instance().lexicon = lexicon
+    _worker_processor = TextProcessor(**options)
+    _worker_processor.lexicon = lexicon
+    _worker_processor._vocab_file_lock = vocab_file_lock
+    _worker_processor._shared_counters = shared_counters
+
+def _process_file_in_worker(file_path: str, text_id: int):
+    """
+    在工作进程中处理一个文件
+    
+    Returns:
+        tuple: (是否成功, pid, 初始化时的内存, 当前内存, 本进程的难度结论)
+    """
+    success = _worker_processor.process_file(file_path, text_id)
+    return (success, os.getpid(), _worker_memory_before, get_memory_usage_kb(),
+            dict(_worker_processor.difficulty_cache))
 
 def main():
     """主函数：处理命令行输入的文件"""
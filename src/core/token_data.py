@@ -1,7 +1,11 @@
-from typing import Optional, Literal
+from sys import intern
+from typing import Any, Dict, Iterable, List, Optional, Literal, Sequence
 from dataclasses import dataclass, field
 
-@dataclass
+# 所有数据类都使用__slots__（slots=True）：不为每个实例创建__dict__，
+# 重复出现的字符串（token_type、token内容、lemma、POS标签）驻留到解释器的共享字符串池，相同内容只保存一份
+
+@dataclass(slots=True)
 class Token:
     token_body: str
     token_type: Literal["text", "punctuation", "space"]
@@ -12,8 +16,73 @@ class Token:
     lemma: Optional[str] = None                # 原型词（用于合并变形、统一解释）
     is_grammar_marker: Optional[bool] = False  # 是否参与语法结构识别
     linked_vocab_id: Optional[int] = None  # 指向词汇中心解释
+    start: Optional[int] = None            # 在原文中的起始字符偏移（token_body == 原文[start:end]）
+    end: Optional[int] = None              # 在原文中的结束字符偏移
+
+
+def intern_string(value: Optional[str]) -> Optional[str]:
+    """把字符串驻留到共享字符串池（None原样返回）"""
+    return intern(value) if value is not None else None
+
+
+def build_tokens(token_dicts: Sequence[Dict[str, Any]], global_token_id: int = 0,
+                 starts: Optional[Sequence[int]] = None, ends: Optional[Sequence[int]] = None,
+                 implicit_whitespace: bool = False) -> List[Token]:
+    """
+    批量创建一个句子的Token对象（按位置传参，token内容和类型驻留到共享字符串池）
+
+    Args:
+        token_dicts: 句子的token字典列表（token_body和token_type）
+        global_token_id: 第一个token的全局ID
+        starts: 各token在原文中的起始偏移（可选）
+        ends: 各token在原文中的结束偏移（可选）
+        implicit_whitespace: 是否省略space类型的token（空白由相邻token偏移之间的空隙表示，见fill_whitespace）
+
+    Returns:
+        List[Token]: Token对象列表，sentence_token_id从1开始（省略空白时ID连续，只为非空白token编号）
+    """
+    if implicit_whitespace:
+        kept = [index for index, token_dict in enumerate(token_dicts) if token_dict["token_type"] != "space"]
+        token_dicts = [token_dicts[index] for index in kept]
+        if starts is not None:
+            starts = [starts[index] for index in kept]
+            ends = [ends[index] for index in kept]
+    tokens = [Token(intern(token_dict["token_body"]), intern(token_dict["token_type"]), None,
+                    global_token_id + offset, offset + 1)
+              for offset, token_dict in enumerate(token_dicts)]
+    if starts is not None:
+        for token, start, end in zip(tokens, starts, ends):
+            token.start = start
+            token.end = end
+    return tokens
+
+
+def fill_whitespace(tokens: Sequence[Token], text: str, text_start: int = 0) -> List[Token]:
+    """
+    把省略的空白还原为space类型的token（无损：拼接结果与原文相同）
+
+    相邻token偏移之间的空隙即空白，内容从原文中切出；还原的空白token没有global_token_id和sentence_token_id
+
+    Args:
+        tokens: 带有start/end偏移的token列表（Token或TokenView）
+        text: 原文，或以text_start开头的一段原文（如句子内容）
+        text_start: text在原文中的起始偏移（传入句子内容时为Sentence.start）
+
+    Returns:
+        List[Token]: 包含空白token的列表
+    """
+    result = []
+    previous_end = None
+    for token in tokens:
+        if previous_end is not None and token.start > previous_end:
+            gap = text[previous_end - text_start:token.start - text_start]
+            result.append(Token(intern(gap), "space", start=previous_end, end=token.start))
+        result.append(token)
+        previous_end = token.end
+    return result
+
 
-@dataclass
+@dataclass(slots=True)
 class Sentence:
     text_id: int
     sentence_id: int
@@ -22,21 +91,25 @@ class Sentence:
     vocab_annotations: list[int] = None    # word id
     sentence_difficulty_level: Optional[Literal["easy", "hard"]] = None
     tokens: list[Token] = None
+    start: Optional[int] = None   # 在原文中的起始字符偏移（sentence_body == 原文[start:end]）
+    end: Optional[int] = None     # 在原文中的结束字符偏移
 
-@dataclass
+@dataclass(slots=True)
 class OriginalText:
     text_id: int
     text_title: str
     text_by_sentence: list[Sentence]
+    token_table: Optional[object] = None  # 可选的列式token存储（TokenTable），此时Sentence.tokens是表上的视图
+    text: Optional[str] = None            # 原文（句子和token的偏移都指向它）
 
-@dataclass
+@dataclass(slots=True)
 class GrammarExample:
     rule_id: int
     text_id: int
     sentence_id: int
     explanation_context: str
 
-@dataclass
+@dataclass(slots=True)
 class GrammarRule:
     rule_id: int
     name: str
@@ -45,7 +118,7 @@ class GrammarRule:
     is_starred: bool = False
     examples: list[GrammarExample] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class VocabExpressionExample:
     vocab_id: int
     text_id: int
@@ -53,7 +126,7 @@ class VocabExpressionExample:
     context_explanation: str
     token_indices: list[int] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class VocabExpression:
     vocab_id: int
     vocab_body: str
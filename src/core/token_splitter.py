@@ -1,56 +1,208 @@
 import re
-from typing import List, Dict, Any
+from array import array
+from itertools import accumulate
+from operator import itemgetter
+from typing import Callable, Dict, Iterator, List, Any, Optional
+from ..utils.language import detect_language, ENGLISH, CHINESE, JAPANESE
 
-def split_tokens(text: str) -> List[Dict[str, Any]]:
+# token类型编码（TokenSpans.types中的值）
+TEXT, PUNCTUATION, SPACE = 0, 1, 2
+TOKEN_TYPE_NAMES = ("text", "punctuation", "space")
+
+# 匹配单词（包括连字符、撇号等）、标点符号、空白字符
+# 线性时间：单词由\w段和['-]段交替组成，两类字符不相交，每个字符只有一种匹配方式，
+# 回溯最多退回末尾一段撇号/连字符，每个字符被检查的次数有常数上限；标点为单个字符，空白为\s+。
+# 因此re.split的耗时与文本长度成正比（与原来的 \b[\w'-]+\b 结果相同，见 test_tokenizer_linear_time.py）
+_WORD_PATTERN = r"\w+(?:['-]+\w+)*"
+_PUNCTUATION_PATTERN = r'[^\w\s]'
+_SPACE_PATTERN = r'\s+'
+# 整个token作为一个捕获组，re.split直接得到 ["", token, "", token, ...]（所有字符都会被某个分支匹配）
+_TOKEN_PATTERN = f'({_WORD_PATTERN}|{_PUNCTUATION_PATTERN}|{_SPACE_PATTERN})'
+# 纯ASCII文本使用ASCII模式匹配（结果相同，不必查询Unicode字符属性）
+_ASCII_REGEX = re.compile(_TOKEN_PATTERN, re.ASCII)
+_UNICODE_REGEX = re.compile(_TOKEN_PATTERN)
+# 中日文：连续的汉字/假名作为一段交给分词器，其余部分同上
+# （汉字与拉丁字母之间没有\b，夹杂的单词按不含汉字/假名的单词字符匹配）
+_CJK_CHARS = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_NON_CJK_WORD_PATTERN = f"[^\\W{_CJK_CHARS}]+(?:['-]+[^\\W{_CJK_CHARS}]+)*"
+_CJK_REGEX = re.compile(
+    f'([{_CJK_CHARS}]+)|({_NON_CJK_WORD_PATTERN})|({_PUNCTUATION_PATTERN})|({_SPACE_PATTERN})'
+)
+
+
+class _FirstCharTypes(dict):
+    """字符 -> token类型编码的转换表（供str.translate使用）：单词以\\w开头，空白以\\s开头，其余为标点"""
+
+    def __missing__(self, code: int) -> int:
+        ch = chr(code)
+        value = SPACE if ch.isspace() else TEXT if ch.isalnum() or ch == '_' else PUNCTUATION
+        self[code] = value
+        return value
+
+
+_FIRST_CHAR_TYPES = _FirstCharTypes()
+_first_char = itemgetter(0)
+
+
+class TokenSpans:
     """
-    将文本分割成tokens，按照token_data.py中定义的数据结构
+    分词结果的紧凑表示：原文加三个并行数组
+    starts/ends为token在原文中的起止偏移（array('I')），types为类型编码（array('B')）；
+    token内容按需从原文切片，不为每个token创建字典
+    """
+    __slots__ = ("text", "starts", "ends", "types")
+
+    def __init__(self, text: str, starts: array, ends: array, types: array):
+        self.text = text
+        self.starts = starts
+        self.ends = ends
+        self.types = types
+
+    @classmethod
+    def from_pieces(cls, text: str, pieces: List[str], types: Optional[array] = None) -> "TokenSpans":
+        """
+        由依次相接、覆盖全文的token字符串创建
+
+        Args:
+            text: 原文
+            pieces: token字符串列表（拼接后等于原文）
+            types: 类型编码（可选，默认按首字符判断）
+
+        Returns:
+            TokenSpans: 分词结果
+        """
+        offsets = array('I', accumulate(map(len, pieces), initial=0))
+        if types is None:
+            first_chars = ''.join(map(_first_char, pieces))
+            types = array('B', first_chars.translate(_FIRST_CHAR_TYPES).encode('latin-1'))
+        return cls(text, offsets[:-1], offsets[1:], types)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def body(self, index: int) -> str:
+        """第index个token的内容"""
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def type_name(self, index: int) -> str:
+        """第index个token的类型名称"""
+        return TOKEN_TYPE_NAMES[self.types[index]]
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return {"token_body": self.body(index), "token_type": self.type_name(index)}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.to_dicts())
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """转换为 [{"token_body", "token_type"}, ...]（原有的字典接口）"""
+        text = self.text
+        return [{"token_body": text[start:end], "token_type": TOKEN_TYPE_NAMES[code]}
+                for start, end, code in zip(self.starts, self.ends, self.types)]
+
+
+# 语言 -> 分词函数
+_TOKENIZERS: Dict[str, Callable[[str], TokenSpans]] = {}
+
+
+def register_tokenizer(language: str):
+    """
+    注册某种语言的分词函数（装饰器），分词函数接收文本并返回TokenSpans
     
     Args:
-        text: 输入的文本字符串
+        language: 语言名称（与detect_language的返回值一致）
+    """
+    def decorator(func: Callable[[str], TokenSpans]):
+        _TOKENIZERS[language] = func
+        return func
+    return decorator
+
+
+def get_tokenizer(language: str) -> Callable[[str], TokenSpans]:
+    """
+    获取语言对应的分词函数，未注册的语言（如以空格分词的韩语）使用英语分词
+    
+    Args:
+        language: 语言名称
         
     Returns:
-        List[Dict[str, Any]]: 包含token_body和token_type的token列表
+        Callable: 分词函数
     """
-    if not text:
-        return []
-    
-    tokens = []
-    
-    # 使用正则表达式匹配不同类型的token
-    # 匹配单词（包括连字符、撇号等）
-    word_pattern = r'\b[\w\'-]+\b'
-    # 匹配标点符号
-    punctuation_pattern = r'[^\w\s]'
-    # 匹配空白字符
-    space_pattern = r'\s+'
-    
-    # 组合所有模式
-    combined_pattern = f'({word_pattern})|({punctuation_pattern})|({space_pattern})'
+    return _TOKENIZERS.get(language, _TOKENIZERS[ENGLISH])
+
+
+@register_tokenizer(ENGLISH)
+def scan_space_delimited_tokens(text: str) -> TokenSpans:
+    """
+    以空格分词的语言：按单词、标点、空白切分（纯ASCII文本走快速路径）
     
-    matches = re.finditer(combined_pattern, text)
+    Args:
+        text: 输入的文本字符串
+        
+    Returns:
+        TokenSpans: 分词结果
+    """
+    regex = _ASCII_REGEX if text.isascii() else _UNICODE_REGEX
+    return TokenSpans.from_pieces(text, regex.split(text)[1::2])
+
+
+@register_tokenizer(CHINESE)
+@register_tokenizer(JAPANESE)
+def scan_cjk_tokens(text: str) -> TokenSpans:
+    """
+    中文/日文：连续的汉字和假名按词典正向最大匹配切分，夹杂的拉丁单词、数字和标点同英语
     
-    for match in matches:
-        token_body = match.group(0)
+    Args:
+        text: 输入的文本字符串
         
-        # 确定token类型
-        if match.group(1):  # 单词
-            token_type = "text"
-        elif match.group(2):  # 标点符号
-            token_type = "punctuation"
-        elif match.group(3):  # 空白字符
-            token_type = "space"
+    Returns:
+        TokenSpans: 分词结果
+    """
+    from ..utils.cjk_segmenter import get_default_segmenter
+    segmenter = get_default_segmenter()
+    pieces = []
+    types = array('B')
+    for match in _CJK_REGEX.finditer(text):
+        if match.lastindex == 1:
+            words = segmenter.segment(match.group(0))
+            pieces.extend(words)
+            types.extend([TEXT] * len(words))
         else:
-            continue  # 跳过不匹配的情况
-        
-        # 创建token字典，只包含前两项
-        token = {
-            "token_body": token_body,
-            "token_type": token_type
-        }
+            pieces.append(match.group(0))
+            types.append(match.lastindex - 2)
+    return TokenSpans.from_pieces(text, pieces, types)
+
+
+def scan_tokens(text: str, language: Optional[str] = None) -> TokenSpans:
+    """
+    将文本分割成tokens，返回起止偏移和类型编码的并行数组
+    
+    Args:
+        text: 输入的文本字符串
+        language: 文本语言（可选，未指定时根据字符分布检测）
         
-        tokens.append(token)
+    Returns:
+        TokenSpans: 分词结果
+    """
+    if language is None:
+        language = detect_language(text)
+    return get_tokenizer(language)(text or "")
+
+
+def split_tokens(text: str, language: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    将文本分割成tokens，按照token_data.py中定义的数据结构
     
-    return tokens
+    Args:
+        text: 输入的文本字符串
+        language: 文本语言（可选，未指定时根据字符分布检测）
+        
+    Returns:
+        List[Dict[str, Any]]: 包含token_body和token_type的token列表
+    """
+    if not text:
+        return []
+    return scan_tokens(text, language).to_dicts()
 
 def main():
     """
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+列式token存储
+一篇文本的所有token存放在几组并行的定长数组中（偏移、类型、难度、POS标签、lemma、vocab ID、语法标记），
+字符串驻留在字符串池里按ID引用（POS标签单独一个池，以便用2字节保存）；Sentence只记录它在表中的下标区间，
+Token作为按需创建的视图（TokenView）保留原有的属性访问方式
+"""
+
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .token_data import Token
+from .token_splitter import TOKEN_TYPE_NAMES
+
+# 难度编码：0表示未评估
+DIFFICULTY_LEVELS = (None, "easy", "hard")
+_DIFFICULTY_CODES = {level: code for code, level in enumerate(DIFFICULTY_LEVELS)}
+_TYPE_CODES = {name: code for code, name in enumerate(TOKEN_TYPE_NAMES)}
+# vocab ID为0表示没有关联的vocab（vocab ID从1开始）
+_NO_VOCAB = 0
+
+
+class StringPool:
+    """字符串驻留池：相同的字符串只保存一份，ID 0 表示None"""
+    __slots__ = ("strings", "ids")
+
+    def __init__(self):
+        self.strings: List[Optional[str]] = [None]
+        self.ids: Dict[str, int] = {}
+
+    def intern(self, value: Optional[str]) -> int:
+        """
+        获取字符串的ID（首次出现时加入池中）
+
+        Args:
+            value: 字符串（None返回0）
+
+        Returns:
+            int: 字符串ID
+        """
+        if value is None:
+            return 0
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(value)
+            self.ids[value] = string_id
+        return string_id
+
+    def get(self, string_id: int) -> Optional[str]:
+        return self.strings[string_id]
+
+    def __len__(self) -> int:
+        return len(self.strings) - 1
+
+    def nbytes(self) -> int:
+        """占用的字节数（近似值）"""
+        size = sys.getsizeof(self.strings) + sys.getsizeof(self.ids)
+        return size + sum(sys.getsizeof(value) for value in self.strings if value is not None)
+
+
+class TokenTable:
+    """一篇文本的列式token存储，第i行即全局ID为i的token"""
+    __slots__ = ("text", "starts", "ends", "types", "difficulty", "pos_tags", "lemmas",
+                 "vocab_ids", "grammar_markers", "pool", "pos_pool")
+
+    def __init__(self, text: str = ""):
+        """
+        Args:
+            text: token偏移所指向的原文
+        """
+        self.text = text
+        self.starts = array('I')
+        self.ends = array('I')
+        self.types = array('B')
+        self.difficulty = array('B')
+        self.pos_tags = array('H')        # POS标签池ID（POS标签种类很少，单独一个池，不受lemma数量影响）
+        self.lemmas = array('I')          # 字符串池ID
+        self.vocab_ids = array('I')
+        self.grammar_markers = array('B')
+        self.pool = StringPool()
+        self.pos_pool = StringPool()
+
+    @classmethod
+    def from_sentences(cls, sentences: Iterable, text: Optional[str] = None) -> "TokenTable":
+        """
+        把已有的Sentence（含Token对象列表）转换为列式存储，并把每个句子的tokens替换为表上的视图
+
+        Args:
+            sentences: Sentence对象列表
+            text: 原文（可选）。指定时使用各token的start/end偏移；未指定时原文由token内容依次拼接而成
+
+        Returns:
+            TokenTable: 列式存储
+        """
+        sentences = list(sentences)
+        concatenated = text is None
+        if concatenated:
+            text = "".join(token.token_body for sentence in sentences for token in sentence.tokens)
+        table = cls(text)
+        offset = 0
+        for sentence in sentences:
+            first = len(table)
+            for token in sentence.tokens:
+                if concatenated:
+                    start, offset = offset, offset + len(token.token_body)
+                    table.append(token, start, offset)
+                else:
+                    table.append(token, token.start, token.end)
+            sentence.tokens = table.slice(first, len(table))
+        return table
+
+    def append(self, token: Token, start: int, end: int) -> int:
+        """
+        追加一个token
+
+        Args:
+            token: Token对象（或TokenView）
+            start: token在原文中的起始偏移
+            end: token在原文中的结束偏移
+
+        Returns:
+            int: token在表中的下标
+        """
+        self.starts.append(start)
+        self.ends.append(end)
+        self.types.append(_TYPE_CODES[token.token_type])
+        self.difficulty.append(_DIFFICULTY_CODES.get(token.difficulty_level, 0))
+        self.pos_tags.append(self.pos_pool.intern(token.pos_tag))
+        self.lemmas.append(self.pool.intern(token.lemma))
+        self.vocab_ids.append(token.linked_vocab_id or _NO_VOCAB)
+        self.grammar_markers.append(1 if token.is_grammar_marker else 0)
+        return len(self.types) - 1
+
+    def append_sentence(self, tokens: Sequence[Token], starts: Optional[Sequence[int]] = None,
+                        ends: Optional[Sequence[int]] = None) -> "TokenSlice":
+        """
+        追加一个句子的token，返回该句在表上的视图（可直接赋给Sentence.tokens）
+
+        Args:
+            tokens: 句子的Token对象列表
+            starts: 各token在原文中的起始偏移（可选，默认使用token.start）
+            ends: 各token在原文中的结束偏移（可选，默认使用token.end）
+
+        Returns:
+            TokenSlice: 句子的token视图
+        """
+        first = len(self.types)
+        if starts is None:
+            for token in tokens:
+                self.append(token, token.start, token.end)
+        else:
+            for token, start, end in zip(tokens, starts, ends):
+                self.append(token, start, end)
+        return self.slice(first, len(self.types))
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def body(self, index: int) -> str:
+        """第index个token的内容"""
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def slice(self, start: int, end: int) -> "TokenSlice":
+        """下标区间 [start, end) 的token视图"""
+        return TokenSlice(self, start, end)
+
+    def iter_rows(self, start: int = 0, end: Optional[int] = None) -> Iterator[tuple]:
+        """
+        按行遍历（不创建TokenView；只需要某一列时直接读取对应数组最快）
+
+        Yields:
+            tuple: (token_body, token_type, difficulty_level, pos_tag, lemma, linked_vocab_id, is_grammar_marker)
+        """
+        end = len(self) if end is None else end
+        text, strings, pos_strings = self.text, self.pool.strings, self.pos_pool.strings
+        columns = zip(self.starts[start:end], self.ends[start:end], self.types[start:end],
+                      self.difficulty[start:end], self.pos_tags[start:end], self.lemmas[start:end],
+                      self.vocab_ids[start:end], self.grammar_markers[start:end])
+        for token_start, token_end, type_code, level, pos_id, lemma_id, vocab_id, marker in columns:
+            yield (text[token_start:token_end], TOKEN_TYPE_NAMES[type_code], DIFFICULTY_LEVELS[level],
+                   pos_strings[pos_id], strings[lemma_id], vocab_id or None, bool(marker))
+
+    def to_token(self, index: int, sentence_start: int = 0) -> Token:
+        """把第index行还原为Token对象"""
+        return TokenView(self, index, sentence_start).to_token()
+
+    def nbytes(self) -> int:
+        """数组和字符串池占用的字节数（近似值，不含原文）"""
+        arrays = (self.starts, self.ends, self.types, self.difficulty, self.pos_tags, self.lemmas,
+                  self.vocab_ids, self.grammar_markers)
+        return sum(sys.getsizeof(column) for column in arrays) + self.pool.nbytes() + self.pos_pool.nbytes()
+
+
+class TokenView:
+    """表中一行的视图，属性与Token相同（token_body由偏移从原文切片得到；偏移、global_token_id和sentence_token_id只读）"""
+    __slots__ = ("_table", "_index", "_sentence_start")
+
+    def __init__(self, table: TokenTable, index: int, sentence_start: int = 0):
+        self._table = table
+        self._index = index
+        self._sentence_start = sentence_start
+
+    @property
+    def token_body(self) -> str:
+        return self._table.body(self._index)
+
+    @property
+    def token_type(self) -> str:
+        return TOKEN_TYPE_NAMES[self._table.types[self._index]]
+
+    @property
+    def start(self) -> int:
+        return self._table.starts[self._index]
+
+    @property
+    def end(self) -> int:
+        return self._table.ends[self._index]
+
+    @property
+    def global_token_id(self) -> int:
+        return self._index
+
+    @property
+    def sentence_token_id(self) -> int:
+        return self._index - self._sentence_start + 1
+
+    @property
+    def difficulty_level(self) -> Optional[str]:
+        return DIFFICULTY_LEVELS[self._table.difficulty[self._index]]
+
+    @difficulty_level.setter
+    def difficulty_level(self, value: Optional[str]):
+        self._table.difficulty[self._index] = _DIFFICULTY_CODES.get(value, 0)
+
+    @property
+    def pos_tag(self) -> Optional[str]:
+        return self._table.pos_pool.get(self._table.pos_tags[self._index])
+
+    @pos_tag.setter
+    def pos_tag(self, value: Optional[str]):
+        self._table.pos_tags[self._index] = self._table.pos_pool.intern(value)
+
+    @property
+    def lemma(self) -> Optional[str]:
+        return self._table.pool.get(self._table.lemmas[self._index])
+
+    @lemma.setter
+    def lemma(self, value: Optional[str]):
+        self._table.lemmas[self._index] = self._table.pool.intern(value)
+
+    @property
+    def is_grammar_marker(self) -> bool:
+        return bool(self._table.grammar_markers[self._index])
+
+    @is_grammar_marker.setter
+    def is_grammar_marker(self, value: Optional[bool]):
+        self._table.grammar_markers[self._index] = 1 if value else 0
+
+    @property
+    def linked_vocab_id(self) -> Optional[int]:
+        return self._table.vocab_ids[self._index] or None
+
+    @linked_vocab_id.setter
+    def linked_vocab_id(self, value: Optional[int]):
+        self._table.vocab_ids[self._index] = value or _NO_VOCAB
+
+    def to_token(self) -> Token:
+        """还原为Token对象"""
+        return Token(
+            token_body=self.token_body,
+            token_type=self.token_type,
+            difficulty_level=self.difficulty_level,
+            global_token_id=self.global_token_id,
+            sentence_token_id=self.sentence_token_id,
+            pos_tag=self.pos_tag,
+            lemma=self.lemma,
+            is_grammar_marker=self.is_grammar_marker,
+            linked_vocab_id=self.linked_vocab_id,
+            start=self.start,
+            end=self.end
+        )
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Token, TokenView)):
+            return self.to_token() == (other.to_token() if isinstance(other, TokenView) else other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TokenView({self.to_token()!r})"
+
+
+class TokenSlice(Sequence):
+    """一个句子在TokenTable中的下标区间，按需产出TokenView（用作Sentence.tokens）"""
+    __slots__ = ("table", "start", "end")
+
+    def __init__(self, table: TokenTable, start: int, end: int):
+        self.table = table
+        self.start = start
+        self.end = end
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("token index out of range")
+        return TokenView(self.table, self.start + index, self.start)
+
+    def __iter__(self) -> Iterator[TokenView]:
+        table, start = self.table, self.start
+        for index in range(start, self.end):
+            yield TokenView(table, index, start)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, TokenSlice)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TokenSlice({self.start}, {self.end})"
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+对比Token数据模型改动前后的内存占用和构建速度：
+改动前为普通dataclass（每个实例带__dict__）、关键字参数逐个构造、token内容不驻留；
+改动后为slots=True的dataclass，由build_tokens按位置参数批量构造并驻留字符串
+
+用法: python src/tests/bench_token_model.py [token数]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.document_scanner import scan_document
+from src.core.token_data import build_tokens
+
+SAMPLE = ("Although the weather was terrible, we still enjoyed our vacation. "
+          "The committee postponed the vote until members returned! ")
+
+
+@dataclass
+class LegacyToken:
+    """改动前的Token定义"""
+    token_body: str
+    token_type: str
+    difficulty_level: Optional[str] = None
+    global_token_id: Optional[int] = None
+    sentence_token_id: Optional[int] = None
+    pos_tag: Optional[str] = None
+    lemma: Optional[str] = None
+    is_grammar_marker: Optional[bool] = False
+    linked_vocab_id: Optional[int] = None
+
+
+def build_legacy(document):
+    result = []
+    global_token_id = 0
+    for _, token_dicts in document.iter_sentences():
+        tokens = []
+        for token_id, token_dict in enumerate(token_dicts, 1):
+            tokens.append(LegacyToken(
+                token_body=token_dict["token_body"],
+                token_type=token_dict["token_type"],
+                global_token_id=global_token_id,
+                sentence_token_id=token_id
+            ))
+            global_token_id += 1
+        result.append(tokens)
+    return result
+
+
+def build_slotted(document):
+    result = []
+    global_token_id = 0
+    for _, token_dicts in document.iter_sentences():
+        tokens = build_tokens(token_dicts, global_token_id)
+        global_token_id += len(tokens)
+        result.append(tokens)
+    return result
+
+
+def measure(label, builder, document, token_count):
+    """
+    构建所有句子的Token（含token字典的创建）：
+    先单独计时（tracemalloc会拖慢分配），再统计构建完成后仍占用的内存（Token对象和token内容）
+    """
+    start = time.perf_counter()
+    builder(document)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = builder(document)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"   {label}: {memory / token_count:.0f} 字节/token，{token_count / elapsed / 1e6:.2f}M token/s")
+    return result
+
+
+def main():
+    target = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    def count_tokens(document):
+        return sum(len(document.sentence_token_range(index)) for index in range(len(document)))
+    sample_tokens = count_tokens(scan_document(SAMPLE, "English"))
+    document = scan_document(SAMPLE * -(-target // sample_tokens), "English")
+    token_count = count_tokens(document)
+    print(f"📊 {token_count} 个token，{len(document)} 个句子")
+    measure("改动前（dataclass + 关键字参数）", build_legacy, document, token_count)
+    measure("改动后（slots + build_tokens + 字符串驻留）", build_slotted, document, token_count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+对比Token对象列表与列式TokenTable的内存占用和遍历速度
+
+用法: python src/tests/bench_token_table.py [句子数]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.document_scanner import scan_document
+from src.core.token_data import Sentence, Token
+from src.core.token_table import TokenTable
+
+SAMPLE = ("Although the weather was terrible, we still enjoyed our vacation. "
+          "The committee postponed the vote until members returned! ")
+
+
+def build_sentences(text):
+    """按处理流程的方式创建Token对象（带难度、lemma和POS标签）"""
+    document = scan_document(text, "English")
+    sentences = []
+    global_token_id = 0
+    for sentence_id, (sentence_text, token_dicts) in enumerate(document.iter_sentences(), 1):
+        tokens = []
+        for token_id, token_dict in enumerate(token_dicts, 1):
+            is_text = token_dict["token_type"] == "text"
+            body = token_dict["token_body"]
+            tokens.append(Token(body, token_dict["token_type"], "easy" if is_text else None, global_token_id, token_id,
+                                "NN" if is_text else None, body.lower() if is_text else None))
+            global_token_id += 1
+        sentences.append(Sentence(1, sentence_id, sentence_text, [], [], tokens=tokens))
+    return document, sentences
+
+
+def build_table(document, sentences):
+    table = TokenTable(document.text)
+    for index, sentence in enumerate(sentences):
+        token_range = document.sentence_token_range(index)
+        sentence.tokens = table.append_sentence(sentence.tokens, document.tokens.starts[token_range.start:token_range.stop],
+                                                document.tokens.ends[token_range.start:token_range.stop])
+    return table
+
+
+def iterate(sentences):
+    count = 0
+    for sentence in sentences:
+        for token in sentence.tokens:
+            if token.difficulty_level == "easy" and token.token_body:
+                count += 1
+    return count
+
+
+def measure(label, factory):
+    tracemalloc.start()
+    result = factory()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    iterate(result[1])
+    elapsed = time.perf_counter() - start
+    tokens = sum(len(sentence.tokens) for sentence in result[1])
+    print(f"   {label}: {tokens} 个token，内存 {memory / 1e6:.1f}MB（{memory / tokens:.0f} 字节/token），遍历 {elapsed:.3f}s")
+    return result
+
+
+def main():
+    repeat = int(sys.argv[1]) // 2 if len(sys.argv) > 1 else 25000
+    text = SAMPLE * repeat
+    print(f"📊 {repeat * 2} 个句子")
+    measure("Token对象列表", lambda: build_sentences(text))
+
+    def columnar():
+        document, sentences = build_sentences(text)
+        table = build_table(document, sentences)
+        return table, sentences
+    table, _ = measure("TokenTable（TokenView）", columnar)
+    start = time.perf_counter()
+    count = sum(1 for row in table.iter_rows() if row[2] == "easy" and row[0])
+    print(f"   TokenTable.iter_rows: 遍历 {time.perf_counter() - start:.3f}s")
+    start = time.perf_counter()
+    count = table.difficulty.count(1)
+    print(f"   直接读取难度列: 遍历 {time.perf_counter() - start:.4f}s（{count} 个easy）")
+    print(f"   TokenTable数组和字符串池: {table.nbytes() / 1e6:.1f}MB，字符串池 {len(table.pool)} 个")
+
+
+if __name__ == "__main__":
+    main()
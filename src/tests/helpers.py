@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试共用的辅助函数：创建不调用模型的TextProcessor、读取输出文件
+"""
+
+import json
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, Optional
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.text_processor import TextProcessor
+
+# 每个文本输出目录中的结构化数据文件
+OUTPUT_FILES = ("original_texts.json", "sentences.json", "tokens.json")
+
+
+def make_processor(base_dir: Optional[str] = None, hard_words: Iterable[str] = (), estimator=None,
+                   skip_vocab: bool = False, **options) -> TextProcessor:
+    """
+    创建不调用模型的TextProcessor：不加载预编译词典，难度评估使用本地的假评估器
+
+    Args:
+        base_dir: 输出目录（默认新建临时目录）
+        hard_words: 评为hard的词，其余都为easy
+        estimator: 自定义的难度评估器（提供时忽略hard_words）
+        skip_vocab: 为True时hard词不生成vocab
+        **options: 传给TextProcessor的其他参数
+
+    Returns:
+        TextProcessor: 处理器
+    """
+    processor = TextProcessor(output_base_dir=base_dir or tempfile.mkdtemp(), **options)
+    processor.lexicon = None
+    if estimator is None:
+        hard_words = set(hard_words)
+        estimator = SimpleNamespace(
+            run=lambda token_body, *args, **kwargs: "hard" if token_body in hard_words else "easy")
+    processor.difficulty_estimator = estimator
+    if skip_vocab:
+        processor._generate_vocab_for_token = lambda token, sentence, text_id, handle=None: None
+    return processor
+
+
+def read_outputs(output_dir: str) -> Dict[str, str]:
+    """读取输出目录中各结构化数据文件的原始内容（用于逐字节比较）"""
+    outputs = {}
+    for name in OUTPUT_FILES:
+        with open(os.path.join(output_dir, name), encoding='utf-8') as f:
+            outputs[name] = f.read()
+    return outputs
+
+
+def load_outputs(output_dir: str) -> Dict[str, Any]:
+    """读取并解析输出目录中的各结构化数据文件"""
+    return {name: json.loads(content) for name, content in read_outputs(output_dir).items()}
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+统计语料中text类token在不同缓存键下的命中率
+对比原始token、小写化（旧的vocab键）和规范化后的键
+
+用法: python src/tests/measure_cache_hit_rate.py [文件或目录 ...]
+默认使用仓库中的示例文章和已生成的sentences.json
+"""
+
+import hashlib
+import json
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.token_splitter import split_tokens
+from src.utils.canonical import canonicalize_token
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_SOURCES = ["examples", "data", "demo_data", "enhanced_output", "article_result.json"]
+
+KEY_FUNCTIONS = {
+    "原始token": lambda body: body,
+    "小写": lambda body: body.lower(),
+    "规范化": canonicalize_token,
+}
+
+
+def _iter_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.endswith(".txt") or name == "sentences.json" or name.endswith("_result.json"):
+                        yield os.path.join(root, name)
+        elif os.path.isfile(path):
+            yield path
+
+
+def load_sentences(paths):
+    """读取语料中的句子（内容相同的文件只读一次）"""
+    sentences = []
+    seen = set()
+    for file_path in _iter_files(paths):
+        with open(file_path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha1(raw).hexdigest()
+        if digest in seen:
+            continue
+        seen.add(digest)
+        text = raw.decode("utf-8")
+        if file_path.endswith(".json"):
+            data = json.loads(text)
+            items = data.get("sentences", []) if isinstance(data, dict) else data
+            sentences.extend(item["sentence_body"] for item in items if "sentence_body" in item)
+        else:
+            sentences.append(text)
+    return sentences
+
+
+def measure(sentences):
+    """
+    计算每种键的命中率（首次出现为未命中，之后为命中）
+
+    Returns:
+        dict: 键名 -> (token数, 不同键数, 命中率)
+    """
+    bodies = [token["token_body"] for sentence in sentences for token in split_tokens(sentence)
+              if token["token_type"] == "text"]
+    results = {}
+    for name, key_function in KEY_FUNCTIONS.items():
+        unique = len({key_function(body) for body in bodies})
+        results[name] = (len(bodies), unique, (len(bodies) - unique) / len(bodies) if bodies else 0.0)
+    return results
+
+
+def main():
+    paths = sys.argv[1:] or [os.path.join(PROJECT_ROOT, source) for source in DEFAULT_SOURCES]
+    sentences = load_sentences(paths)
+    print(f"📚 句子数量: {len(sentences)}")
+    baseline = None
+    for name, (total, unique, hit_rate) in measure(sentences).items():
+        delta = "" if baseline is None else f"（{(hit_rate - baseline) * 100:+.1f} 个百分点）"
+        baseline = hit_rate if baseline is None else baseline
+        print(f"   {name}: {total} 个token，{unique} 个不同键，命中率 {hit_rate:.1%}{delta}")
+
+
+if __name__ == "__main__":
+    main()
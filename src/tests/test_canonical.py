@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试token规范化，以及难度缓存按规范形式共享结果
+"""
+
+import os
+import sys
+import unicodedata
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.canonical import canonicalize_token
+from src.tests.helpers import make_processor
+
+
+def test_variants_share_one_key():
+    """撇号、Unicode形式、软连字符、大小写和所有格的变体得到同一个键"""
+    print("🔍 测试规范化")
+    assert canonicalize_token("Cat’s") == canonicalize_token("cat's") == "cat"
+    assert canonicalize_token("students'") == "students"
+    assert canonicalize_token(unicodedata.normalize("NFD", "Café")) == "café"
+    assert canonicalize_token("co\u00adoperate") == "cooperate"
+    assert canonicalize_token("x\u2010ray") == "x-ray"
+    assert canonicalize_token("It’s") == "it's"
+    assert canonicalize_token("") == ""
+    print("✅ 规范化正确")
+
+
+def test_difficulty_cache_keyed_on_canonical_form():
+    """同一个词的不同写法只调用一次难度评估器"""
+    print("🔍 测试难度缓存键")
+    calls = []
+
+    class _Estimator:
+        def run(self, token_body, verbose=False, handle=None):
+            calls.append(token_body)
+            return "hard"
+
+    processor = make_processor(estimator=_Estimator())
+    for body in ["Ephemeral", "ephemeral", "EPHEMERAL"]:
+        assert processor.assess_token_difficulty(body) == "hard"
+    assert calls == ["Ephemeral"]
+    assert processor.difficulty_cache == {"ephemeral": "hard"}
+    print("✅ 难度缓存按规范形式共享")
+
+
+if __name__ == "__main__":
+    test_variants_share_one_key()
+    test_difficulty_cache_keyed_on_canonical_form()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试单遍文档扫描：句子和token的绝对偏移，以及与 split_sentences + split_tokens 结果一致
+"""
+
+import os
+import random
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.document_scanner import scan_document
+from src.core.sentence_splitter import split_sentences, process_text_to_structured_data
+from src.core.token_splitter import split_tokens
+
+
+def test_absolute_offsets():
+    """句子和token的偏移都相对于整篇文档"""
+    print("🔍 测试绝对偏移")
+    text = "  Hello world.  How are you?\nFine! 好。"
+    document = scan_document(text, "English")
+    assert document.sentence_texts() == ["Hello world.", "How are you?", "Fine!", "好。"]
+    second = document.token_starts[1]
+    assert text[document.sentence_starts[1]:document.sentence_ends[1]] == "How are you?"
+    assert document.tokens.starts[second] == text.index("How")
+    assert [document.tokens.body(i) for i in document.sentence_token_range(2)] == ["Fine", "!"]
+    print("✅ 偏移正确")
+
+
+def test_matches_split_sentences_then_split_tokens():
+    """随机文本上与先分句再逐句分词的结果相同"""
+    print("🔍 测试与原流程一致")
+    rng = random.Random(41)
+    alphabet = "ab'-. !?\n\t,。！？好é"
+    for _ in range(3000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        document = scan_document(text, "English")
+        sentences = split_sentences(text)
+        assert document.sentence_texts() == sentences, repr(text)
+        for index, sentence in enumerate(sentences):
+            assert document.sentence_tokens(index) == split_tokens(sentence, "English"), repr(text)
+    print("✅ 3000个随机文本结果一致")
+
+
+def test_structured_data_uses_scanner():
+    """sentence_splitter的结构化处理使用扫描结果"""
+    print("🔍 测试结构化处理")
+    original_text = process_text_to_structured_data("One two. Three!", 1, "扫描测试")
+    bodies = [[token.token_body for token in sentence.tokens] for sentence in original_text.text_by_sentence]
+    assert bodies == [["One", " ", "two", "."], ["Three", "!"]]
+    assert [token.global_token_id for token in original_text.text_by_sentence[1].tokens] == [4, 5]
+    print("✅ 结构化处理正确")
+
+
+if __name__ == "__main__":
+    test_absolute_offsets()
+    test_matches_split_sentences_then_split_tokens()
+    test_structured_data_uses_scanner()
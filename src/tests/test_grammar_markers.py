@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试语法标记词识别：本地规则表、(lemma, POS标签) 缓存、按句子批量的LLM判断
+"""
+
+import json
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.text_processor import TextProcessor
+from src.core.token_data import Token
+from src.utils.grammar_markers import classify_grammar_marker
+
+
+class _MarkerCompletions:
+    """模拟流式返回 {编号: "Yes"/"No"}，记录每次请求的token"""
+
+    def __init__(self):
+        self.requests = []
+
+    def create(self, **kwargs):
+        content = kwargs["messages"][-1]["content"]
+        items = json.loads(content.split("Tokens:", 1)[1])
+        self.requests.append([item["token"] for item in items])
+        answers = {str(item["index"]): "Yes" if item["token"].lower() in ("since", "have") else "No"
+                   for item in items}
+        content = json.dumps(answers)
+        for i in range(0, len(content), 4):
+            delta = SimpleNamespace(content=content[i:i + 4])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def _tokens(pairs):
+    return [Token(token_body=body, token_type="text", pos_tag=tag, sentence_token_id=index)
+            for index, (body, tag) in enumerate(pairs, start=1)]
+
+
+def test_local_table():
+    """封闭词类由本地规则确定，歧义词返回None"""
+    print("🔍 测试本地规则表")
+    assert classify_grammar_marker("would", "MD") is True
+    assert classify_grammar_marker("because", "IN") is True
+    assert classify_grammar_marker("which", "WDT") is True
+    assert classify_grammar_marker("and", "CC") is True
+    assert classify_grammar_marker("in", "IN") is False
+    assert classify_grammar_marker("apple", "NN") is False
+    assert classify_grammar_marker("since", "IN") is None
+    assert classify_grammar_marker("has", "VBZ", lemma="have") is None
+    assert classify_grammar_marker("runs", "VBZ", lemma="run") is False
+    print("✅ 本地规则正确")
+
+
+def test_batched_fallback_and_cache():
+    """每个句子的歧义token合并为一次请求，结果按 (lemma, POS标签) 缓存"""
+    print("🔍 测试按句子批量判断与缓存")
+    processor = TextProcessor(output_base_dir=tempfile.mkdtemp(), grammar_marker_fallback=True)
+    from src.agents.batch_grammar_marker import BatchGrammarMarkerAssistant
+    completions = _MarkerCompletions()
+    processor.grammar_marker_assistant = BatchGrammarMarkerAssistant()
+    processor.grammar_marker_assistant.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    first = _tokens([("I", "PRP"), ("have", "VBP"), ("waited", "VBN"), ("since", "IN"),
+                     ("you", "PRP"), ("could", "MD"), ("leave", "VB"), ("since", "IN")])
+    processor.detect_grammar_markers(first, "I have waited since you could leave since")
+    assert completions.requests == [["have", "since"]]
+    assert [token.is_grammar_marker for token in first] == [False, True, False, True, False, True, False, True]
+
+    # 相同 (lemma, POS标签) 直接命中缓存，不再请求
+    second = _tokens([("Since", "IN"), ("we", "PRP"), ("have", "VBP"), ("time", "NN")])
+    processor.detect_grammar_markers(second, "Since we have time")
+    assert len(completions.requests) == 1
+    assert [token.is_grammar_marker for token in second] == [True, False, True, False]
+    print(f"✅ 缓存: {processor.grammar_marker_cache}")
+
+
+def test_fallback_disabled():
+    """未启用LLM判断时歧义token保持False，不发送请求"""
+    print("🔍 测试默认不调用LLM")
+    processor = TextProcessor(output_base_dir=tempfile.mkdtemp())
+    tokens = _tokens([("since", "IN"), ("must", "MD")])
+    processor.detect_grammar_markers(tokens, "since must")
+    assert processor.grammar_marker_assistant is None
+    assert [token.is_grammar_marker for token in tokens] == [False, True]
+    print("✅ 默认只使用本地规则")
+
+
+if __name__ == "__main__":
+    test_local_table()
+    test_batched_fallback_and_cache()
+    test_fallback_disabled()
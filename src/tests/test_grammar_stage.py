@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试TextProcessor中的批量语法分析阶段：批量请求、按句子哈希缓存、与token处理并行
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from types import SimpleNamespace
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.agents.batch_grammar_analysis import BatchGrammarAnalysisAssistant
+from src.tests.helpers import make_processor
+
+
+class _GrammarCompletions:
+    """模拟流式返回批量语法分析结果，记录每次请求的句子"""
+
+    def __init__(self):
+        self.requests = []
+        self.started = threading.Event()
+
+    def create(self, **kwargs):
+        self.started.set()
+        items = json.loads(kwargs["messages"][-1]["content"])
+        self.requests.append([item["sentence"] for item in items])
+        rules = lambda sentence: [{"name": "从句" if "because" in sentence else "简单句", "explanation": sentence}]
+        content = json.dumps([{"index": item["index"], "rules": rules(item["sentence"]), "keywords": []}
+                              for item in items], ensure_ascii=False)
+        for i in range(0, len(content), 5):
+            delta = SimpleNamespace(content=content[i:i + 5])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+class _WaitingEstimator:
+    """评估最后一句的token时等待语法分析开始，用于验证两者并行"""
+
+    def __init__(self, started: threading.Event, last_word: str = "left"):
+        self.started = started
+        self.last_word = last_word
+        self.overlapped = False
+
+    def run(self, token_body, verbose=False, handle=None):
+        if token_body == self.last_word:
+            self.overlapped = self.started.wait(timeout=2)
+        return "easy"
+
+
+def _make_processor(base_dir: str, min_complexity=None, grammar_batch_size=2, sentence_batch_size=16,
+                    wait_for_grammar=False):
+    completions = _GrammarCompletions()
+    estimator = _WaitingEstimator(completions.started) if wait_for_grammar else None
+    processor = make_processor(base_dir, estimator=estimator, grammar_analysis=True,
+                               grammar_batch_size=grammar_batch_size, grammar_min_complexity=min_complexity,
+                               sentence_batch_size=sentence_batch_size)
+    processor.grammar_assistant = BatchGrammarAnalysisAssistant(max_sentences=grammar_batch_size)
+    processor.grammar_assistant.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return processor, completions
+
+
+def test_grammar_batched_cached_and_concurrent():
+    """重复句只分析一次，结果写入grammar_annotations，语法分析与token处理并行"""
+    print("🔍 测试批量语法分析阶段")
+    base_dir = tempfile.mkdtemp()
+    processor, completions = _make_processor(base_dir, wait_for_grammar=True)
+    text = "Click here to subscribe. I stayed because it rained. Click  here to subscribe. We left."
+    original_text = processor.process_text_to_structured_data(text, 1, "语法测试")
+
+    analyzed = [sentence for request in completions.requests for sentence in request]
+    assert len(analyzed) == 3, analyzed
+    assert all(len(request) <= 2 for request in completions.requests)
+    annotations = [sentence.grammar_annotations for sentence in original_text.text_by_sentence]
+    assert annotations[0] == annotations[2] == annotations[3] != annotations[1]
+    assert all(len(ids) == 1 for ids in annotations)
+    assert processor.difficulty_estimator.overlapped, "语法分析应与token处理并行"
+
+    # 另一个文本中的重复句直接命中缓存
+    processor.process_text_to_structured_data("click here to subscribe.", 2, "缓存测试")
+    assert sum(len(request) for request in completions.requests) == 3
+
+    # 新的处理器从保存的语法数据中恢复缓存和规则编号
+    restored, restored_completions = _make_processor(base_dir)
+    second = restored.process_text_to_structured_data("I stayed because it rained.", 3, "恢复测试")
+    assert restored_completions.requests == []
+    assert second.text_by_sentence[0].grammar_annotations == annotations[1]
+    print(f"✅ 语法标注: {annotations}")
+
+
+def test_simple_sentences_skipped_by_complexity():
+    """复杂度低于阈值的句子不发送，统计中报告节省的请求数"""
+    print("🔍 测试按复杂度筛选句子")
+    processor, completions = _make_processor(tempfile.mkdtemp(), min_complexity=1.5)
+    text = ("We left. I stayed because it rained. It was cold. "
+            "The book that I bought is good. Click here. Thanks.")
+    original_text = processor.process_text_to_structured_data(text, 1, "复杂度测试")
+
+    analyzed = [sentence for request in completions.requests for sentence in request]
+    assert analyzed == ["I stayed because it rained.", "The book that I bought is good."]
+    annotations = [sentence.grammar_annotations for sentence in original_text.text_by_sentence]
+    assert [bool(ids) for ids in annotations] == [False, True, False, True, False, False]
+    report = processor.grammar_report()
+    assert report["skipped_simple"] == 4
+    assert report["requests"] == 1 and report["requests_saved"] == 2
+    print(f"✅ 统计: {report}")
+
+
+def test_requests_pooled_across_batches():
+    """流水线每批的句子数不是grammar_batch_size的整数倍时，请求仍跨批凑满；产出的句子都已有语法标注"""
+    print("🔍 测试跨批凑满语法请求")
+    processor, completions = _make_processor(tempfile.mkdtemp(), grammar_batch_size=10, sentence_batch_size=8)
+    text = " ".join(f"Sentence number {i} was written because we needed it." for i in range(20))
+    sentences = list(processor.process_iter(text, 1, "跨批测试"))
+
+    assert [len(request) for request in completions.requests] == [10, 10], completions.requests
+    assert len(sentences) == 20 and all(sentence.grammar_annotations for sentence in sentences)
+    assert processor.grammar_report()["requests"] == 2
+    print(f"✅ 请求句子数: {[len(request) for request in completions.requests]}")
+
+
+if __name__ == "__main__":
+    test_grammar_batched_cached_and_concurrent()
+    test_simple_sentences_skipped_by_complexity()
+    test_requests_pooled_across_batches()
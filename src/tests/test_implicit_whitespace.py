@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试隐式空白模式：不为空白创建token，由偏移空隙无损还原，并报告节省的token数和存储
+"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.token_data import fill_whitespace
+from src.tests.helpers import make_processor
+
+SAMPLE = "The committee postponed the vote.  Nobody objected,\n so it passed!\tWas it fair? "
+
+
+def test_whitespace_reconstructed_losslessly():
+    """没有space token，global_token_id连续；还原空白后句子和全文与原文相同"""
+    print("🔍 测试空白还原")
+    processor = make_processor(implicit_whitespace=True)
+    original_text = processor.process_text_to_structured_data(SAMPLE * 3, 1, "隐式空白")
+    all_tokens = [token for sentence in original_text.text_by_sentence for token in sentence.tokens]
+    assert all(token.token_type != "space" for token in all_tokens)
+    assert [token.global_token_id for token in all_tokens] == list(range(len(all_tokens)))
+    for sentence in original_text.text_by_sentence:
+        restored = fill_whitespace(sentence.tokens, sentence.sentence_body, sentence.start)
+        assert "".join(token.token_body for token in restored) == sentence.sentence_body
+    restored = fill_whitespace(all_tokens, original_text.text)
+    assert "".join(token.token_body for token in restored) == original_text.text.strip()
+    print(f"✅ {len(all_tokens)} 个token，空白还原一致")
+
+
+def test_savings_reported():
+    """两种模式处理同一文本，打印token数、tokens.json大小和处理时间"""
+    print("🔍 测试节省量")
+    results = {}
+    for implicit in (False, True):
+        base_dir = tempfile.mkdtemp()
+        processor = make_processor(base_dir, implicit_whitespace=implicit)
+        start = time.perf_counter()
+        original_text = processor.process_text_to_structured_data(SAMPLE * 40, 1, "隐式空白")
+        processor.save_structured_data(original_text, base_dir)
+        elapsed = time.perf_counter() - start
+        count = sum(len(sentence.tokens) for sentence in original_text.text_by_sentence)
+        results[implicit] = (count, os.path.getsize(os.path.join(base_dir, "tokens.json")), elapsed)
+    (full_count, full_size, full_time), (count, size, elapsed) = results[False], results[True]
+    assert count < full_count and size < full_size
+    print(f"📊 token数 {full_count} -> {count}，tokens.json {full_size} -> {size} 字节，"
+          f"处理 {full_time:.3f}s -> {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    test_whitespace_reconstructed_losslessly()
+    test_savings_reported()
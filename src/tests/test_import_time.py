@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试启动开销：只做分词时不加载NLTK/OpenAI，且在导入时间预算内完成
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# 分词路径（导入 + 首次调用）的时间预算（秒）。
+# 实测约20ms，预算留出余量以适应较慢的机器
+TOKENIZE_IMPORT_BUDGET = 0.15
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(",".join(name for name in ("nltk", "openai") if name in sys.modules))
+"""
+
+
+def _run_probe(imports: str):
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(imports=imports)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    lines = result.stdout.splitlines()
+    elapsed, heavy = lines[-2], lines[-1]
+    return float(elapsed), [name for name in heavy.split(",") if name]
+
+
+def test_tokenize_path_within_budget():
+    """只做分词时不加载重依赖，并满足导入时间预算"""
+    print("🔍 测试分词路径的启动开销")
+    elapsed, heavy = _run_probe(
+        "from src.core.token_splitter import split_tokens\nsplit_tokens('Hello, world.')"
+    )
+    assert not heavy, f"分词路径加载了重依赖: {heavy}"
+    assert elapsed < TOKENIZE_IMPORT_BUDGET, f"分词路径耗时 {elapsed * 1000:.1f}ms，超出预算"
+    print(f"✅ 分词路径耗时 {elapsed * 1000:.1f}ms")
+
+
+def test_package_imports_are_lazy():
+    """导入src.utils、src.agents和text_processor不会加载NLTK/OpenAI"""
+    print("🔍 测试包的延迟导入")
+    _, heavy = _run_probe("import src.utils, src.agents, src.core.text_processor")
+    assert not heavy, f"导入时加载了重依赖: {heavy}"
+    print("✅ 导入时未加载NLTK/OpenAI")
+
+
+def test_missing_nltk_data_raises_offline_error():
+    """缺少NLTK数据时抛出明确的错误，而不是联网下载"""
+    print("🔍 测试缺少NLTK数据时的离线错误")
+    try:
+        import nltk
+    except ImportError:
+        print("⚪ 未安装NLTK，跳过")
+        return
+    from src.utils import nltk_resources
+
+    saved_path = list(nltk.data.path)
+    saved_download = nltk.download
+    nltk.data.path[:] = [tempfile.mkdtemp()]
+    nltk.download = lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError("不应联网下载"))
+    nltk_resources._checked.discard("wordnet")
+    try:
+        nltk_resources.require_nltk_resource("wordnet")
+        assert False, "缺少数据时应抛出NLTKResourceMissingError"
+    except nltk_resources.NLTKResourceMissingError as e:
+        assert "wordnet" in str(e)
+        print(f"✅ {e}")
+    finally:
+        nltk.data.path[:] = saved_path
+        nltk.download = saved_download
+
+
+if __name__ == "__main__":
+    test_tokenize_path_within_budget()
+    test_package_imports_are_lazy()
+    test_missing_nltk_data_raises_offline_error()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试流式批量结果的增量JSON解析
+"""
+
+import json
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.text_processor import TextProcessor
+from src.utils.utility import IncrementalJSONParser, iter_json_items, iter_json_string_field
+
+
+def _split(text: str, size: int):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class _StreamingCompletions:
+    """模拟stream=True的chat.completions接口，记录已发送的片段数"""
+
+    def __init__(self, content: str, size: int = 3):
+        self.chunks = _split(content, size)
+        self.sent = 0
+
+    def create(self, **kwargs):
+        assert kwargs.get("stream") is True
+        for piece in self.chunks:
+            self.sent += 1
+            delta = SimpleNamespace(content=piece)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def test_items_emitted_as_soon_as_complete():
+    """每个元素完整到达后立即产出"""
+    print("🔍 测试增量产出")
+    parser = IncrementalJSONParser()
+    assert parser.feed('```json\n{"apple": "ea') == []
+    assert parser.feed('sy", "eph') == [("apple", "easy")]
+    assert parser.feed('emeral": "ha') == []
+    assert parser.feed('rd"') == [("ephemeral", "hard")]
+    assert parser.feed('}\n```') == []
+    assert parser.done
+    print("✅ 增量产出正确")
+
+
+def test_chunk_boundaries_do_not_matter():
+    """任意切分方式得到相同结果"""
+    print("🔍 测试切分无关性")
+    text = "[1, 2.5, 'single', {\"k\": \"]},\"}, true, \"it's\", null]"
+    expected = list(iter_json_items([text]))
+    assert [value for _, value in expected] == [1, 2.5, "single", {"k": "]},"}, True, "it's", None]
+    for size in (1, 2, 7):
+        assert list(iter_json_items(_split(text, size))) == expected
+    print("✅ 切分无关性验证通过")
+
+
+def test_streamed_batch_difficulty_lands_on_tokens():
+    """批量难度评估的结果在流结束前就写入token"""
+    print("🔍 测试流式批量难度评估")
+    processor = TextProcessor(output_base_dir=tempfile.mkdtemp(), batch_difficulty=True)
+    content = '{"The": "easy", "ephemeral": "hard", "cat": "easy"}'
+    completions = _StreamingCompletions(content)
+    from src.agents.batch_token_difficulty_estimation import BatchTokenDifficultyEstimator
+    estimator = BatchTokenDifficultyEstimator()
+    estimator.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    first = next(estimator.iter_run(["The", "ephemeral", "cat"]))
+    assert first == ("The", "easy")
+    assert completions.sent < len(completions.chunks), "第一个结果应在流结束前产出"
+
+    completions.sent = 0
+    processor.batch_difficulty_estimator = estimator
+    processor._generate_vocab_for_token = lambda *args, **kwargs: None  # 不请求词汇解释
+    original_text = processor.process_text_to_structured_data("The ephemeral cat.", 1, "批量测试")
+    levels = {token.token_body: token.difficulty_level
+              for token in original_text.text_by_sentence[0].tokens if token.token_type == "text"}
+    assert levels == {"The": "easy", "ephemeral": "hard", "cat": "easy"}
+    print(f"✅ 难度结果: {levels}")
+
+
+def test_explanation_field_streamed_in_pieces():
+    """explanation字段在回复结束前逐段解码产出"""
+    print("🔍 测试解释字段流式解码")
+    content = '```json\n{"explanation": "短暂的\\n\\"fleeting\\" \\ud83d\\ude00"}\n```'
+    for size in (1, 3, 64):
+        pieces = list(iter_json_string_field(_split(content, size)))
+        assert "".join(pieces) == '短暂的\n"fleeting" \U0001F600'
+    assert len(list(iter_json_string_field(_split(content, 3)))) > 1
+    assert "".join(iter_json_string_field(["plain ", "text"])) == "plain text"
+    print("✅ 解释字段流式解码正确")
+
+
+def _stream_vocab(content: str, context_run):
+    """用模拟的解释流和上下文解释运行stream_token_to_vocab，返回用for循环取得的各项"""
+    from src.agents.vocab_explanation import VocabExplanationAssistant
+    from src.agents.vocab_example_explanation import VocabExampleExplanationAssistant
+    from src.core.token_data import Token
+    from src.utils.token_to_vocab import TokenToVocabConverter
+
+    originals = (VocabExplanationAssistant.stream, VocabExampleExplanationAssistant.run)
+    VocabExplanationAssistant.stream = lambda self, *args, **kwargs: iter(_split(content, 3))
+    VocabExampleExplanationAssistant.run = context_run
+    try:
+        converter = TokenToVocabConverter(os.path.join(tempfile.mkdtemp(), "vocab_data.json"))
+        token = Token(token_body="ephemeral", token_type="text", difficulty_level="hard")
+        counter = converter.vocab_counter
+        items = []
+        for item in converter.stream_token_to_vocab(token, "Fame is ephemeral.", 1, 1):
+            items.append(item)
+    finally:
+        VocabExplanationAssistant.stream, VocabExampleExplanationAssistant.run = originals
+    return items, converter, token, counter
+
+
+def test_stream_ends_with_vocab():
+    """解释片段之后的最后一项是已保存的VocabExpression，用普通for循环即可取得"""
+    print("🔍 测试流式vocab的最后一项")
+    from src.core.token_data import VocabExpression
+    items, converter, token, counter = _stream_vocab(
+        '{"explanation": "短暂的，转瞬即逝的"}', lambda self, *args, **kwargs: {"explanation": "这里指名声短暂"})
+
+    *pieces, vocab = items
+    assert len(pieces) > 1 and all(isinstance(piece, str) for piece in pieces)
+    assert isinstance(vocab, VocabExpression) and vocab.explanation == "".join(pieces) == "短暂的，转瞬即逝的"
+    assert vocab.vocab_id == counter == token.linked_vocab_id
+    with open(converter.vocab_data_file, encoding='utf-8') as f:
+        assert [saved["vocab_id"] for saved in json.load(f)["vocab_expressions"]] == [vocab.vocab_id]
+    print(f"✅ {len(pieces)} 个片段后产出vocab {vocab.vocab_id}")
+
+
+def test_empty_stream_creates_no_vocab():
+    """流式解释为空时不创建、不保存vocab，也不关联到token"""
+    print("🔍 测试空解释流")
+
+    def context_run(self, *args, **kwargs):
+        raise AssertionError("没有解释时不应请求上下文解释")
+
+    items, converter, token, counter = _stream_vocab('{"explanation": ""}', context_run)
+    assert items == []
+    assert token.linked_vocab_id is None
+    assert converter.vocab_counter == counter and not os.path.exists(converter.vocab_data_file)
+    print("✅ 未创建vocab")
+
+
+if __name__ == "__main__":
+    test_items_emitted_as_soon_as_complete()
+    test_chunk_boundaries_do_not_matter()
+    test_streamed_batch_difficulty_lands_on_tokens()
+    test_explanation_field_streamed_in_pieces()
+    test_stream_ends_with_vocab()
+    test_empty_stream_creates_no_vocab()
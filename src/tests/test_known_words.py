@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试学习者已掌握词汇：标星vocab自动加入、跳过难度评估和vocab生成、按学习者统计节省的调用
+"""
+
+import json
+import os
+import sys
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.known_words import KnownWordsStore
+from src.tests.helpers import make_processor
+
+
+class _HardEstimator:
+    def __init__(self):
+        self.calls = []
+
+    def run(self, token_body, verbose=False, handle=None):
+        self.calls.append(token_body)
+        return "hard" if token_body == "ephemeral" else "easy"
+
+
+def _write_vocab(base_dir):
+    vocab_dir = os.path.join(base_dir, "vocab_data")
+    os.makedirs(vocab_dir)
+    vocabs = [{"vocab_id": 1, "vocab_body": "Serendipity", "is_starred": True},
+              {"vocab_id": 2, "vocab_body": "ephemeral", "is_starred": False}]
+    with open(os.path.join(vocab_dir, "vocab_data.json"), 'w', encoding='utf-8') as f:
+        json.dump({"vocab_expressions": vocabs}, f)
+
+
+def test_known_words_skip_llm_calls():
+    """已掌握的词直接为easy，不调用评估器，统计按学习者保存"""
+    print("🔍 测试已掌握词汇")
+    base_dir = tempfile.mkdtemp()
+    _write_vocab(base_dir)
+    store = KnownWordsStore.load("alice", base_dir)
+    store.add(["Quixotic"])
+    store.save()
+
+    estimator = _HardEstimator()
+    processor = make_processor(base_dir, estimator=estimator, learner_id="alice")
+    assert "serendipity" in processor.known_words and "quixotic" in processor.known_words
+
+    for body in ["serendipity", "Quixotic", "quixotic", "table"]:
+        assert processor.assess_token_difficulty(body) == "easy"
+    assert estimator.calls == ["table"]
+
+    # 已缓存为hard的词被学习者掌握后，不再生成vocab
+    processor.difficulty_cache["ephemeral"] = "hard"
+    processor.known_words.add(["ephemeral"])
+    assert processor.assess_token_difficulty("ephemeral") == "easy"
+    report = processor.known_words.report()
+    assert report == {"known_words": 3, "difficulty_calls_saved": 2, "vocab_calls_saved": 1}, report
+
+    # 统计累计保存，其他学习者互不影响
+    processor.known_words.save()
+    assert KnownWordsStore.load("alice", base_dir).report() == report
+    assert len(KnownWordsStore.load("bob", base_dir)) == 0
+    print(f"✅ 统计: {report}")
+
+
+def test_invalid_learner_id_rejected():
+    """学习者ID用作文件名，包含路径的ID被拒绝"""
+    print("🔍 测试学习者ID校验")
+    base_dir = tempfile.mkdtemp()
+    for learner_id in ("../../x", "a/b", "..", "", "alice.json"):
+        try:
+            KnownWordsStore.load(learner_id, base_dir)
+        except ValueError:
+            continue
+        raise AssertionError(f"应拒绝学习者ID {learner_id!r}")
+    assert KnownWordsStore.load("learner_01-b", base_dir).file_path.endswith("learner_01-b.json")
+    print("✅ 无效的学习者ID被拒绝")
+
+
+if __name__ == "__main__":
+    test_known_words_skip_llm_calls()
+    test_invalid_learner_id_rejected()
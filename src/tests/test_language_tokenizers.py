@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试语言检测、分词器注册表（ASCII快速路径、中日文词典分词），以及语言传入难度评估提示词
+"""
+
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core import text_processor
+from src.core.text_processor import TextProcessor
+from src.core.token_splitter import split_tokens, scan_tokens
+from src.utils import cjk_segmenter
+from src.utils.cjk_segmenter import CJKSegmenter
+from src.utils.language import detect_language, has_pos_tagger
+from src.tests.helpers import make_processor
+
+
+def test_detect_language():
+    """按字符区间判断语言"""
+    print("🔍 测试语言检测")
+    assert detect_language("The quick brown fox.") == "English"
+    assert detect_language("Le café est très bon.") == "English"
+    assert detect_language("我们今天去北京。") == "Chinese"
+    assert detect_language("私はコーヒーが好きです。") == "Japanese"
+    assert detect_language("나는 학생입니다.") == "Korean"
+    # 假名不足十分之一时仍是中文
+    assert detect_language("我们今天去北京看朋友的新家。") == "Chinese"
+    assert detect_language("我们今天去北京看朋友の新家。") == "Chinese"
+    assert detect_language("今日は北京に行きます。") == "Japanese"
+    print("✅ 语言检测正确")
+
+
+def test_ascii_fast_path_matches_unicode_pattern():
+    """ASCII快速路径与Unicode模式结果一致"""
+    print("🔍 测试ASCII快速路径")
+    text = "Don't stop-now, it's 10 o'clock...  _ok_ "
+    fast = scan_tokens(text, "English")
+    slow = scan_tokens(text + "\u00e9", "English")
+    assert list(fast.starts) == list(slow.starts)[:len(fast)]
+    assert list(fast.types) == list(slow.types)[:len(fast)]
+    print("✅ 结果一致")
+
+
+def test_cjk_segmentation():
+    """中文按词典最大匹配切分，不再整句作为一个token"""
+    print("🔍 测试中日文分词")
+    original = cjk_segmenter._default_segmenter
+    cjk_segmenter._default_segmenter = CJKSegmenter(["我们", "今天", "北京", "北京大学", "学习"])
+    try:
+        tokens = split_tokens("我们今天去北京大学学习Python。")
+        assert [t["token_body"] for t in tokens] == ["我们", "今天", "去", "北京大学", "学习", "Python", "。"]
+        assert [t["token_type"] for t in tokens][-1] == "punctuation"
+        # 词典中没有的片假名整段作为一个词
+        bodies = [t["token_body"] for t in split_tokens("コーヒーが好き")]
+        assert bodies[0] == "コーヒー"
+        # 词典没有覆盖的连续汉字合为一个token
+        assert [t["token_body"] for t in split_tokens("我们参观了北京")] == ["我们", "参观了", "北京"]
+        # 没有词典时按连续的同类文字切分，不逐字切分
+        cjk_segmenter._default_segmenter = CJKSegmenter()
+        assert [t["token_body"] for t in split_tokens("今天天气很好。")] == ["今天天气很好", "。"]
+        assert [t["token_body"] for t in split_tokens("日本語を勉強します")] == ["日本語", "を", "勉強", "します"]
+    finally:
+        cjk_segmenter._default_segmenter = original
+    print("✅ 分词正确")
+
+
+def test_cjk_fallback_characters_not_assessed():
+    """词典没有覆盖的单字不发送给难度评估，也不生成vocab"""
+    print("🔍 测试中文单字回退")
+    original = cjk_segmenter._default_segmenter
+    cjk_segmenter._default_segmenter = CJKSegmenter(["我们", "今天", "北京"])
+    assessed = []
+    processor = make_processor(estimator=SimpleNamespace(
+        run=lambda token_body, **kwargs: assessed.append(token_body) or "hard"), skip_vocab=True)
+    try:
+        original_text = processor.process_text_to_structured_data("我们今天去北京。", 1, "中文")
+    finally:
+        cjk_segmenter._default_segmenter = original
+    assert assessed == ["我们", "今天", "北京"], assessed
+    levels = {token.token_body: token.difficulty_level for token in original_text.text_by_sentence[0].tokens}
+    assert levels["去"] is None
+    print(f"✅ 评估的token: {assessed}")
+
+
+def test_language_flows_into_difficulty_prompt():
+    """检测到的语言用于创建难度评估器"""
+    print("🔍 测试难度评估提示词中的语言")
+    processor = TextProcessor(output_base_dir=tempfile.mkdtemp())
+    processor.lexicon = None
+    assert processor.split_sentences("我很好。你呢？好的") == ["我很好。", "你呢？", "好的"]
+    processor.language = detect_language("今天天气很好。")
+    estimator = processor.difficulty_estimator
+    assert estimator.language == "Chinese"
+    assert "Chinese tokens" in estimator.sys_prompt
+    print("✅ 提示词语言正确")
+
+
+def test_korean_tokens_not_tagged():
+    """韩文按空格分词，但不使用英语POS标注和lemma"""
+    print("🔍 测试韩文不做英语POS标注")
+    assert has_pos_tagger("English") and not has_pos_tagger("Korean")
+    processor = make_processor()
+    tagged = []
+    original = text_processor.tag_sentence_tokens
+    text_processor.tag_sentence_tokens = tagged.append
+    try:
+        original_text = processor.process_text_to_structured_data("나는 학생입니다. 책을 읽어요.", 1, "韩文")
+    finally:
+        text_processor.tag_sentence_tokens = original
+    assert tagged == []
+    tokens = [token for sentence in original_text.text_by_sentence for token in sentence.tokens
+              if token.token_type == "text"]
+    assert tokens and all(token.pos_tag is None and token.lemma is None for token in tokens)
+    print(f"✅ {len(tokens)} 个韩文token未做POS标注")
+
+
+if __name__ == "__main__":
+    test_detect_language()
+    test_ascii_fast_path_matches_unicode_pattern()
+    test_cjk_segmentation()
+    test_cjk_fallback_characters_not_assessed()
+    test_language_flows_into_difficulty_prompt()
+    test_korean_tokens_not_tagged()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试LemmaService的缓存、批量接口和统计
+使用本地的假lemmatizer，不依赖WordNet数据
+"""
+
+import os
+import sys
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.lemma_service import LemmaService
+
+
+class _CountingLemmatizer:
+    """简单去掉词尾s/ed，并记录调用次数"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def lemmatize(self, word: str, pos: str = "n") -> str:
+        self.calls += 1
+        if pos == "v" and word.endswith("ed"):
+            return word[:-2]
+        if word.endswith("s"):
+            return word[:-1]
+        return word
+
+
+def _make_service(max_size: int = 100) -> LemmaService:
+    service = LemmaService(max_size=max_size)
+    service._lemmatizer = _CountingLemmatizer()
+    return service
+
+
+def test_cache_and_stats():
+    """相同 (词形, 词性) 只计算一次，命中率统计正确"""
+    print("🔍 测试缓存与统计")
+    service = _make_service()
+    assert service.lemmatize("Cats", "NNS") == "cat"
+    assert service.lemmatize("cats", "NNS") == "cat"
+    assert service.lemmatize("walked", "VBD") == "walk"
+    assert service.lemmatize("3rd", "JJ") is None
+    stats = service.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert service._lemmatizer.calls == 2
+    print(f"✅ 统计: {stats}")
+
+
+def test_lemmatize_many_and_bounded_size():
+    """批量接口结果与逐个调用一致，缓存不超过上限"""
+    print("🔍 测试批量接口与缓存上限")
+    service = _make_service(max_size=3)
+    forms = ["dogs", "walked", "dogs", "trees", "cars", "walked"]
+    tags = ["NNS", "VBD", "NNS", "NNS", "NNS", "VBD"]
+    assert service.lemmatize_many(forms, tags) == ["dog", "walk", "dog", "tree", "car", "walk"]
+    assert service.stats()["size"] <= 3
+    print("✅ 批量接口与缓存上限验证通过")
+
+
+def test_thread_safety_and_singleton():
+    """多线程并发访问结果一致，单例在进程内唯一"""
+    print("🔍 测试线程安全")
+    assert LemmaService.instance() is LemmaService.instance()
+    service = _make_service(max_size=50)
+    errors = []
+
+    def worker():
+        for i in range(500):
+            if service.lemmatize(f"word{'abcdefgh'[i % 8]}s", "NNS") != f"word{'abcdefgh'[i % 8]}":
+                errors.append(i)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = service.stats()
+    assert not errors
+    assert stats["hits"] + stats["misses"] == 8 * 500
+    print(f"✅ 命中率: {stats['hit_rate']:.2%}")
+
+
+if __name__ == "__main__":
+    test_cache_and_stats()
+    test_lemmatize_many_and_bounded_size()
+    test_thread_safety_and_singleton()
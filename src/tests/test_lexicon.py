@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试预编译词典的构建、查找，以及lemma服务和难度评估对它的使用
+条目手工构造，不依赖WordNet数据
+"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.text_processor import TextProcessor
+from src.utils.lemma_service import LemmaService
+from src.utils.lexicon import Lexicon, LexiconEntry, build_lexicon
+
+ENTRIES = [
+    LexiconEntry("leaves", lemmas={"n": "leaf", "v": "leave"}, pos_candidates=["n", "v"],
+                 pos_tag="NNS", freq_rank=900, difficulty="easy"),
+    LexiconEntry("ran", lemmas={"v": "run"}, pos_candidates=["v"], pos_tag="VBD", freq_rank=400),
+    LexiconEntry("Ephemeral", pos_candidates=["a"], pos_tag="JJ", freq_rank=30000, difficulty="hard"),
+    LexiconEntry("café", pos_candidates=["n"], pos_tag="NN"),
+]
+
+
+def _build_file() -> str:
+    path = os.path.join(tempfile.mkdtemp(), "lexicon.bin")
+    build_lexicon(ENTRIES, path)
+    return path
+
+
+def test_lookup_from_file_and_buffer():
+    """mmap文件和内存缓冲区得到相同的查找结果"""
+    print("🔍 测试词典查找")
+    path = _build_file()
+    start = time.perf_counter()
+    mapped = Lexicon.open(path)
+    print(f"打开词典用时 {(time.perf_counter() - start) * 1000:.2f}ms")
+    with open(path, "rb") as f:
+        in_memory = Lexicon(f.read())
+
+    for lexicon in (mapped, in_memory):
+        assert len(lexicon) == 4
+        assert lexicon.lemma("leaves", "n") == "leaf"
+        assert lexicon.lemma("Leaves", "v") == "leave"
+        assert lexicon.lemma("leaves") == "leaf"
+        assert lexicon.lemma("ran", "n") == "ran"
+        assert lexicon.lemma("missing") is None
+        assert lexicon.pos_tag("ran") == "VBD"
+        assert lexicon.difficulty("ephemeral") == "hard"
+        assert lexicon.difficulty("ran") is None
+        assert lexicon.freq_rank("café") is None
+        assert "café" in lexicon and "cafe" not in lexicon
+        entry = lexicon.lookup("leaves")
+        assert entry.pos_candidates == ["n", "v"] and entry.freq_rank == 900
+    mapped.close()
+    print("✅ 词典查找正确")
+
+
+def test_old_format_rejected():
+    """旧版本（条目格式不同）的词典文件被拒绝，而不是读出错误的lemma"""
+    print("🔍 测试旧版本词典")
+    data = bytearray(build_lexicon(ENTRIES))
+    data[4:8] = (1).to_bytes(4, "little")
+    try:
+        Lexicon(bytes(data))
+    except ValueError as e:
+        assert "重新构建" in str(e)
+    else:
+        raise AssertionError("旧版本的词典应被拒绝")
+    print("✅ 旧版本被拒绝")
+
+
+def test_lemma_service_uses_lexicon_first():
+    """词典中的词不调用WordNet，词典外的词回退到lemmatizer"""
+    print("🔍 测试lemma服务优先查词典")
+    calls = []
+
+    class _Lemmatizer:
+        def lemmatize(self, word, pos="n"):
+            calls.append(word)
+            return word
+
+    service = LemmaService(lexicon=Lexicon(build_lexicon(ENTRIES)))
+    service._lemmatizer = _Lemmatizer()
+    assert service.lemmatize("Leaves", "VBZ") == "leave"
+    assert service.lemmatize("ran", "VBD") == "run"
+    assert service.lemmatize("zebra", "NN") == "zebra"
+    assert calls == ["zebra"]
+    print("✅ 只有词典外的词调用了lemmatizer")
+
+
+def test_difficulty_gating_skips_estimator():
+    """词典中已有难度结论的词不调用难度评估器"""
+    print("🔍 测试难度评估的词典门控")
+    calls = []
+
+    class _Estimator:
+        def run(self, token_body, verbose=False, handle=None):
+            calls.append(token_body)
+            return "hard"
+
+    processor = TextProcessor(output_base_dir=tempfile.mkdtemp())
+    processor.lexicon = Lexicon(build_lexicon(ENTRIES))
+    processor.difficulty_estimator = _Estimator()
+    assert processor.assess_token_difficulty("leaves") == "easy"
+    assert processor.assess_token_difficulty("Ephemeral") == "hard"
+    assert processor.assess_token_difficulty("zebra") == "hard"
+    assert calls == ["zebra"]
+    print("✅ 只有未知难度的词调用了评估器")
+
+
+if __name__ == "__main__":
+    test_lookup_from_file_and_buffer()
+    test_old_format_rejected()
+    test_lemma_service_uses_lexicon_first()
+    test_difficulty_gating_skips_estimator()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试处理流水线：按批处理、未启用的阶段不运行、钩子、后台阶段，以及各入口配置的输出一致
+"""
+
+import os
+import sys
+import tempfile
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.pipeline import Pipeline, PipelineContext, Stage, SplitStage, TokenizeStage, CollectSink
+from src.core.sentence_splitter import process_text_to_structured_data
+from src.tests.helpers import make_processor
+
+TEXT = ("The committee postponed the vote. Nobody objected! Was it fair? "
+        "Members left early, and the chair closed the session. Then it rained.")
+
+
+def test_batches_hooks_and_disabled_stages():
+    """按批处理时ID连续；未启用的阶段被去掉；钩子在每批前后调用"""
+    print("🔍 测试分批、钩子和未启用的阶段")
+    calls = []
+    disabled = Stage("never", lambda batch, context: calls.append("never"), enabled=False)
+    pipeline = Pipeline([SplitStage(), TokenizeStage(), disabled,
+                         Stage("count", lambda batch, context: calls.append(len(batch))), CollectSink()], batch_size=2)
+    assert pipeline.stage("never") is None and not pipeline.add_hook("never", before=print)
+    seen = []
+    assert pipeline.add_hook("count", before=lambda batch, context: seen.append([s.sentence_id for s in batch]))
+
+    context = pipeline.run(PipelineContext(7, "分批", text=TEXT))
+    assert calls == [2, 2, 1], calls
+    assert seen == [[1, 2], [3, 4], [5]]
+    # 与一次处理整篇（sentence_splitter的配置）结果相同
+    assert context.original_text() == process_text_to_structured_data(TEXT, 7, "分批")
+    print("✅ 分批结果一致")
+
+
+def test_parallel_stage_runs_in_background():
+    """后台阶段在另一个线程中按顺序处理各批，finish在所有批完成之后调用"""
+    print("🔍 测试后台阶段")
+    threads, order = set(), []
+
+    def annotate(batch, context):
+        threads.add(threading.get_ident())
+        order.extend(sentence.sentence_id for sentence in batch)
+
+    finished = []
+    stage = Stage("background", annotate, parallel=True, finish=lambda context: finished.append(list(order)))
+    Pipeline([SplitStage(), TokenizeStage(), stage, CollectSink()], batch_size=1).run(PipelineContext(1, text=TEXT))
+    assert threading.get_ident() not in threads
+    assert finished == [[1, 2, 3, 4, 5]]
+    print("✅ 后台阶段按顺序完成")
+
+
+def test_text_processor_batch_size_does_not_change_output():
+    """TextProcessor每批的句子数不影响输出"""
+    print("🔍 测试TextProcessor分批处理")
+    outputs = []
+    for batch_size in (1, 16):
+        base_dir = tempfile.mkdtemp()
+        processor = make_processor(base_dir, hard_words=["postponed"], skip_vocab=True,
+                                   sentence_batch_size=batch_size)
+        processor.save_structured_data(processor.process_text_to_structured_data(TEXT, 1, "分批"), base_dir)
+        with open(os.path.join(base_dir, "tokens.json"), encoding='utf-8') as f:
+            outputs.append(f.read())
+    assert outputs[0] == outputs[1]
+    assert '"difficulty_level": "hard"' in outputs[0]
+    print("✅ 输出一致")
+
+
+def test_article_scripts_share_pipeline():
+    """简单/最小化文章处理脚本是同一流水线的配置，结果相同"""
+    print("🔍 测试文章处理脚本")
+    from simple_article_processor import process_article_simple
+    from minimal_article_processor import process_article_minimal
+    result = process_article_simple(TEXT)
+    assert result == process_article_minimal(TEXT)
+    assert result["total_sentences"] == 5
+    assert result["total_tokens"] == sum(sentence["token_count"] for sentence in result["sentences"])
+    print("✅ 结果相同")
+
+
+if __name__ == "__main__":
+    test_batches_hooks_and_disabled_stages()
+    test_parallel_stage_runs_in_background()
+    test_text_processor_batch_size_does_not_change_output()
+    test_article_scripts_share_pipeline()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试逐句产出的处理接口：句子完成后立即按原文顺序产出（流水线也可按完成顺序产出），提前停止时不再处理后面的句子
+"""
+
+import json
+import os
+import time
+import sys
+import tempfile
+import threading
+from types import SimpleNamespace
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.pipeline import Pipeline, PipelineContext, Stage, SplitStage, TokenizeStage
+from src.tests.helpers import make_processor
+
+TEXT = "Alpha came first. Bravo came next. Charlie came later. Delta came last."
+
+
+class _RecordingEstimator:
+    """记录被评估的词"""
+
+    def __init__(self):
+        self.words = []
+
+    def run(self, token_body, verbose=False, handle=None):
+        self.words.append(token_body)
+        return "easy"
+
+
+def _make_processor():
+    return make_processor(estimator=_RecordingEstimator(), sentence_batch_size=1)
+
+
+def test_sentences_yielded_before_text_finishes():
+    """第一句产出时后面的句子还没有评估难度；全部产出的结果与一次性处理相同"""
+    print("🔍 测试按顺序逐句产出")
+    processor = _make_processor()
+    iterator = processor.process_iter(TEXT, 1, "逐句")
+    first = next(iterator)
+    assert first.sentence_id == 1 and first.tokens[0].difficulty_level == "easy"
+    assert "Delta" not in processor.difficulty_estimator.words
+    sentences = [first] + list(iterator)
+    expected = _make_processor().process_text_to_structured_data(TEXT, 1, "逐句").text_by_sentence
+    assert sentences == expected
+    print(f"✅ 共产出 {len(sentences)} 句")
+
+
+def test_stop_early_skips_remaining_sentences():
+    """提前停止迭代后不再处理剩下的句子"""
+    print("🔍 测试提前停止")
+    processor = _make_processor()
+    for sentence in processor.process_iter(TEXT, 1, "提前停止"):
+        break
+    assert "Bravo" not in processor.difficulty_estimator.words
+    print("✅ 后面的句子没有处理")
+
+
+def test_stop_early_waits_for_running_grammar():
+    """提前停止时等正在进行的语法请求结束后才保存语法数据，它的结果不会丢失"""
+    print("🔍 测试提前停止时的语法请求")
+    base_dir = tempfile.mkdtemp()
+    processor = make_processor(base_dir, estimator=_RecordingEstimator(), sentence_batch_size=2,
+                               grammar_analysis=True, grammar_batch_size=2, grammar_min_complexity=None)
+
+    def iter_run(sentences, verbose=False, handle=None):
+        time.sleep(0.3)
+        for index, sentence in enumerate(sentences):
+            yield index, {"rules": [{"name": sentence.split()[0], "explanation": ""}]}
+
+    processor.grammar_assistant = SimpleNamespace(iter_run=iter_run)
+    for sentence in processor.process_iter(TEXT, 1, "提前停止"):
+        assert sentence.grammar_annotations
+        break
+    with open(os.path.join(base_dir, "grammar_data", "grammar_data.json"), encoding="utf-8") as f:
+        grammar_data = json.load(f)
+    assert len(grammar_data["sentence_cache"]) == 4, grammar_data["sentence_cache"]
+    print("✅ 正在进行的语法请求结果已保存")
+
+
+def test_as_completed_yields_indices():
+    """流水线按完成顺序产出时，后台阶段先完成的批先产出，并带有句子下标"""
+    print("🔍 测试按完成顺序产出")
+    released = threading.Event()
+
+    def annotate(batch, context):
+        # 第一批等到调用方收到其他句子后才完成
+        if batch[0].sentence_id == 1:
+            released.wait(timeout=2)
+
+    pipeline = Pipeline([SplitStage(), TokenizeStage(), Stage("slow", annotate, parallel=True, workers=2)],
+                        batch_size=2)
+    indices = []
+    for index, _ in pipeline.iter_sentences(PipelineContext(1, text=TEXT), ordered=False):
+        indices.append(index)
+        released.set()
+    assert indices == [2, 3, 0, 1], indices
+    print(f"✅ 完成顺序: {indices}")
+
+
+if __name__ == "__main__":
+    test_sentences_yielded_before_text_finishes()
+    test_stop_early_skips_remaining_sentences()
+    test_stop_early_waits_for_running_grammar()
+    test_as_completed_yields_indices()
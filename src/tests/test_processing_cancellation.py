@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试处理句柄的取消与截止时间
+使用本地的假OpenAI客户端，不发出真实请求
+"""
+
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.processing_handle import ProcessingCancelled
+from src.agents.single_token_difficulty_estimation import SingleTokenDifficultyEstimator
+from src.tests.helpers import make_processor
+
+
+class _SlowCompletions:
+    """模拟耗时的chat.completions接口，并记录请求次数"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        message = SimpleNamespace(content="easy")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _make_processor(delay: float):
+    # 使用真实的难度评估器，只替换它的客户端，请求经过ProcessingHandle
+    completions = _SlowCompletions(delay)
+    estimator = SingleTokenDifficultyEstimator()
+    estimator.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return make_processor(estimator=estimator), completions
+
+
+TEST_TEXT = " ".join(f"word{i}" for i in range(200)) + "."
+
+
+def test_cancel_stops_queued_requests():
+    """取消后不再发出新的请求，已得到的结果保留在缓存中"""
+    print("🔍 测试取消处理")
+    processor, completions = _make_processor(delay=0.02)
+
+    handle = processor.submit_text(TEST_TEXT, 1, "取消测试")
+    # 等到开始发出请求（首次处理时加载词法资源较慢），再处理一段时间后取消
+    deadline = time.monotonic() + 5
+    while completions.calls == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    handle.cancel()
+
+    try:
+        handle.result(timeout=2)
+        assert False, "取消后应抛出ProcessingCancelled"
+    except ProcessingCancelled as e:
+        print(f"✅ 已取消: {e}")
+
+    calls_at_cancel = completions.calls
+    time.sleep(0.1)
+    assert completions.calls == calls_at_cancel, "取消后仍在发出请求"
+    assert 0 < calls_at_cancel < 200
+    assert processor.difficulty_cache, "已获得的难度结果应保留在缓存中"
+    assert handle.partial_result is not None
+    print(f"✅ 取消前请求数: {calls_at_cancel}, 缓存条目: {len(processor.difficulty_cache)}")
+
+
+def test_deadline_interrupts_inflight_request():
+    """截止时间到达时，进行中的慢请求被放弃"""
+    print("🔍 测试截止时间")
+    processor, completions = _make_processor(delay=5)
+
+    start = time.monotonic()
+    handle = processor.submit_text(TEST_TEXT, 2, "截止时间测试", timeout=0.2)
+    try:
+        handle.result(timeout=2)
+        assert False, "超时后应抛出ProcessingCancelled"
+    except ProcessingCancelled as e:
+        print(f"✅ 已超时: {e}")
+
+    elapsed = time.monotonic() - start
+    assert elapsed < 1.5, f"进行中的请求未被放弃，耗时 {elapsed:.2f}s"
+    assert completions.calls == 1
+    print(f"✅ 耗时 {elapsed:.2f}s")
+
+
+def test_cached_results_are_reused():
+    """再次处理同一文本时复用缓存，不重复请求"""
+    print("🔍 测试缓存复用")
+    processor, completions = _make_processor(delay=0)
+
+    processor.process_text_to_structured_data("Hello hello world.", 3, "缓存测试")
+    first_calls = completions.calls
+    processor.process_text_to_structured_data("Hello hello world.", 4, "缓存测试")
+    assert completions.calls == first_calls
+    print(f"✅ 第二次处理未发出新请求（共 {first_calls} 次）")
+
+
+def test_timeout_only_with_deadline():
+    """没有截止时间时不传timeout（保留客户端默认超时）；放弃的流式响应被关闭"""
+    print("🔍 测试请求超时参数")
+    from src.core.processing_handle import ProcessingHandle
+    from src.agents.single_token_difficulty_estimation import SingleTokenDifficultyEstimator
+    seen = []
+    estimator = SingleTokenDifficultyEstimator()
+    estimator.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=lambda **kwargs: seen.append(kwargs) or SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="easy"))]))))
+    estimator.run("word", handle=ProcessingHandle())
+    estimator.run("word", handle=ProcessingHandle(timeout=5))
+    assert "timeout" not in seen[0] and 0 < seen[1]["timeout"] <= 5
+
+    closed = threading.Event()
+    release = threading.Event()
+
+    def slow_stream():
+        release.wait(timeout=2)
+        return SimpleNamespace(close=closed.set)
+
+    handle = ProcessingHandle()
+    threading.Timer(0.05, handle.cancel).start()
+    try:
+        handle.call(slow_stream)
+        assert False, "取消后应抛出ProcessingCancelled"
+    except ProcessingCancelled:
+        pass
+    release.set()
+    assert closed.wait(timeout=2), "放弃的响应应被关闭"
+    print("✅ 超时参数正确")
+
+
+if __name__ == "__main__":
+    test_cancel_stops_queued_requests()
+    test_deadline_interrupts_inflight_request()
+    test_cached_results_are_reused()
+    test_timeout_only_with_deadline()
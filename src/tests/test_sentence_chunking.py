@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试超长句子切分和prompt上下文窗口
+"""
+
+import io
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.document_scanner import scan_document, ChunkedDocumentReader
+from src.core.token_splitter import SPACE
+from src.core.token_data import Sentence, Token
+from src.utils.context_window import quote_window, token_position
+
+# 没有句末标点的抓取文本
+SCRAPED = ("home news sports weather, click here to subscribe; latest stories from our newsroom "
+           "and partners: markets rally as investors weigh the outlook " * 30)
+
+
+def _non_space_tokens(document):
+    return [i for i in range(len(document.tokens)) if document.tokens.types[i] != SPACE]
+
+
+def test_long_sentence_split_at_clauses():
+    """超长句子切分后每段不超过最大长度，优先在从句标点后切分，token不丢失不重复"""
+    print("🔍 测试超长句子切分")
+    whole = scan_document(SCRAPED, "English")
+    assert len(whole) == 1
+    document = scan_document(SCRAPED, "English", max_sentence_length=120)
+    texts = document.sentence_texts()
+    assert len(texts) > 1 and all(len(text) <= 120 for text in texts)
+    assert all(text == text.strip() for text in texts)
+    assert sum(text[-1] in ",;:" for text in texts[:-1]) >= len(texts) // 2
+    covered = [i for index in range(len(document)) for i in document.sentence_token_range(index)
+               if document.tokens.types[i] != SPACE]
+    assert covered == _non_space_tokens(whole)
+    # 一个超长的token自成一段；短句不受影响
+    document = scan_document("tiny " + "x" * 300 + " tail. Short one.", "English", max_sentence_length=100)
+    assert document.sentence_texts() == ["tiny", "x" * 300, "tail.", "Short one."]
+    assert scan_document("Short one. Another!", "English", 100).sentence_texts() == ["Short one.", "Another!"]
+    print(f"✅ 切分为 {len(texts)} 段")
+
+
+def test_streaming_split_matches_full_scan():
+    """流式读取（块边界落在超长句子中间）的切分结果与整篇扫描相同"""
+    print("🔍 测试流式切分")
+    expected = list(scan_document(SCRAPED, "English", 150).iter_sentences())
+    for chunk_size in (37, 256, 1000):
+        reader = ChunkedDocumentReader(io.StringIO(SCRAPED), chunk_size, "English", max_sentence_length=150)
+        assert list(reader.sentences()) == expected, chunk_size
+    print("✅ 结果一致")
+
+
+def test_prompt_window_bounded():
+    """vocab解释prompt只引用目标词附近的窗口"""
+    print("🔍 测试prompt上下文窗口")
+    assert quote_window("A short sentence.", "short", 300) == "A short sentence."
+    window = quote_window(SCRAPED + " the obstreperous crowd " + SCRAPED, "obstreperous", 200)
+    assert "obstreperous" in window and len(window) <= 202
+    assert window.startswith("…") and window.endswith("…")
+    from src.agents.vocab_explanation import VocabExplanationAssistant
+    sentence = Sentence(1, 1, SCRAPED + " obstreperous " + SCRAPED)
+    prompt = VocabExplanationAssistant().build_prompt(sentence, "obstreperous")
+    assert "obstreperous" in prompt and len(prompt) < len(sentence.sentence_body) // 4
+    print(f"✅ prompt {len(prompt)} 字符（句子 {len(sentence.sentence_body)} 字符）")
+
+
+def test_prompt_window_centred_on_token():
+    """目标词在句中出现多次时，窗口以传入的token位置为中心"""
+    print("🔍 测试窗口中心")
+    body = "the obstreperous start " + SCRAPED + " a second obstreperous crowd " + SCRAPED
+    sentence = Sentence(1, 1, body, start=100, end=100 + len(body))
+    second = body.index("obstreperous crowd")
+    token = Token("obstreperous", "text", start=100 + second, end=100 + second + len("obstreperous"))
+    assert token_position(token, sentence) == second
+    assert "start" in quote_window(body, "obstreperous", 200)
+    assert "second obstreperous crowd" in quote_window(body, "obstreperous", 200, position=second)
+    # 位置与目标词不符时退回第一次出现的位置
+    assert "start" in quote_window(body, "obstreperous", 200, position=second + 1)
+    from src.agents.vocab_example_explanation import VocabExampleExplanationAssistant
+    prompt = VocabExampleExplanationAssistant().build_prompt("obstreperous", sentence, position=second)
+    assert "second obstreperous crowd" in prompt
+    print("✅ 窗口以token位置为中心")
+
+
+if __name__ == "__main__":
+    test_long_sentence_split_at_clauses()
+    test_streaming_split_matches_full_scan()
+    test_prompt_window_bounded()
+    test_prompt_window_centred_on_token()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试多进程处理时共享的词法资源：缓存快照、共享内存词典、工作进程内存报告
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.text_processor import TextProcessor
+from src.utils.lexicon import (Lexicon, attach_shared_lexicon, build_lexicon,
+                               entries_from_caches, publish_shared_lexicon)
+
+
+def test_cache_snapshot_only_claims_known_lemmas():
+    """快照只包含缓存中已知词性的lemma，其他词性回退到NLTK"""
+    print("🔍 测试缓存快照")
+    lemma_cache = {("leaves", "v"): "leave", ("ran", "v"): "run", ("cats", None): "cat"}
+    lexicon = Lexicon(build_lexicon(entries_from_caches(lemma_cache, {"Leaves": "easy"})))
+    assert lexicon.lemma("leaves", "v") == "leave"
+    assert lexicon.lemma("leaves", "n") is None
+    assert lexicon.lemma("cats", "n") is None
+    assert lexicon.difficulty("leaves") == "easy"
+    print("✅ 快照内容正确")
+
+
+def test_shared_memory_round_trip():
+    """映射方直接读取共享内存中的词典"""
+    print("🔍 测试共享内存词典")
+    data = build_lexicon(entries_from_caches({("ran", "v"): "run"}, {"ran": "easy"}))
+    shm = publish_shared_lexicon(data)
+    try:
+        attached, lexicon = attach_shared_lexicon(shm.name)
+        assert lexicon.lemma("ran", "v") == "run"
+        assert lexicon.difficulty("ran") == "easy"
+        del lexicon
+        attached.close()
+    finally:
+        shm.close()
+        shm.unlink()
+    print("✅ 共享内存词典读取正确")
+
+
+def test_workers_read_published_verdicts():
+    """工作进程使用父进程发布的难度结论，不调用评估器"""
+    print("🔍 测试多进程批量处理")
+    base_dir = tempfile.mkdtemp()
+    texts = ["The cat sat.", "A dog ran. The cat ran.", "Birds sing."]
+    input_files = []
+    for i, text in enumerate(texts):
+        path = os.path.join(base_dir, f"input_{i}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        input_files.append(path)
+
+    processor = TextProcessor(output_base_dir=os.path.join(base_dir, "out"))
+    for word in ["The", "cat", "sat", "A", "dog", "ran", "Birds", "sing"]:
+        processor.difficulty_cache[word] = "easy"
+
+    class _FailingEstimator:
+        def run(self, *args, **kwargs):
+            raise AssertionError("不应调用难度评估器")
+
+    processor.difficulty_estimator = _FailingEstimator()
+    assert processor.process_multiple_files(input_files, workers=2) == 3
+
+    with open(os.path.join(base_dir, "out", "text_002", "tokens.json"), encoding="utf-8") as f:
+        tokens = json.load(f)
+    levels = {token["difficulty_level"] for token in tokens if token["token_type"] == "text"}
+    assert levels == {"easy"}
+    print("✅ 工作进程读取了共享的难度结论")
+
+
+def test_workers_allocate_unique_ids():
+    """各工作进程从共享计数器分配vocab/规则ID，语法数据在文件锁内合并，不互相覆盖"""
+    print("🔍 测试多进程分配的ID")
+    from src.agents.vocab_explanation import VocabExplanationAssistant
+    from src.agents.vocab_example_explanation import VocabExampleExplanationAssistant
+    from src.agents.batch_grammar_analysis import BatchGrammarAnalysisAssistant
+
+    def explain(self, *args, **kwargs):
+        time.sleep(0.05)
+        return {"explanation": "stub"}
+
+    def analyze(self, sentences, verbose=False, handle=None):
+        for index, sentence in enumerate(sentences):
+            yield index, {"rules": [{"name": f"rule {sentence.split()[0]}", "explanation": "stub"}]}
+
+    base_dir = tempfile.mkdtemp()
+    texts = ["Alpha beta gamma. Delta epsilon zeta.", "Theta iota kappa. Lambda sigma omega."]
+    input_files = []
+    for i, text in enumerate(texts):
+        path = os.path.join(base_dir, f"input_{i}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        input_files.append(path)
+
+    out_dir = os.path.join(base_dir, "out")
+    processor = TextProcessor(output_base_dir=out_dir, grammar_analysis=True, grammar_min_complexity=None)
+    for word in " ".join(texts).replace(".", "").split():
+        processor.difficulty_cache[word] = "hard"
+    # 工作进程由fork创建，继承这里替换的方法
+    originals = (VocabExplanationAssistant.run, VocabExampleExplanationAssistant.run, BatchGrammarAnalysisAssistant.iter_run)
+    VocabExplanationAssistant.run = explain
+    VocabExampleExplanationAssistant.run = explain
+    BatchGrammarAnalysisAssistant.iter_run = analyze
+    try:
+        assert processor.process_multiple_files(input_files, workers=2) == 2
+    finally:
+        VocabExplanationAssistant.run, VocabExampleExplanationAssistant.run, BatchGrammarAnalysisAssistant.iter_run = originals
+
+    with open(os.path.join(out_dir, "vocab_data", "vocab_data.json"), encoding="utf-8") as f:
+        vocab_data = json.load(f)
+    vocab_ids = [vocab["vocab_id"] for vocab in vocab_data["vocab_expressions"]]
+    assert len(vocab_ids) == 12 and len(set(vocab_ids)) == 12, vocab_ids
+    assert vocab_data["next_vocab_id"] > max(vocab_ids)
+
+    with open(os.path.join(out_dir, "grammar_data", "grammar_data.json"), encoding="utf-8") as f:
+        grammar_data = json.load(f)
+    rule_ids = [rule["rule_id"] for rule in grammar_data["grammar_rules"]]
+    assert len(rule_ids) == 4 and len(set(rule_ids)) == 4, rule_ids
+    assert {example["text_id"] for rule in grammar_data["grammar_rules"] for example in rule["examples"]} == {1, 2}
+    print(f"✅ vocab ID {sorted(vocab_ids)}，规则ID {sorted(rule_ids)}")
+
+
+if __name__ == "__main__":
+    test_cache_snapshot_only_claims_known_lemmas()
+    test_shared_memory_round_trip()
+    test_workers_read_published_verdicts()
+    test_workers_allocate_unique_ids()
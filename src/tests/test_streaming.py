@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试流式处理：分块读取、逐窗口写出，输出与一次性处理相同，内存不随输入大小增长
+"""
+
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.token_data import VocabExpression
+from src.tests.helpers import make_processor, read_outputs
+
+SAMPLE = ("The committee postponed the vote. Nobody objected!  Was it fair? "
+          "Members left early,\nand the chair closed the session. ")
+
+
+def _write_input(repeat):
+    path = os.path.join(tempfile.mkdtemp(), "book.txt")
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(repeat):
+            f.write(SAMPLE)
+    return path
+
+
+def test_streaming_matches_full_processing():
+    """小块读取（句子跨块）时输出文件与一次性处理逐字节相同，且仍是json.dump(indent=2)的格式"""
+    print("🔍 测试流式输出与一次性处理一致")
+    path = _write_input(20)
+    base_dir = tempfile.mkdtemp()
+    processor = make_processor(base_dir)
+    assert processor.process_file(path, 1, os.path.join(base_dir, "full"))
+    count = processor.process_file_streaming(path, 1, os.path.join(base_dir, "stream"), chunk_size=37, window_size=3)
+    assert count == 80
+    full = read_outputs(os.path.join(base_dir, "full"))
+    assert read_outputs(os.path.join(base_dir, "stream")) == full
+    for name, content in full.items():
+        assert content == json.dumps(json.loads(content), ensure_ascii=False, indent=2), name
+    print("✅ 输出一致")
+
+
+def test_memory_flat_with_input_size():
+    """输入增大10倍，流式处理的内存峰值基本不变"""
+    print("🔍 测试内存占用")
+    peaks = []
+    for repeat in (20, 200):
+        path = _write_input(repeat)
+        processor = make_processor()
+        tracemalloc.start()
+        processor.process_file_streaming(path, 1, chunk_size=4096, window_size=16)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    print(f"📊 内存峰值: {peaks[0] / 1e6:.2f}MB -> {peaks[1] / 1e6:.2f}MB")
+    assert peaks[1] < peaks[0] * 2
+    print("✅ 内存不随输入增长")
+
+
+def test_vocab_written_once():
+    """流式处理时各窗口的vocab暂存起来，vocab_data.json只写一次"""
+    print("🔍 测试流式处理的vocab保存")
+    path = _write_input(20)
+    base_dir = tempfile.mkdtemp()
+    processor = make_processor(base_dir, hard_words=["vote"])
+    processor._generate_vocab_for_token = lambda token, sentence, text_id, handle=None: VocabExpression(
+        vocab_id=processor._next_id("vocab_counter"), vocab_body=token.token_body, explanation="stub")
+    writes = []
+    save = processor._save_vocab_dicts
+    processor._save_vocab_dicts = lambda vocab_dicts: (writes.append(len(vocab_dicts)), save(vocab_dicts))
+    processor.process_file_streaming(path, 1, os.path.join(base_dir, "stream"), chunk_size=37, window_size=3)
+
+    assert writes == [20], writes
+    with open(os.path.join(base_dir, "vocab_data", "vocab_data.json"), encoding='utf-8') as f:
+        vocab_data = json.load(f)
+    assert [vocab["vocab_id"] for vocab in vocab_data["vocab_expressions"]] == list(range(1, 21))
+    print("✅ vocab_data.json写入1次")
+
+
+if __name__ == "__main__":
+    test_streaming_matches_full_processing()
+    test_memory_flat_with_input_size()
+    test_vocab_written_once()
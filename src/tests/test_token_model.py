@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试slots数据模型和批量创建Token
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.token_data import Token, Sentence, VocabExpression, build_tokens
+from src.core.token_splitter import split_tokens
+
+
+def test_slotted_dataclasses():
+    """数据类不再有__dict__，不能添加未定义的属性"""
+    print("🧪 测试slots数据类...")
+    for instance in (Token("word", "text"), Sentence(1, 1, "A."), VocabExpression(1, "word", "")):
+        assert not hasattr(instance, "__dict__")
+    token = Token("word", "text")
+    try:
+        token.unknown_field = 1
+        assert False, "slots数据类不应允许新属性"
+    except AttributeError:
+        pass
+    print("✅ 数据类使用__slots__")
+
+
+def test_build_tokens_matches_keyword_construction():
+    """build_tokens的结果与逐个按关键字构造相同，重复的token内容共享同一个字符串"""
+    print("🧪 测试build_tokens...")
+    token_dicts = split_tokens("The cat saw the other " + "".join(["c", "a", "t"]) + ".", "English")
+    tokens = build_tokens(token_dicts, 10)
+    expected = [Token(token_body=d["token_body"], token_type=d["token_type"], global_token_id=10 + i,
+                      sentence_token_id=i + 1) for i, d in enumerate(token_dicts)]
+    assert tokens == expected
+    cats = [token.token_body for token in tokens if token.token_body == "cat"]
+    assert len(cats) == 2 and cats[0] is cats[1]
+    print(f"✅ {len(tokens)} 个token一致，重复内容已驻留")
+
+
+def test_failed_tagger_leaves_pos_tag_empty():
+    """tagger出错时pos_tag保持None，不因驻留None而中断处理"""
+    print("🧪 测试tagger出错...")
+    import nltk
+    import importlib
+    get_pos_tag = importlib.import_module("src.utils.get_pos_tag")
+
+    def failing_tagger(sentences):
+        raise RuntimeError("tagger出错")
+
+    originals = (get_pos_tag.require_nltk_resource, nltk.pos_tag_sents)
+    get_pos_tag.require_nltk_resource = lambda name: None
+    nltk.pos_tag_sents = failing_tagger
+    try:
+        tokens = build_tokens(split_tokens("The cat sat.", "English"))
+        get_pos_tag.tag_sentence_tokens([tokens])
+    finally:
+        get_pos_tag.require_nltk_resource, nltk.pos_tag_sents = originals
+    assert all(token.pos_tag is None for token in tokens)
+    print("✅ tagger出错时token未标注")
+
+
+if __name__ == "__main__":
+    test_slotted_dataclasses()
+    test_build_tokens_matches_keyword_construction()
+    test_failed_tagger_leaves_pos_tag_empty()
+    print("\n🎉 所有测试通过")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试token和句子的字符偏移，以及省略内容的输出格式（omit_bodies）
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.structured_output import restore_bodies
+from src.tests.helpers import make_processor, load_outputs
+
+SAMPLE = "The committee postponed the vote.  Nobody objected!\nWas it fair? "
+
+
+def test_offsets_point_into_original_text():
+    """每个token和句子的内容都等于 原文[start:end]"""
+    print("🔍 测试字符偏移")
+    processor = make_processor()
+    original_text = processor.process_text_to_structured_data(SAMPLE * 3, 1, "偏移测试")
+    text = original_text.text
+    for sentence in original_text.text_by_sentence:
+        assert text[sentence.start:sentence.end] == sentence.sentence_body
+        for token in sentence.tokens:
+            assert text[token.start:token.end] == token.token_body
+    print(f"✅ {len(original_text.text_by_sentence)} 个句子的偏移正确")
+
+
+def test_omit_bodies_round_trip():
+    """omit_bodies输出不含内容，补回后与完整输出相同；流式（跨块）输出与一次性输出相同"""
+    print("🔍 测试omit_bodies")
+    path = os.path.join(tempfile.mkdtemp(), "book.txt")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(SAMPLE * 10)
+    base_dir = tempfile.mkdtemp()
+    assert make_processor(base_dir).process_file(path, 1, os.path.join(base_dir, "full"))
+    processor = make_processor(base_dir, omit_bodies=True)
+    assert processor.process_file(path, 1, os.path.join(base_dir, "omit"))
+    processor.process_file_streaming(path, 1, os.path.join(base_dir, "stream"), chunk_size=29, window_size=4)
+
+    full, omitted = load_outputs(os.path.join(base_dir, "full")), load_outputs(os.path.join(base_dir, "omit"))
+    assert omitted == load_outputs(os.path.join(base_dir, "stream"))
+    text = omitted["original_texts.json"]["text_body"]
+    assert text == SAMPLE * 10
+    assert all("token_body" not in record for record in omitted["tokens.json"])
+    assert restore_bodies(text, omitted["tokens.json"]) == full["tokens.json"]
+    sentences = restore_bodies(text, omitted["sentences.json"], "sentence_body")
+    assert [s["sentence_body"] for s in sentences] == [s["sentence_body"] for s in full["sentences.json"]]
+    full_size = os.path.getsize(os.path.join(base_dir, "full", "tokens.json"))
+    omit_size = os.path.getsize(os.path.join(base_dir, "omit", "tokens.json"))
+    print(f"✅ 内容补回一致，tokens.json {full_size} -> {omit_size} 字节")
+
+
+if __name__ == "__main__":
+    test_offsets_point_into_original_text()
+    test_omit_bodies_round_trip()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试偏移数组形式的分词结果：与原有逐个匹配生成字典的实现结果一致，并对比速度和内存
+"""
+
+import random
+import re
+import sys
+import os
+import time
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.token_splitter import scan_tokens, split_tokens, TEXT, SPACE
+
+
+def _legacy_split_tokens(text):
+    """原有实现：每个匹配生成一个字典"""
+    tokens = []
+    for match in re.finditer(r'(\b[\w\'-]+\b)|([^\w\s])|(\s+)', text):
+        if match.group(1):
+            token_type = "text"
+        elif match.group(2):
+            token_type = "punctuation"
+        else:
+            token_type = "space"
+        tokens.append({"token_body": match.group(0), "token_type": token_type})
+    return tokens
+
+
+def test_matches_legacy_on_random_text():
+    """随机文本（含撇号、连字符、下划线、非ASCII字符）与原实现逐个token一致"""
+    print("🔍 测试与原实现一致")
+    rng = random.Random(40)
+    alphabet = "ab'-_ .,!?\n\t1é́—"
+    for _ in range(2000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert split_tokens(text, "English") == _legacy_split_tokens(text), repr(text)
+    print("✅ 2000个随机文本结果一致")
+
+
+def test_spans_and_dict_view():
+    """偏移指向原文，字典接口是数组上的视图"""
+    print("🔍 测试偏移数组")
+    text = "It's  well-known, isn't it?"
+    spans = scan_tokens(text, "English")
+    assert (spans.starts.typecode, spans.ends.typecode, spans.types.typecode) == ('I', 'I', 'B')
+    assert spans.body(0) == "It's" and spans.types[0] == TEXT and spans.types[1] == SPACE
+    assert spans[2] == {"token_body": "well-known", "token_type": "text"}
+    assert "".join(spans.body(i) for i in range(len(spans))) == text
+    print("✅ 偏移正确")
+
+
+def test_throughput_and_memory():
+    """大文本上对比速度和内存（只打印，不做断言）"""
+    text = "Although the weather was terrible, we still enjoyed our vacation. It's well-known! " * 5000
+    start = time.perf_counter()
+    legacy = _legacy_split_tokens(text)
+    legacy_time = time.perf_counter() - start
+    start = time.perf_counter()
+    spans = scan_tokens(text, "English")
+    spans_time = time.perf_counter() - start
+    assert len(spans) == len(legacy)
+    del legacy
+
+    tracemalloc.start()
+    legacy = _legacy_split_tokens(text)
+    legacy_memory = tracemalloc.get_traced_memory()[0]
+    del legacy
+    tracemalloc.stop()
+    tracemalloc.start()
+    spans = scan_tokens(text, "English")
+    spans_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"📊 {len(spans)} 个token: 字典列表 {legacy_time:.3f}s / {legacy_memory / 1e6:.1f}MB，"
+          f"偏移数组 {spans_time:.3f}s / {spans_memory / 1e6:.1f}MB")
+
+
+if __name__ == "__main__":
+    test_matches_legacy_on_random_text()
+    test_spans_and_dict_view()
+    test_throughput_and_memory()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试列式token存储：视图与Token对象一致、可修改、输出文件与对象列表完全相同
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.token_data import Sentence, Token
+from src.core.token_table import TokenTable
+from src.tests.helpers import make_processor, read_outputs
+
+TEXT = "The committee postponed the vote. Nobody objected, so it passed!"
+
+
+def test_views_match_tokens():
+    """from_sentences转换后视图与原Token对象相同，修改视图写回表中"""
+    print("🔍 测试TokenView")
+    tokens = [Token("Hello", "text", "easy", 0, 1, "UH", "hello", False, None, 0, 5),
+              Token(" ", "space", None, 1, 2, start=5, end=6),
+              Token("world", "text", "hard", 2, 3, "NN", "world", False, 7, 6, 11)]
+    sentence = Sentence(1, 1, "Hello world", [], [], tokens=list(tokens))
+    table = TokenTable.from_sentences([sentence])
+    assert table.text == "Hello world" and len(table) == 3
+    assert sentence.tokens == tokens
+    view = sentence.tokens[2]
+    view.difficulty_level = "easy"
+    view.linked_vocab_id = None
+    assert table.to_token(2) == Token("world", "text", "easy", 2, 3, "NN", "world", False, None, 6, 11)
+    assert table.pos_pool.intern("NN") == table.pos_tags[2]
+    print("✅ 视图正确")
+
+
+def test_many_lemmas_do_not_overflow_pos_tags():
+    """lemma超过65535种时仍可追加新的POS标签（POS标签有自己的字符串池）"""
+    print("🔍 测试大量lemma")
+    table = TokenTable()
+    for i in range(70000):
+        table.append(Token(f"w{i}", "text", pos_tag="NN", lemma=f"w{i}"), 0, 0)
+    table.append(Token("x", "text", pos_tag="VBZ", lemma="x"), 0, 0)
+    assert table.to_token(len(table) - 1).pos_tag == "VBZ"
+    assert len(table.pos_pool) == 2
+    print(f"✅ {len(table.pool)} 个lemma，{len(table.pos_pool)} 种POS标签")
+
+
+def test_columnar_processing_writes_same_output():
+    """columnar_tokens=True 时保存的文件与Token对象列表完全相同"""
+    print("🔍 测试列式处理输出")
+    outputs = []
+    for columnar in (False, True):
+        base_dir = tempfile.mkdtemp()
+        processor = make_processor(base_dir, hard_words=["postponed"], skip_vocab=True, columnar_tokens=columnar)
+        original_text = processor.process_text_to_structured_data(TEXT, 1, "列式测试")
+        assert (original_text.token_table is not None) == columnar
+        processor.save_structured_data(original_text, base_dir)
+        outputs.append(read_outputs(base_dir))
+    assert outputs[0] == outputs[1]
+    assert '"difficulty_level": "hard"' in outputs[1]["tokens.json"]
+    print("✅ 输出一致")
+
+
+if __name__ == "__main__":
+    test_views_match_tokens()
+    test_many_lemmas_do_not_overflow_pos_tags()
+    test_columnar_processing_writes_same_output()
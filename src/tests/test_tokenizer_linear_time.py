@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试分词和分句的线性时间保证：
+新的单词模式与原来的 \\b[\\w'-]+\\b 结果一致；对抗性输入（超长连字符/撇号串、百万字符的“句子”、
+组合字符、混合文字）的耗时与长度成正比，吞吐量不低于下限
+"""
+
+import io
+import random
+import re
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.core.token_splitter import scan_tokens
+from src.core.document_scanner import scan_document, ChunkedDocumentReader
+from src.core.sentence_splitter import split_sentences
+
+_LEGACY_REGEX = re.compile(r"(\b[\w'-]+\b|[^\w\s]|\s+)")
+
+# 对抗性输入：长度为n的字符串
+ADVERSARIAL_INPUTS = {
+    "连字符长串": lambda n: "a" + "-" * (n - 2) + " ",
+    "撇号长串": lambda n: "'" * n,
+    "单词与撇号交替": lambda n: "a'" * (n // 2),
+    "单词后跟撇号连字符": lambda n: ("ab'-" * (n // 4)) + "-- ",
+    "无句末标点的长句": lambda n: "word " * (n // 5),
+    "组合字符": lambda n: "é" * (n // 2),
+    "混合文字": lambda n: "aб中ع-'" * (n // 6),
+}
+# 吞吐量下限（字符/秒），远低于正常速度（约150万字符/秒以上），只用于发现超线性退化
+MIN_THROUGHPUT = 200_000
+
+
+def _elapsed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def test_matches_legacy_pattern():
+    """撇号、连字符密集的随机文本（含多种文字）与原模式逐个token一致"""
+    print("🔍 测试与原单词模式一致")
+    rng = random.Random(47)
+    alphabet = "a'-''--b_1 .é́бع中"
+    for _ in range(3000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        legacy = _LEGACY_REGEX.split(text)[1::2]
+        spans = scan_tokens(text, "English")
+        assert [spans.body(i) for i in range(len(spans))] == legacy, repr(text)
+    print("✅ 3000个随机文本结果一致")
+
+
+def test_adversarial_inputs_scale_linearly():
+    """每种对抗性输入：长度放大4倍耗时不超过约4倍（平方复杂度为16倍），吞吐量不低于下限"""
+    print("🔍 测试对抗性输入")
+    small, large = 100_000, 400_000
+    for name, make in ADVERSARIAL_INPUTS.items():
+        for label, func in (("分词", lambda text: scan_tokens(text, "English")),
+                            ("分句", lambda text: scan_document(text, "English")),
+                            ("切分超长句子", lambda text: scan_document(text, "English", max_sentence_length=1000)),
+                            ("正则分句", split_sentences)):
+            small_time = min(_elapsed(func, make(small)) for _ in range(2))
+            large_time = min(_elapsed(func, make(large)) for _ in range(2))
+            assert large_time < 8 * small_time + 0.05, f"{name}/{label}: {small_time:.3f}s -> {large_time:.3f}s"
+            assert large / large_time > MIN_THROUGHPUT, f"{name}/{label}: {large / large_time:.0f} 字符/秒"
+            print(f"   {name}/{label}: {small_time * 1000:.1f}ms -> {large_time * 1000:.1f}ms")
+    print("✅ 耗时与长度成正比")
+
+
+def test_streaming_long_sentence_is_linear():
+    """流式读取远大于块大小的句子（最长百万字符）时不会反复重新扫描整句"""
+    print("🔍 测试流式读取超长句子")
+    times = []
+    for length in (250_000, 1_000_000):
+        text = "word " * (length // 5) + "end."
+        reader = ChunkedDocumentReader(io.StringIO(text), chunk_size=4096, language="English")
+        start = time.perf_counter()
+        sentences = list(reader.sentences())
+        times.append(time.perf_counter() - start)
+        assert len(sentences) == 1 and sentences[0][0] == text.strip()
+    assert times[1] < 8 * times[0] + 0.05, times
+    print(f"✅ {times[0] * 1000:.0f}ms -> {times[1] * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    test_matches_legacy_pattern()
+    test_adversarial_inputs_scale_linearly()
+    test_streaming_long_sentence_is_linear()
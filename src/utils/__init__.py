@@ -1,20 +1,48 @@
 # -*- coding: utf-8 -*-
 """
 工具模块
+
+依赖OpenAI的对象在首次访问时才导入；NLTK及其数据在首次标注/还原时才加载
 """
 
+import importlib
+
 from .get_lemma import get_lemma
 from .get_pos_tag import get_pos_tag
-from .openai_utils import OpenAIHelper
-from .token_to_vocab import TokenToVocabConverter, convert_token_to_vocab
 from .utility import *
 from .config import *
 from .promp import *
 
+# 名称 -> 所在子模块（首次访问时导入）
+_LAZY_ATTRS = {
+    'OpenAIHelper': '.openai_utils',
+    'TokenToVocabConverter': '.token_to_vocab',
+    'convert_token_to_vocab': '.token_to_vocab',
+    'LemmaService': '.lemma_service',
+    'Lexicon': '.lexicon',
+    'build_lexicon': '.lexicon',
+    'KnownWordsStore': '.known_words',
+}
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 __all__ = [
     'get_lemma',
     'get_pos_tag', 
     'OpenAIHelper',
     'TokenToVocabConverter',
-    'convert_token_to_vocab'
-] 
\ No newline at end of file
+    'convert_token_to_vocab',
+    'LemmaService',
+    'Lexicon',
+    'build_lexicon',
+    'KnownWordsStore'
+] 
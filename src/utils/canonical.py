@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Token规范化
+为所有缓存（难度、lemma、vocab、解释）提供统一的键，避免同一个词因
+弯/直撇号、NFC/NFD、所有格's、软连字符、大小写等差异被拆成多个键
+"""
+
+import hashlib
+import re
+import unicodedata
+
+# 各类撇号统一为直撇号
+_APOSTROPHES = "\u2018\u2019\u201b\u02bc\u02b9\u2032\uff07\u00b4"
+# 连字符变体统一为ASCII连字符
+_HYPHENS = "\u2010\u2011\u2012\u2212\ufe63\uff0d"
+# 直接删除的不可见字符：软连字符、零宽字符、BOM
+_INVISIBLE = "\u00ad\u200b\u200c\u200d\u2060\ufeff"
+
+# 预先计算的translate表（模块加载时只构建一次）
+_TRANSLATE_TABLE = str.maketrans(
+    {**{ch: "'" for ch in _APOSTROPHES},
+     **{ch: "-" for ch in _HYPHENS},
+     **{ch: None for ch in _INVISIBLE}}
+)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# 以's结尾但不是所有格的常见缩写（'s = is/has/us）
+_CONTRACTIONS = frozenset({
+    "it's", "that's", "what's", "there's", "here's", "he's", "she's",
+    "who's", "where's", "how's", "let's", "when's", "why's", "one's"
+})
+
+
+def canonicalize_token(token_body: str) -> str:
+    """
+    获取token的规范形式，作为缓存和去重的键
+
+    处理顺序：统一撇号和连字符、删除软连字符等不可见字符、NFC规范化、
+    去掉首尾空白、casefold、去掉所有格（cat's -> cat，students' -> students）
+
+    Args:
+        token_body: token内容
+
+    Returns:
+        str: 规范形式；空token返回空字符串
+    """
+    if not token_body:
+        return ""
+    text = token_body
+    # 纯ASCII的token（绝大多数）不需要查表和NFC规范化
+    if not text.isascii():
+        text = unicodedata.normalize("NFC", text.translate(_TRANSLATE_TABLE))
+    text = text.strip().casefold()
+    if text.endswith("'s") and len(text) > 2 and text not in _CONTRACTIONS:
+        text = text[:-2]
+    elif text.endswith("s'") and len(text) > 2:
+        text = text[:-1]
+    return text
+
+
+def canonicalize_sentence(sentence: str) -> str:
+    """
+    获取句子的规范形式：与token相同的字符统一和NFC规范化，casefold，空白合并为单个空格
+
+    Args:
+        sentence: 句子内容
+
+    Returns:
+        str: 规范形式
+    """
+    if not sentence:
+        return ""
+    text = sentence
+    if not text.isascii():
+        text = unicodedata.normalize("NFC", text.translate(_TRANSLATE_TABLE))
+    return _WHITESPACE_RE.sub(" ", text).strip().casefold()
+
+
+def sentence_hash(sentence: str) -> str:
+    """
+    句子缓存键：规范形式的SHA-1
+
+    Args:
+        sentence: 句子内容
+
+    Returns:
+        str: 十六进制哈希
+    """
+    return hashlib.sha1(canonicalize_sentence(sentence).encode("utf-8")).hexdigest()
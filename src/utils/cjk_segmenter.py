@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基于词典的中文/日文分词（正向最大匹配）
+词典为纯文本，每行一个词（可带词频等字段，只取第一列，兼容jieba词典格式）；
+词典没有覆盖的字符与相邻的同类文字（汉字/平假名/片假名）合为一个token，
+没有词典时每段连续的同类文字就是一个token，不会逐字切分
+"""
+
+import os
+import re
+from typing import Iterable, List, Optional
+
+from .config import CJK_DICT_PATH
+
+# 词典中过长的词不参与匹配，限制每个位置的尝试次数
+MAX_WORD_LENGTH = 8
+
+_CJK_CHAR_REGEX = re.compile('[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]')
+
+
+def _is_katakana(ch: str) -> bool:
+    return '\u30a0' <= ch <= '\u30ff'
+
+
+def _script(ch: str) -> int:
+    """字符所属的文字：0为汉字，1为平假名，2为片假名"""
+    if '\u3040' <= ch <= '\u309f':
+        return 1
+    return 2 if _is_katakana(ch) else 0
+
+
+class CJKSegmenter:
+    """正向最大匹配分词器"""
+
+    def __init__(self, words: Iterable[str] = ()):
+        self.words = {word for word in words if word}
+        self.max_length = min(max((len(word) for word in self.words), default=1), MAX_WORD_LENGTH)
+
+    @classmethod
+    def from_file(cls, path: str) -> "CJKSegmenter":
+        """
+        从词典文件创建分词器
+
+        Args:
+            path: 词典文件路径（每行一个词，第一列为词）
+
+        Returns:
+            CJKSegmenter: 分词器
+        """
+        words = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.split()
+                if fields and not fields[0].startswith('#'):
+                    words.append(fields[0])
+        return cls(words)
+
+    def segment(self, text: str) -> List[str]:
+        """
+        切分一段连续的中日文字符
+
+        Args:
+            text: 不含空格和标点的中日文字符串
+
+        Returns:
+            List[str]: 词列表
+        """
+        pieces = []
+        position = 0
+        run_start = None
+        length = len(text)
+        words = self.words
+        while position < length:
+            end = min(position + self.max_length, length)
+            # 从最长的候选开始尝试
+            while end > position and text[position:end] not in words:
+                end -= 1
+            if end > position:
+                if run_start is not None:
+                    pieces.append(text[run_start:position])
+                    run_start = None
+                pieces.append(text[position:end])
+                position = end
+                continue
+            # 词典没有覆盖的字符并入前面同类文字的片段
+            if run_start is not None and _script(text[run_start]) != _script(text[position]):
+                pieces.append(text[run_start:position])
+                run_start = None
+            if run_start is None:
+                run_start = position
+            position += 1
+            if _is_katakana(text[run_start]):
+                # 词典中没有的片假名（多为外来语）整段作为一个词
+                while position < length and _is_katakana(text[position]):
+                    position += 1
+        if run_start is not None:
+            pieces.append(text[run_start:])
+        return pieces
+
+    def is_fallback(self, piece: str) -> bool:
+        """
+        判断token是否为词典没有覆盖的单个汉字或假名（不是确定的词，不发送给难度评估和vocab生成）
+
+        Args:
+            piece: token内容
+
+        Returns:
+            bool: 是否为单字回退
+        """
+        return len(piece) == 1 and piece not in self.words and bool(_CJK_CHAR_REGEX.match(piece))
+
+
+_default_segmenter: Optional[CJKSegmenter] = None
+
+
+def get_default_segmenter() -> CJKSegmenter:
+    """
+    获取默认分词器（首次调用时读取CJK_DICT_PATH，文件不存在时按连续的同类文字切分）
+
+    Returns:
+        CJKSegmenter: 进程内共享的分词器
+    """
+    global _default_segmenter
+    if _default_segmenter is None:
+        if os.path.exists(CJK_DICT_PATH):
+            _default_segmenter = CJKSegmenter.from_file(CJK_DICT_PATH)
+        else:
+            _default_segmenter = CJKSegmenter()
+    return _default_segmenter
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+句子复杂度评分
+只根据已有的token（及其POS标签）在本地计算，用于决定句子是否需要LLM语法分析
+"""
+
+from typing import Any, Dict, Iterable, Union
+
+# 默认阈值：低于该分数的句子视为简单句，不做语法分析
+DEFAULT_COMPLEXITY_THRESHOLD = 1.5
+
+# 从属连词
+SUBORDINATORS = frozenset({
+    "although", "though", "because", "since", "unless", "while", "whereas", "whether",
+    "if", "when", "whenever", "wherever", "after", "before", "until", "till", "once", "lest"
+})
+# 关系代词/关系副词
+RELATIVE_WORDS = frozenset({"who", "whom", "whose", "which", "that", "where", "why"})
+
+# Penn Treebank标签
+_FINITE_VERB_TAGS = frozenset({"VBD", "VBP", "VBZ", "MD"})
+_NON_FINITE_VERB_TAGS = frozenset({"VBG", "VBN"})
+_WH_TAGS = frozenset({"WDT", "WP", "WP$", "WRB"})
+
+# 各特征的权重
+_WEIGHTS = {
+    "length": 0.08,        # 每个词
+    "subordinator": 1.5,   # 每个从属连词
+    "relative": 1.2,       # 每个关系词
+    "comma": 0.5,          # 每个逗号/分号/冒号
+    "finite_verb": 0.6,    # 第二个及之后的限定动词（多个谓语意味着多个分句）
+    "non_finite": 0.3,     # 分词
+}
+
+
+def _field(token: Union[Dict[str, Any], Any], name: str):
+    if isinstance(token, dict):
+        return token.get(name)
+    return getattr(token, name, None)
+
+
+def complexity_features(tokens: Iterable[Union[Dict[str, Any], Any]]) -> Dict[str, int]:
+    """
+    统计句子的复杂度特征
+
+    Args:
+        tokens: Token对象或token字典（含token_body、token_type，可选pos_tag）
+
+    Returns:
+        Dict[str, int]: 各特征的计数
+    """
+    features = {name: 0 for name in _WEIGHTS}
+    for token in tokens:
+        token_type = _field(token, "token_type")
+        body = _field(token, "token_body") or ""
+        if token_type == "punctuation":
+            if body in (",", ";", ":"):
+                features["comma"] += 1
+            continue
+        if token_type != "text":
+            continue
+        features["length"] += 1
+        word = body.lower()
+        tag = _field(token, "pos_tag")
+        if tag:
+            if tag == "IN" and word in SUBORDINATORS:
+                features["subordinator"] += 1
+            elif tag in _WH_TAGS:
+                features["relative"] += 1
+            elif tag in _FINITE_VERB_TAGS:
+                features["finite_verb"] += 1
+            elif tag in _NON_FINITE_VERB_TAGS:
+                features["non_finite"] += 1
+        elif word in SUBORDINATORS:
+            features["subordinator"] += 1
+        elif word in RELATIVE_WORDS:
+            features["relative"] += 1
+    # 第一个限定动词是主句谓语，不计分
+    features["finite_verb"] = max(features["finite_verb"] - 1, 0)
+    return features
+
+
+def sentence_complexity(tokens: Iterable[Union[Dict[str, Any], Any]]) -> float:
+    """
+    计算句子的复杂度分数（越高越复杂）
+
+    没有POS标签时只使用词表特征；有POS标签时额外计入动词构成，
+    并用标签区分从属连词与同形的介词/副词
+
+    Args:
+        tokens: Token对象或token字典
+
+    Returns:
+        float: 复杂度分数
+    """
+    features = complexity_features(tokens)
+    return sum(_WEIGHTS[name] * count for name, count in features.items())
@@ -33,4 +33,22 @@ def check_openai_setup() -> bool:
         get_openai_config()
         return True
     except ValueError:
-        return False 
\ No newline at end of file
+        return False 
+
+# 预编译词典文件路径（不存在时回退到NLTK）
+LEXICON_PATH = os.getenv(
+    'LEXICON_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data', 'lexicon.bin')
+)
+
+# 中文/日文分词词典（每行一个词；不存在时按连续的同类文字切分）
+CJK_DICT_PATH = os.getenv(
+    'CJK_DICT_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data', 'cjk_dict.txt')
+)
+
+# 超长句子（如没有句末标点的抓取文本）按从句标点或空白切分的最大长度（字符数）
+MAX_SENTENCE_LENGTH = int(os.getenv('MAX_SENTENCE_LENGTH', '1000'))
+
+# vocab解释prompt中引用的句子上下文最大长度（字符数），超出时只保留目标词附近的窗口
+PROMPT_CONTEXT_CHARS = int(os.getenv('PROMPT_CONTEXT_CHARS', '300'))
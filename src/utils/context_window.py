@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+prompt中引用句子的上下文窗口
+句子不超过最大长度时原样引用；超出时只保留目标词附近的一段（在空白处截断，两端加省略号），
+避免超长句子中的每个生词都把整句发送一次
+"""
+
+import re
+from typing import Optional
+
+from .config import PROMPT_CONTEXT_CHARS
+
+_ELLIPSIS = "…"
+
+
+def _find_target(sentence: str, target: str) -> int:
+    """目标词在句子中的位置（优先完整单词匹配，找不到时返回0）"""
+    if not target:
+        return 0
+    match = re.search(r'(?<!\w)' + re.escape(target) + r'(?!\w)', sentence)
+    if match:
+        return match.start()
+    position = sentence.lower().find(target.lower())
+    return max(position, 0)
+
+
+def token_position(token, sentence) -> Optional[int]:
+    """
+    token在句子中的位置（token和句子的原文偏移都已知时），作为quote_window的position
+
+    Args:
+        token: Token对象
+        sentence: token所在的Sentence对象
+
+    Returns:
+        Optional[int]: token.start - sentence.start，偏移未知时为None
+    """
+    if getattr(token, "start", None) is None or getattr(sentence, "start", None) is None:
+        return None
+    return token.start - sentence.start
+
+
+def quote_window(sentence: str, target: str, max_chars: int = PROMPT_CONTEXT_CHARS,
+                 position: Optional[int] = None) -> str:
+    """
+    截取句子中目标词附近的上下文
+
+    Args:
+        sentence: 句子内容
+        target: 目标词
+        max_chars: 窗口最大长度（字符数，不含省略号）
+        position: 目标词在句子中的位置（可选，见token_position）。同一个词在句子中出现多次时以这一处为中心；
+                  未指定或与目标词不符时以第一次出现的位置为中心
+
+    Returns:
+        str: 句子本身（不超过max_chars时），或以目标词为中心的片段
+    """
+    if len(sentence) <= max_chars:
+        return sentence
+    if position is None or sentence[position:position + len(target)] != target:
+        position = _find_target(sentence, target)
+    start = max(0, position - (max_chars - len(target)) // 2)
+    end = min(len(sentence), start + max_chars)
+    start = max(0, end - max_chars)
+    # 两端对齐到空白，不截断单词（目标词本身始终保留）
+    if start > 0:
+        space = sentence.find(" ", start, position)
+        if space != -1:
+            start = space + 1
+    if end < len(sentence):
+        space = sentence.rfind(" ", position + len(target), end)
+        if space != -1:
+            end = space
+    return ((_ELLIPSIS if start > 0 else "") + sentence[start:end].strip()
+            + (_ELLIPSIS if end < len(sentence) else ""))
@@ -1,28 +1,34 @@
-import nltk
-from nltk.stem import WordNetLemmatizer
-from nltk.corpus import wordnet
 from typing import Optional
-import os
+from .nltk_resources import require_nltk_resource, download_nltk_data
+from .lexicon import get_default_lexicon
 
-# 下载必要的NLTK数据（如果还没有下载的话）
+# NLTK及其数据在首次使用时才加载；缺少数据时抛出NLTKResourceMissingError，不会自动下载
 def ensure_nltk_data():
-    """确保NLTK数据已下载"""
-    try:
-        # 检查wordnet是否可用
-        nltk.data.find('corpora/wordnet')
-    except LookupError:
-        print("正在下载WordNet数据...")
-        nltk.download('wordnet', quiet=True)
-    
-    try:
-        # 检查pos_tagger是否可用
-        nltk.data.find('taggers/averaged_perceptron_tagger')
-    except LookupError:
-        print("正在下载POS tagger数据...")
-        nltk.download('averaged_perceptron_tagger', quiet=True)
+    """下载所需的NLTK数据（需要联网，只在安装/部署时显式调用）"""
+    download_nltk_data()
 
-# 确保数据已下载
-ensure_nltk_data()
+# Penn Treebank词性标签首字母 -> WordNet词性标签
+# （直接使用WordNet的词性常量值，避免在导入时加载WordNet语料）
+PENN_TO_WORDNET = {
+    "J": "a",   # wordnet.ADJ
+    "N": "n",   # wordnet.NOUN
+    "V": "v",   # wordnet.VERB
+    "R": "r"    # wordnet.ADV
+}
+
+def penn_to_wordnet_pos(tag: Optional[str]) -> str:
+    """
+    将Penn Treebank词性标签转换为WordNet词性标签
+    
+    Args:
+        tag: Penn Treebank词性标签（如 "VBD"）
+        
+    Returns:
+        str: WordNet词性标签，无法识别时返回NOUN
+    """
+    if not tag:
+        return "n"
+    return PENN_TO_WORDNET.get(tag[0], "n")
 
 def get_wordnet_pos(word: str) -> str:
     """
@@ -34,58 +40,43 @@ def get_wordnet_pos(word: str) -> str:
     Returns:
         str: WordNet词性标签
     """
+    # 优先查预编译词典
+    lexicon = get_default_lexicon()
+    if lexicon is not None:
+        pos = lexicon.primary_pos(word)
+        if pos is not None:
+            return pos
+    
+    require_nltk_resource("tagger")
     try:
+        import nltk
         # 获取单词的词性
         tag = nltk.pos_tag([word])[0][1]
         
         # 将Penn Treebank词性标签转换为WordNet词性标签
-        tag_dict = {
-            "J": wordnet.ADJ,
-            "N": wordnet.NOUN,
-            "V": wordnet.VERB,
-            "R": wordnet.ADV
-        }
-        
-        return tag_dict.get(tag[0], wordnet.NOUN)
+        return penn_to_wordnet_pos(tag)
     except Exception as e:
         # 如果POS tagging失败，返回默认的NOUN
-        return wordnet.NOUN
+        return "n"
 
-def get_lemma(token_body: str) -> Optional[str]:
+def get_lemma(token_body: str, pos_tag: Optional[str] = None) -> Optional[str]:
     """
     获取text类token的lemma形式
     
     Args:
         token_body: text类token的内容
+        pos_tag: 句子级标注得到的Penn Treebank词性标签；提供时不再单独调用tagger
         
     Returns:
         Optional[str]: lemma形式，如果无法获取则返回None
-    """
-    if not token_body or not token_body.strip():
-        return None
-    
-    # 清理token，移除标点符号
-    clean_token = token_body.strip().lower()
-    
-    # 如果token只包含标点符号或数字，返回None
-    if not clean_token.isalpha():
-        return None
-    
-    try:
-        # 创建lemmatizer
-        lemmatizer = WordNetLemmatizer()
         
-        # 获取词性
-        pos = get_wordnet_pos(clean_token)
-        
-        # 获取lemma
-        lemma = lemmatizer.lemmatize(clean_token, pos)
-        
-        return lemma
-        
-    except Exception as e:
-        # 静默处理错误，返回None而不是打印错误信息
-        return None
+    Raises:
+        NLTKResourceMissingError: 缺少WordNet或tagger数据
+    """
+    # 由进程内单例LemmaService完成：复用lemmatizer并缓存结果
+    # 延迟导入以避免循环导入
+    from .lemma_service import LemmaService
+    return LemmaService.instance().lemmatize(token_body, pos_tag)
 
 def main():
     """
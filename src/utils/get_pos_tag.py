@@ -1,12 +1,9 @@
-import nltk
-from typing import Optional
+from typing import Optional, List
+from .nltk_resources import require_nltk_resource
+from .lexicon import get_default_lexicon
+from ..core.token_data import intern_string
 
-# 下载必要的NLTK数据（如果还没有下载的话）
-try:
-    nltk.data.find('taggers/averaged_perceptron_tagger')
-except LookupError:
-    print("正在下载POS tagger数据...")
-    nltk.download('averaged_perceptron_tagger')
+# NLTK及tagger数据在首次标注时才加载；缺少数据时抛出NLTKResourceMissingError，不会自动下载
 
 def get_pos_tag(token_body: str) -> Optional[str]:
     """
@@ -17,11 +14,23 @@ def get_pos_tag(token_body: str) -> Optional[str]:
         
     Returns:
         Optional[str]: POS标签，如果无法获取则返回None
+        
+    Raises:
+        NLTKResourceMissingError: 缺少tagger数据
     """
     if not token_body or not token_body.strip():
         return None
     
+    # 优先查预编译词典（孤立标注的结果与tagger一致）
+    lexicon = get_default_lexicon()
+    if lexicon is not None:
+        pos_tag = lexicon.pos_tag(token_body)
+        if pos_tag is not None:
+            return pos_tag
+    
+    require_nltk_resource("tagger")
     try:
+        import nltk
         # 使用NLTK的POS tagger获取词性标签
         pos_tags = nltk.pos_tag([token_body])
         
@@ -34,6 +43,61 @@ def get_pos_tag(token_body: str) -> Optional[str]:
         print(f"处理token '{token_body}' 时发生错误: {e}")
         return None
 
+def pos_tag_words(words: List[str]) -> List[Optional[str]]:
+    """
+    对一个句子中的多个词一次性进行POS标注（利用上下文，只调用一次tagger）
+    
+    Args:
+        words: 句子中按顺序排列的词
+        
+    Returns:
+        List[Optional[str]]: 与words一一对应的POS标签，标注失败时为None
+    """
+    if not words:
+        return []
+    
+    require_nltk_resource("tagger")
+    try:
+        import nltk
+        return [tag for _, tag in nltk.pos_tag(words)]
+    except Exception as e:
+        print(f"句子POS标注时发生错误: {e}")
+        return [None] * len(words)
+
+def pos_tag_sentences(sentences: List[List[str]]) -> List[List[Optional[str]]]:
+    """
+    对多个句子批量进行POS标注
+    
+    Args:
+        sentences: 每个句子的词列表
+        
+    Returns:
+        List[List[Optional[str]]]: 每个句子的POS标签列表
+    """
+    if not sentences:
+        return []
+    
+    require_nltk_resource("tagger")
+    try:
+        import nltk
+        return [[tag for _, tag in tagged] for tagged in nltk.pos_tag_sents(sentences)]
+    except Exception as e:
+        print(f"批量POS标注时发生错误: {e}")
+        return [[None] * len(words) for words in sentences]
+
+def tag_sentence_tokens(tokens_by_sentence: List[list]) -> None:
+    """
+    为一批句子中的text类型token填充pos_tag（整批只调用一次tagger）
+    
+    Args:
+        tokens_by_sentence: 每个句子的Token对象列表
+    """
+    text_tokens = [[token for token in tokens if token.token_type == "text"] for tokens in tokens_by_sentence]
+    tags_by_sentence = pos_tag_sentences([[token.token_body for token in tokens] for tokens in text_tokens])
+    for tokens, tags in zip(text_tokens, tags_by_sentence):
+        for token, tag in zip(tokens, tags):
+            token.pos_tag = intern_string(tag)
+
 def get_pos_tag_description(pos_tag: str) -> str:
     """
     获取POS标签的描述
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+语法标记词识别的本地规则表
+根据句子级POS标签判断封闭词类（连词、情态动词、关系词等）是否为语法标记；
+无法仅凭词形和标签确定的词返回None，交给LLM按句子批量判断
+"""
+
+from typing import Optional
+
+# 并列连词
+COORDINATORS = frozenset({"and", "but", "or", "nor", "yet"})
+# 含义明确的从属连词
+SUBORDINATORS = frozenset({
+    "although", "though", "because", "unless", "whereas", "whether", "if", "lest", "whenever", "wherever"
+})
+# 既可作从属连词也可作介词/副词的词（需要结合句子判断）
+AMBIGUOUS_CONNECTIVES = frozenset({
+    "since", "while", "after", "before", "until", "till", "as", "once", "that", "so", "for", "like", "when", "where"
+})
+# 情态动词
+MODALS = frozenset({
+    "can", "could", "may", "might", "must", "shall", "should", "will", "would", "ought"
+})
+# 关系代词/疑问词
+WH_WORDS = frozenset({"who", "whom", "whose", "which", "what", "whatever", "whoever", "why", "how"})
+# 助动词（作助动词时是语法标记，作实义动词时不是）
+AUXILIARIES = frozenset({
+    "be", "am", "is", "are", "was", "were", "been", "being",
+    "have", "has", "had", "having", "do", "does", "did"
+})
+
+_WH_TAGS = frozenset({"WDT", "WP", "WP$", "WRB"})
+# 开放词类：直接判定为非语法标记
+_CONTENT_TAG_PREFIXES = ("NN", "JJ", "CD", "FW", "SYM", "UH", "LS", "POS", "PRP", "DT", "PDT", "EX", "RP")
+
+
+def classify_grammar_marker(word: str, pos_tag: Optional[str] = None, lemma: Optional[str] = None) -> Optional[bool]:
+    """
+    用本地规则判断token是否为语法标记
+
+    Args:
+        word: token内容
+        pos_tag: 句子级POS标注得到的Penn Treebank标签（可选）
+        lemma: token的lemma（可选，用于识别助动词）
+
+    Returns:
+        Optional[bool]: True/False；需要结合句子判断时返回None
+    """
+    form = (word or "").strip().lower()
+    if not form or not any(ch.isalpha() for ch in form):
+        return False
+    base = (lemma or form).lower()
+
+    if not pos_tag:
+        # 没有POS标签时只依靠词表
+        if form in MODALS or form in SUBORDINATORS or form in COORDINATORS:
+            return True
+        if form in WH_WORDS or form in AMBIGUOUS_CONNECTIVES or base in AUXILIARIES:
+            return None
+        return False
+
+    if pos_tag == "MD":
+        return True
+    if pos_tag == "CC":
+        return form in COORDINATORS
+    if pos_tag in _WH_TAGS:
+        return True
+    if pos_tag == "IN":
+        if form in SUBORDINATORS:
+            return True
+        if form in AMBIGUOUS_CONNECTIVES:
+            return None
+        # 普通介词
+        return False
+    if pos_tag == "TO":
+        # 不定式标记还是介词需要看上下文
+        return None
+    if pos_tag.startswith("VB"):
+        return None if base in AUXILIARIES or form in AUXILIARIES else False
+    if pos_tag.startswith("RB"):
+        return None if form in AMBIGUOUS_CONNECTIVES else False
+    if pos_tag.startswith(_CONTENT_TAG_PREFIXES):
+        return False
+    return False
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+学习者已掌握词汇表
+每个学习者一个文件（known_words/<learner_id>.json），加载后是内存中的集合，成员判断为O(1)；
+难度评估和vocab生成先查这里，已掌握的lemma不再调用LLM，并按学习者累计节省的调用次数
+"""
+
+import json
+import os
+import re
+from contextlib import nullcontext
+from typing import Dict, Iterable, Optional, Set
+
+from .canonical import canonicalize_token
+
+STAGES = ("difficulty", "vocab")
+# 学习者ID用作文件名，只允许字母、数字、下划线和连字符（不能包含路径分隔符或"..")
+_LEARNER_ID = re.compile(r'[A-Za-z0-9_-]+')
+
+
+class KnownWordsStore:
+    """单个学习者的已掌握词汇（按规范化的lemma存储）"""
+
+    def __init__(self, learner_id: str, file_path: str):
+        self.learner_id = learner_id
+        self.file_path = file_path
+        self.words: Set[str] = set()
+        # 已写入文件的累计节省次数，以及本进程尚未写入的增量
+        self.saved_calls: Dict[str, int] = {stage: 0 for stage in STAGES}
+        self._pending_calls: Dict[str, int] = {stage: 0 for stage in STAGES}
+        self._pending_words: Set[str] = set()
+        # 同一个词在一个阶段只计一次（重复出现的词本来也会命中缓存）
+        self._counted: Dict[str, Set[str]] = {stage: set() for stage in STAGES}
+
+    @classmethod
+    def load(cls, learner_id: str, base_dir: str = "data") -> "KnownWordsStore":
+        """
+        读取学习者的已掌握词汇，文件不存在时返回空表
+
+        Args:
+            learner_id: 学习者ID
+            base_dir: 数据目录，文件位于 base_dir/known_words/<learner_id>.json
+
+        Returns:
+            KnownWordsStore: 已掌握词汇表
+
+        Raises:
+            ValueError: 学习者ID包含字母、数字、下划线和连字符以外的字符
+        """
+        if not isinstance(learner_id, str) or not _LEARNER_ID.fullmatch(learner_id):
+            raise ValueError(f"无效的学习者ID: {learner_id!r}（只能包含字母、数字、下划线和连字符）")
+        store = cls(learner_id, os.path.join(base_dir, "known_words", f"{learner_id}.json"))
+        data = store._read()
+        store.words = set(data.get("words", []))
+        store.saved_calls.update(data.get("calls_saved", {}))
+        return store
+
+    def _read(self) -> dict:
+        if not os.path.exists(self.file_path):
+            return {}
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️  读取已掌握词汇失败: {e}")
+            return {}
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        return canonicalize_token(word) in self.words
+
+    def knows(self, token_body: str, lemma: Optional[str] = None) -> bool:
+        """
+        判断学习者是否已掌握该词（lemma或原词命中均算）
+
+        Args:
+            token_body: token内容
+            lemma: token的lemma（可选）
+
+        Returns:
+            bool: 是否已掌握
+        """
+        if not self.words:
+            return False
+        if lemma and canonicalize_token(lemma) in self.words:
+            return True
+        return canonicalize_token(token_body) in self.words
+
+    def add(self, words: Iterable[str]) -> int:
+        """
+        标记为已掌握
+
+        Args:
+            words: 词或lemma列表
+
+        Returns:
+            int: 新增的词数
+        """
+        added = 0
+        for word in words:
+            key = canonicalize_token(word)
+            if key and key not in self.words:
+                self.words.add(key)
+                self._pending_words.add(key)
+                added += 1
+        return added
+
+    def seed_from_vocab_file(self, vocab_data_file: str) -> int:
+        """
+        把vocab数据中已标星（is_starred）的词加入已掌握词汇
+
+        Args:
+            vocab_data_file: vocab_data.json路径
+
+        Returns:
+            int: 新增的词数
+        """
+        if not os.path.exists(vocab_data_file):
+            return 0
+        try:
+            with open(vocab_data_file, 'r', encoding='utf-8') as f:
+                vocabs = json.load(f).get('vocab_expressions', [])
+        except Exception as e:
+            print(f"⚠️  读取vocab数据失败: {e}")
+            return 0
+        return self.add(vocab['vocab_body'] for vocab in vocabs if vocab.get('is_starred') and vocab.get('vocab_body'))
+
+    def record_saved(self, stage: str, word: str):
+        """记录一次因已掌握而省去的LLM调用（同一个词每个阶段只计一次）"""
+        key = canonicalize_token(word)
+        if key in self._counted[stage]:
+            return
+        self._counted[stage].add(key)
+        self.saved_calls[stage] += 1
+        self._pending_calls[stage] += 1
+
+    def report(self) -> Dict[str, int]:
+        """
+        获取学习者的统计
+
+        Returns:
+            Dict[str, int]: 已掌握词数和各阶段累计节省的调用次数
+        """
+        report = {"known_words": len(self.words)}
+        report.update({f"{stage}_calls_saved": count for stage, count in self.saved_calls.items()})
+        return report
+
+    def save(self, lock=None):
+        """
+        保存到文件。先读取文件中的最新内容再合并本进程的增量，多个进程共用同一学习者时传入lock
+
+        Args:
+            lock: 可选的进程锁
+        """
+        if not self._pending_words and not any(self._pending_calls.values()) and os.path.exists(self.file_path):
+            return
+        with lock or nullcontext():
+            try:
+                data = self._read()
+                words = set(data.get("words", [])) | self.words
+                calls = {stage: data.get("calls_saved", {}).get(stage, 0) + self._pending_calls[stage]
+                         for stage in STAGES}
+                os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+                tmp_path = self.file_path + ".tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({"learner_id": self.learner_id, "words": sorted(words), "calls_saved": calls},
+                              f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.file_path)
+                self.words = words
+                self.saved_calls = calls
+                self._pending_words.clear()
+                self._pending_calls = {stage: 0 for stage in STAGES}
+            except Exception as e:
+                print(f"❌ 保存已掌握词汇失败: {e}")
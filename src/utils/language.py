@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基于字符区间直方图的快速语言检测
+只统计字母类字符落在哪些Unicode区间，不依赖模型或外部数据；
+纯ASCII文本直接判定为英语
+"""
+
+from typing import Dict
+
+ENGLISH = "English"
+CHINESE = "Chinese"
+JAPANESE = "Japanese"
+KOREAN = "Korean"
+
+# 统计的字符区间：(起始, 结束, 类别)
+_RANGES = (
+    (0x3040, 0x30FF, "kana"),        # 平假名、片假名
+    (0x3400, 0x4DBF, "han"),         # CJK扩展A
+    (0x4E00, 0x9FFF, "han"),         # CJK统一汉字
+    (0xF900, 0xFAFF, "han"),         # CJK兼容汉字
+    (0xAC00, 0xD7AF, "hangul"),      # 韩文音节
+    (0x1100, 0x11FF, "hangul"),      # 韩文字母
+)
+# 只看文本开头的这些字符，长文本不必全部扫描
+_SAMPLE_SIZE = 2000
+
+
+def char_histogram(text: str) -> Dict[str, int]:
+    """
+    统计文本中各类字符的数量
+
+    Args:
+        text: 输入文本
+
+    Returns:
+        Dict[str, int]: 类别 -> 数量（latin、han、kana、hangul、other）
+    """
+    histogram = {"latin": 0, "han": 0, "kana": 0, "hangul": 0, "other": 0}
+    for ch in text[:_SAMPLE_SIZE]:
+        code = ord(ch)
+        if code < 0x80:
+            if ch.isalpha():
+                histogram["latin"] += 1
+            continue
+        if not ch.isalpha():
+            continue
+        for start, end, name in _RANGES:
+            if start <= code <= end:
+                histogram[name] += 1
+                break
+        else:
+            histogram["latin" if code < 0x250 else "other"] += 1
+    return histogram
+
+
+def detect_language(text: str) -> str:
+    """
+    检测文本的语言
+
+    Args:
+        text: 输入文本
+
+    Returns:
+        str: 语言名称（English、Chinese、Japanese、Korean），无法判断时返回English
+    """
+    if not text or text.isascii():
+        return ENGLISH
+    histogram = char_histogram(text)
+    cjk = histogram["han"] + histogram["kana"]
+    if histogram["hangul"] > max(cjk, histogram["latin"]):
+        return KOREAN
+    if cjk > histogram["latin"]:
+        # 日语汉字与中文共用区间，按假名比例区分：假名至少占十分之一为日语
+        # （中文里偶尔夹杂的假名，如“の”，不改变判断）
+        return JAPANESE if histogram["kana"] * 10 >= cjk else CHINESE
+    return ENGLISH
+
+
+def is_cjk_language(language: str) -> bool:
+    """是否为需要分词（词间无空格）的语言"""
+    return language in (CHINESE, JAPANESE)
+
+
+def has_pos_tagger(language: str) -> bool:
+    """是否有可用的POS标注和lemma（NLTK标注器和WordNet只适用于英语；其他语言即使按空格分词也不标注）"""
+    return language == ENGLISH
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lemma服务
+进程内单例，优先查预编译词典，其次复用同一个WordNetLemmatizer，并以 (词形, 粗粒度词性) 为键缓存结果
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .get_lemma import get_wordnet_pos, penn_to_wordnet_pos
+from .canonical import canonicalize_token
+from .lexicon import Lexicon, get_default_lexicon
+from .nltk_resources import NLTKResourceMissingError, require_nltk_resource
+
+
+class LemmaService:
+    """
+    带有限缓存的lemma服务
+
+    - 线程安全：缓存读写由锁保护
+    - 进程安全：每个进程持有独立实例，fork后子进程自动重建，不共享父进程的锁
+    - 缓存容量有限，按LRU淘汰
+    """
+
+    _instance: Optional["LemmaService"] = None
+    _instance_pid: Optional[int] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_size: int = 100000, lexicon: Optional[Lexicon] = None):
+        """
+        初始化lemma服务
+
+        Args:
+            max_size: 缓存的最大条目数
+            lexicon: 预编译词典（可选）；词典中的词不再调用WordNet
+        """
+        self.max_size = max_size
+        self.lexicon = lexicon
+        self._cache: "OrderedDict[Tuple[str, Optional[str]], Optional[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._lemmatizer = None
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def instance(cls) -> "LemmaService":
+        """获取当前进程的单例"""
+        pid = os.getpid()
+        if cls._instance is None or cls._instance_pid != pid:
+            with cls._instance_lock:
+                if cls._instance is None or cls._instance_pid != pid:
+                    cls._instance = cls(lexicon=get_default_lexicon())
+                    cls._instance_pid = pid
+        return cls._instance
+
+    @classmethod
+    def _reset_after_fork(cls):
+        """fork后在子进程中丢弃继承来的实例和锁"""
+        cls._instance = None
+        cls._instance_pid = None
+        cls._instance_lock = threading.Lock()
+
+    def _get_lemmatizer(self):
+        """首次使用时创建WordNetLemmatizer"""
+        if self._lemmatizer is None:
+            require_nltk_resource("wordnet")
+            from nltk.stem import WordNetLemmatizer
+            self._lemmatizer = WordNetLemmatizer()
+        return self._lemmatizer
+
+    @staticmethod
+    def _clean(form: str) -> Optional[str]:
+        """清理token（规范化后作为缓存键）；只处理纯字母的词"""
+        if not form:
+            return None
+        clean = canonicalize_token(form)
+        if not clean.isalpha():
+            return None
+        return clean
+
+    def lemmatize(self, form: str, pos_tag: Optional[str] = None) -> Optional[str]:
+        """
+        获取单个词形的lemma
+
+        Args:
+            form: 词形（token_body）
+            pos_tag: Penn Treebank词性标签；为None时单独调用tagger
+
+        Returns:
+            Optional[str]: lemma形式，无法获取时返回None
+
+        Raises:
+            NLTKResourceMissingError: 缺少WordNet或tagger数据
+        """
+        clean = self._clean(form)
+        if clean is None:
+            return None
+        coarse_pos = penn_to_wordnet_pos(pos_tag) if pos_tag else None
+        key = (clean, coarse_pos)
+
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            self.misses += 1
+
+        try:
+            lemma = self.lexicon.lemma(clean, coarse_pos) if self.lexicon is not None else None
+            if lemma is None:
+                pos = coarse_pos or get_wordnet_pos(clean)
+                lemma = self._get_lemmatizer().lemmatize(clean, pos)
+        except NLTKResourceMissingError:
+            raise
+        except Exception:
+            # 其他错误不写入缓存，返回None
+            return None
+
+        with self._lock:
+            self._cache[key] = lemma
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return lemma
+
+    def lemmatize_many(self, forms: Sequence[str], pos_tags: Optional[Sequence[Optional[str]]] = None) -> List[Optional[str]]:
+        """
+        批量获取lemma，同一批中重复的 (词形, 词性) 只计算一次
+
+        Args:
+            forms: 词形列表
+            pos_tags: 与forms对应的Penn Treebank词性标签列表（可选）
+
+        Returns:
+            List[Optional[str]]: 与forms一一对应的lemma
+        """
+        if pos_tags is None:
+            pos_tags = [None] * len(forms)
+        seen: Dict[Tuple[str, Optional[str]], Optional[str]] = {}
+        lemmas = []
+        for form, pos_tag in zip(forms, pos_tags):
+            key = (form, pos_tag)
+            if key not in seen:
+                seen[key] = self.lemmatize(form, pos_tag)
+            lemmas.append(seen[key])
+        return lemmas
+
+    def snapshot(self) -> Dict[Tuple[str, Optional[str]], Optional[str]]:
+        """
+        复制当前缓存内容（用于发布给工作进程）
+
+        Returns:
+            Dict: (词形, 粗粒度词性) -> lemma
+        """
+        with self._lock:
+            return dict(self._cache)
+
+    def preload(self) -> bool:
+        """
+        预加载WordNet和tagger模型。在fork工作进程前于父进程中调用，
+        子进程通过写时复制共享这些页面，而不是各自加载一份
+
+        Returns:
+            bool: 是否加载成功（缺少NLTK数据时返回False）
+        """
+        try:
+            self._get_lemmatizer()
+            require_nltk_resource("tagger")
+            import nltk
+            from nltk.corpus import wordnet
+            wordnet.ensure_loaded()
+            nltk.pos_tag(["preload"])
+            return True
+        except NLTKResourceMissingError:
+            return False
+
+    def stats(self) -> Dict[str, float]:
+        """
+        缓存统计信息
+
+        Returns:
+            Dict[str, float]: hits、misses、hit_rate、size、max_size
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._cache),
+                "max_size": self.max_size
+            }
+
+    def clear(self):
+        """清空缓存和统计"""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=LemmaService._reset_after_fork)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+NLTK资源检查
+首次使用时才导入NLTK并检查数据；缺少数据时抛出明确的离线错误，不会自动联网下载
+"""
+
+import threading
+from typing import Dict, Tuple
+
+# 资源名 -> (候选数据路径, nltk.download使用的包名)
+# 新版NLTK的英文tagger名为 averaged_perceptron_tagger_eng
+NLTK_RESOURCES: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "wordnet": (("corpora/wordnet",), ("wordnet",)),
+    "tagger": (
+        ("taggers/averaged_perceptron_tagger_eng", "taggers/averaged_perceptron_tagger"),
+        ("averaged_perceptron_tagger_eng", "averaged_perceptron_tagger"),
+    ),
+}
+
+_checked = set()
+_lock = threading.Lock()
+
+
+class NLTKResourceMissingError(LookupError):
+    """所需的NLTK数据未安装（离线模式下不会自动下载）"""
+
+    def __init__(self, resource: str):
+        self.resource = resource
+        packages = " ".join(NLTK_RESOURCES.get(resource, ((), (resource,)))[1])
+        super().__init__(
+            f"缺少NLTK资源 '{resource}'，离线模式下不会自动下载。"
+            f"请在联网环境中运行: python -m nltk.downloader {packages}"
+            f"（或调用 src.utils.nltk_resources.download_nltk_data()），"
+            f"也可以通过 NLTK_DATA 环境变量指定已有的数据目录。"
+        )
+
+
+def require_nltk_resource(resource: str):
+    """
+    确认NLTK资源可用，每个进程只检查一次
+
+    Args:
+        resource: 资源名（"wordnet" 或 "tagger"）
+
+    Raises:
+        NLTKResourceMissingError: 资源未安装
+    """
+    if resource in _checked:
+        return
+    with _lock:
+        if resource in _checked:
+            return
+        import nltk
+        paths, _ = NLTK_RESOURCES[resource]
+        for path in paths:
+            try:
+                nltk.data.find(path)
+                break
+            except LookupError:
+                continue
+        else:
+            raise NLTKResourceMissingError(resource)
+        _checked.add(resource)
+
+
+def download_nltk_data(quiet: bool = True):
+    """
+    显式下载所需的NLTK数据（需要联网，仅在安装/部署时调用）
+
+    Args:
+        quiet: 是否静默下载
+    """
+    import nltk
+    for resource, (_, packages) in NLTK_RESOURCES.items():
+        for package in packages:
+            print(f"正在下载NLTK数据: {package}...")
+            nltk.download(package, quiet=quiet)
+    with _lock:
+        _checked.clear()
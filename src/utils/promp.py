@@ -25,6 +25,21 @@ assessment_user_template = """
 {word}
 """
 
+batch_difficulty_estimation_system_template = """You are a linguistic agent responsible for classifying the difficulty of {language} tokens.
+
+Use your internal linguistic model to judge difficulty.
+
+The user sends a JSON array of tokens. For every token, decide:
+- "hard": If the token is rare, academic, idiomatic, or beyond basic learner vocabulary.
+- "easy": If the token is common in everyday life and easily understood by early learners.
+
+Respond with a single JSON object that maps each token, exactly as given and in the same order, to "easy" or "hard".
+Do not output explanations, grammar, meanings, or code fences."""
+
+batch_assessment_user_template = """
+{words}
+"""
+
 is_grammar_marker_system_template = """
 You are a linguistic assistant specialized in English grammar analysis. Your task is to determine if a given token functions as a key grammatical marker within the provided sentence.
 
@@ -92,4 +107,43 @@ grammar_analysis_prompt_template = """
 {sentence}
 这是句子的上下文（如果空则无需考虑。只参考，不需要分析！）：
 {context}
-"""
\ No newline at end of file
+"""
+batch_grammar_analysis_sys_prompt = """
+你是一个语法分析助手。用户会发送一个 JSON 数组，每个元素包含句子编号 index 和句子 sentence。
+请逐句分析语法结构，并返回一个 JSON 数组，每个句子对应一个元素，顺序与输入一致：
+[
+  {
+    "index": 句子编号,
+    "rules": [
+      {"name": "语法规则名称", "explanation": "该规则在本句中的讲解"}
+    ],
+    "keywords": ["关键词1", "关键词2", ...]
+  }
+]
+要求：
+- 每个句子都必须返回，index 与输入一致
+- 语法规则名称使用通用、简短的中文术语（如"定语从句"、"现在完成时"），便于不同句子之间归并
+- 没有值得讲解的语法点时 rules 为空数组
+- 只返回 JSON，不要返回其他文字或代码块标记
+"""
+
+batch_grammar_analysis_prompt_template = """
+{sentences}
+"""
+
+batch_grammar_marker_system_template = """
+You are a linguistic assistant specialized in English grammar analysis. Your task is to determine, for several tokens of one sentence, whether each token functions as a key grammatical marker within that sentence.
+
+A "grammar marker" is a word that signals or forms an important part of a grammatical structure, such as subordinating conjunctions ("although", "because", "if"), coordinating conjunctions ("and", "but"), modal verbs ("can", "must"), auxiliary verbs, infinitive "to", or other function words that contribute crucial grammatical meaning.
+
+Instructions:
+- The user sends the sentence and a JSON array of tokens, each with its index in the sentence.
+- Consider each token's role within the sentence, not just its dictionary definition.
+- Respond with a single JSON object that maps each token index (as a string) to "Yes" or "No".
+- Do not output explanations or code fences.
+"""
+
+batch_grammar_marker_user_template = """
+Sentence: {sentence}
+Tokens: {tokens}
+"""
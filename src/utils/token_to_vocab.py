@@ -8,8 +8,9 @@ Token to Vocab 转换模块
 
 import json
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Union
 from ..core.token_data import Token, VocabExpression, VocabExpressionExample
+from .canonical import canonicalize_token
 
 class TokenToVocabConverter:
     """Token到Vocab转换器"""
@@ -23,6 +24,8 @@ class TokenToVocabConverter:
         """
         self.vocab_data_file = vocab_data_file
         self.vocab_counter = self._load_vocab_counter()
+        # 词汇解释缓存，键为规范化后的token（弯/直撇号、大小写、所有格等不再区分）
+        self.explanation_cache: Dict[str, str] = {}
         
     def _load_vocab_counter(self) -> int:
         """加载vocab计数器"""
@@ -87,47 +90,118 @@ class TokenToVocabConverter:
             vocab_explanation_assistant = VocabExplanationAssistant()
             vocab_example_assistant = VocabExampleExplanationAssistant()
             
-            # 获取词汇解释
-            vocab_explanation_result = vocab_explanation_assistant.run(temp_sentence, token.token_body)
+            # 获取词汇解释（同一规范形式只请求一次）
+            explanation_key = canonicalize_token(token.token_body)
+            explanation = self.explanation_cache.get(explanation_key)
+            if explanation is None:
+                vocab_explanation_result = vocab_explanation_assistant.run(temp_sentence, token.token_body)
+                explanation = self._parse_explanation(vocab_explanation_result)
+                if explanation:
+                    self.explanation_cache[explanation_key] = explanation
             
-            # 获取上下文解释
+            # 获取上下文解释（与句子相关，不缓存）
             context_explanation_result = vocab_example_assistant.run(token.token_body, temp_sentence)
-            
-            # 解析解释结果
-            explanation = self._parse_explanation(vocab_explanation_result)
             context_explanation = self._parse_context_explanation(context_explanation_result)
             
-            # 创建VocabExpression对象
-            vocab_expression = VocabExpression(
-                vocab_id=self.vocab_counter,
-                vocab_body=token.token_body,
-                explanation=explanation,
-                source="auto",
-                is_starred=False,
-                examples=[]
-            )
-            
-            # 创建VocabExpressionExample
-            if context_explanation:
-                vocab_example = VocabExpressionExample(
-                    vocab_id=self.vocab_counter,
-                    text_id=text_id,
-                    sentence_id=sentence_id,
-                    context_explanation=context_explanation,
-                    token_indices=[token.sentence_token_id] if token.sentence_token_id else []
-                )
-                vocab_expression.examples.append(vocab_example)
-            
-            # 更新计数器
-            self.vocab_counter += 1
-            self._save_vocab_counter()
-            
-            return vocab_expression
+            return self._create_vocab_expression(token, explanation, context_explanation, text_id, sentence_id)
             
         except Exception as e:
             print(f"转换token '{token.token_body}' 到vocab失败: {e}")
             return None
     
+    def stream_token_to_vocab(self, token: Token, sentence_body: str, text_id: int, sentence_id: int,
+                              handle=None) -> Iterator[Union[str, VocabExpression]]:
+        """
+        流式生成token的词汇解释，供阅读界面按需调用
+        
+        解释文本一生成就逐段产出；全部产出后再获取上下文解释，
+        创建VocabExpression并保存到vocab数据文件，同时更新token.linked_vocab_id，
+        最后产出创建的VocabExpression（直接用for循环即可取得）。
+        流中没有得到解释时不创建也不保存，也不产出VocabExpression。
+        
+        Args:
+            token: Token对象
+            sentence_body: 句子内容
+            text_id: 文本ID
+            sentence_id: 句子ID
+            handle: 可选的ProcessingHandle
+            
+        Yields:
+            str | VocabExpression: 解释文本片段，最后一项为创建的VocabExpression
+        """
+        if not (token.token_type == "text" and token.difficulty_level == "hard"):
+            return None
+        
+        from ..agents import VocabExplanationAssistant, VocabExampleExplanationAssistant
+        from ..core.token_data import Sentence
+        temp_sentence = Sentence(
+            text_id=text_id,
+            sentence_id=sentence_id,
+            sentence_body=sentence_body,
+            grammar_annotations=[],
+            vocab_annotations=[],
+            tokens=[]
+        )
+        
+        explanation_key = canonicalize_token(token.token_body)
+        explanation = self.explanation_cache.get(explanation_key)
+        if explanation is not None:
+            # 已有解释时直接整段产出
+            yield explanation
+        else:
+            pieces = []
+            for piece in VocabExplanationAssistant().stream_explanation(temp_sentence, token.token_body, handle=handle):
+                pieces.append(piece)
+                yield piece
+            explanation = "".join(pieces)
+            if not explanation:
+                # 流中没有得到解释时不创建也不保存vocab
+                print(f"未得到 '{token.token_body}' 的解释，跳过创建vocab")
+                return None
+            self.explanation_cache[explanation_key] = explanation
+        
+        try:
+            context_explanation_result = VocabExampleExplanationAssistant().run(token.token_body, temp_sentence, handle=handle)
+            context_explanation = self._parse_context_explanation(context_explanation_result)
+        except Exception as e:
+            print(f"获取 '{token.token_body}' 的上下文解释失败: {e}")
+            context_explanation = ""
+        
+        vocab_expression = self._create_vocab_expression(token, explanation, context_explanation, text_id, sentence_id)
+        token.linked_vocab_id = vocab_expression.vocab_id
+        self.save_vocab_data([vocab_expression])
+        yield vocab_expression
+    
+    def _create_vocab_expression(self, token: Token, explanation: str, context_explanation: str,
+                                 text_id: int, sentence_id: int) -> VocabExpression:
+        """根据解释结果创建VocabExpression并更新计数器"""
+        # 创建VocabExpression对象
+        vocab_expression = VocabExpression(
+            vocab_id=self.vocab_counter,
+            vocab_body=token.token_body,
+            explanation=explanation,
+            source="auto",
+            is_starred=False,
+            examples=[]
+        )
+        
+        # 创建VocabExpressionExample
+        if context_explanation:
+            vocab_example = VocabExpressionExample(
+                vocab_id=self.vocab_counter,
+                text_id=text_id,
+                sentence_id=sentence_id,
+                context_explanation=context_explanation,
+                token_indices=[token.sentence_token_id] if token.sentence_token_id else []
+            )
+            vocab_expression.examples.append(vocab_example)
+        
+        # 更新计数器
+        self.vocab_counter += 1
+        self._save_vocab_counter()
+        
+        return vocab_expression
+    
     def _parse_explanation(self, result: Any) -> str:
         """解析词汇解释结果"""
         if isinstance(result, dict):
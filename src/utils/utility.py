@@ -1,6 +1,7 @@
 import json
 import re
 import ast
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
 
 
 def parse_json_from_text(text):
@@ -41,3 +42,343 @@ result = parse_json_from_text(test_string)
 print(result)
 print(type(result))
     """
+
+
+def _decode_json_fragment(fragment: str) -> Any:
+    """解析单个JSON片段，失败时按Python字面量解析（兼容单引号输出）"""
+    try:
+        return json.loads(fragment)
+    except json.JSONDecodeError:
+        try:
+            return ast.literal_eval(fragment)
+        except Exception:
+            return fragment.strip()
+
+
+class IncrementalJSONParser:
+    """
+    增量JSON解析器
+
+    用于流式输出的批量结果：顶层为JSON数组或对象时，每当一个数组元素
+    或一个键值对完整到达，就立即返回 (索引或键, 值)，无需等待整个回复结束。
+    顶层容器之前的多余内容（如 ```json 代码块标记）会被忽略。
+    """
+
+    _CLOSERS = {"[": "]", "{": "}"}
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._container: Optional[str] = None
+        self._expect = "value"      # 对象中依次为 key -> colon -> value
+        self._index = 0
+        self._key: Any = None
+        self._done = False
+        # 当前片段的可恢复扫描状态
+        self._scan_end = None
+        self._depth = 0
+        self._quote: Optional[str] = None
+        self._escape = False
+
+    @property
+    def done(self) -> bool:
+        """顶层容器是否已经闭合"""
+        return self._done
+
+    def feed(self, chunk: str) -> List[Tuple[Any, Any]]:
+        """
+        输入一段新文本
+
+        Args:
+            chunk: 流式输出的增量文本
+
+        Returns:
+            List[Tuple[Any, Any]]: 本次新完成的 (索引或键, 值) 列表
+        """
+        if self._done or not chunk:
+            return []
+        self._buf += chunk
+        return self._drain(final=False)
+
+    def close(self) -> List[Tuple[Any, Any]]:
+        """输入结束，返回缓冲区中剩余的完整条目"""
+        if self._done:
+            return []
+        return self._drain(final=True)
+
+    def _reset_scan(self):
+        self._scan_end = None
+        self._depth = 0
+        self._quote = None
+        self._escape = False
+
+    def _scan_fragment(self, start: int, final: bool) -> Optional[int]:
+        """从start开始扫描一个完整的值，返回结束位置；不完整时返回None"""
+        buf = self._buf
+        i = self._scan_end if self._scan_end is not None else start
+        if i == start:
+            first = buf[start]
+            if first in "\"'":
+                self._quote = first
+                i += 1
+            elif first in "[{":
+                self._depth = 1
+                i += 1
+        n = len(buf)
+        while i < n:
+            c = buf[i]
+            if self._quote is not None:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == self._quote:
+                    self._quote = None
+                    if self._depth == 0:
+                        self._reset_scan()
+                        return i + 1
+            elif self._depth > 0:
+                if c in "\"'":
+                    self._quote = c
+                elif c in "[{":
+                    self._depth += 1
+                elif c in "]}":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._reset_scan()
+                        return i + 1
+            elif c in ",]}:" or c.isspace():
+                # 标量（数字、true/false/null）遇到分隔符才算完整
+                self._reset_scan()
+                return i
+            i += 1
+        self._scan_end = i
+        if final and self._quote is None and self._depth == 0:
+            self._reset_scan()
+            return n
+        return None
+
+    def _drain(self, final: bool) -> List[Tuple[Any, Any]]:
+        items = []
+        buf = self._buf
+        if self._container is None:
+            match = re.search(r"[\[{]", buf)
+            if match is None:
+                self._buf = ""
+                return items
+            self._container = match.group(0)
+            self._expect = "key" if self._container == "{" else "value"
+            self._pos = match.end()
+
+        closer = self._CLOSERS[self._container]
+        while True:
+            buf = self._buf
+            pos = self._pos
+            if self._scan_end is None:
+                while pos < len(buf) and (buf[pos].isspace() or (buf[pos] == "," and self._expect != "colon")):
+                    pos += 1
+                self._pos = pos
+            if pos >= len(buf):
+                break
+            c = buf[pos]
+            if self._scan_end is None and c == closer and self._expect != "colon":
+                self._done = True
+                break
+            if self._expect == "colon":
+                if c != ":":
+                    # 格式异常：跳过该字符继续
+                    self._pos = pos + 1
+                    continue
+                self._pos = pos + 1
+                self._expect = "value"
+                continue
+            if self._expect == "key" and c == "{" and self._index == 0 and self._key is None and self._scan_end is None:
+                # 兼容 {{ ... }} 包裹形式
+                self._pos = pos + 1
+                continue
+            end = self._scan_fragment(pos, final)
+            if end is None:
+                break
+            if end == pos:
+                # 不应出现的分隔符：跳过
+                self._pos = pos + 1
+                continue
+            value = _decode_json_fragment(buf[pos:end])
+            self._pos = end
+            if self._expect == "key":
+                self._key = value
+                self._expect = "colon"
+            elif self._container == "{":
+                items.append((self._key, value))
+                self._key = None
+                self._index += 1
+                self._expect = "key"
+            else:
+                items.append((self._index, value))
+                self._index += 1
+            # 丢弃已处理的部分，缓冲区只保留未完成的条目
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        return items
+
+
+def iter_json_items(chunks: Iterable[str]) -> Iterator[Tuple[Any, Any]]:
+    """
+    从流式文本中逐个产出顶层JSON数组元素或对象键值对
+
+    Args:
+        chunks: 流式输出的文本片段
+
+    Yields:
+        Tuple[Any, Any]: 数组为 (索引, 元素)，对象为 (键, 值)
+    """
+    parser = IncrementalJSONParser()
+    for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+        if parser.done:
+            return
+    for item in parser.close():
+        yield item
+
+
+def _safe_escape_prefix(raw: str) -> int:
+    """返回raw中可以安全解码的前缀长度（不截断转义序列和代理对）"""
+    i = 0
+    n = len(raw)
+    safe = 0
+    while i < n:
+        if raw[i] != "\\":
+            i += 1
+            safe = i
+            continue
+        if i + 1 >= n:
+            break
+        if raw[i + 1] != "u":
+            i += 2
+            safe = i
+            continue
+        if i + 6 > n:
+            break
+        code = raw[i + 2:i + 6]
+        if code[0] in "dD" and code[1] in "89abAB":
+            # 高位代理需要与随后的低位代理一起解码
+            if i + 12 > n:
+                break
+            i += 12
+        else:
+            i += 6
+        safe = i
+    return safe
+
+
+def iter_json_string_field(chunks: Iterable[str], field: str = "explanation") -> Iterator[str]:
+    """
+    从流式输出的JSON对象中，逐段产出指定字符串字段的解码内容
+
+    例如模型输出 {"explanation": "..."} 时，解释文本在生成过程中即可逐段显示。
+    如果输出不是JSON对象（首个非空字符不是"{"），则原样产出文本。
+
+    Args:
+        chunks: 流式输出的文本片段
+        field: 字段名
+
+    Yields:
+        str: 字段值的解码片段
+    """
+    key_pattern = re.compile(r"""(["'])""" + re.escape(field) + r"""\1\s*:\s*(["'])""")
+    buf = ""
+    mode = "detect"      # detect -> seek -> value -> done
+    quote = '"'
+    for chunk in chunks:
+        if mode == "done":
+            continue
+        buf += chunk
+        if mode == "detect":
+            stripped = buf.lstrip()
+            if not stripped:
+                continue
+            if "```".startswith(stripped):
+                continue
+            if stripped.startswith("```"):
+                # 去掉代码块标记后再判断
+                newline = stripped.find("\n")
+                if newline == -1:
+                    continue
+                buf = stripped[newline + 1:]
+                stripped = buf.lstrip()
+                if not stripped:
+                    continue
+            if stripped[0] != "{":
+                mode = "raw"
+            else:
+                mode = "seek"
+        if mode == "raw":
+            yield buf
+            buf = ""
+            continue
+        if mode == "seek":
+            match = key_pattern.search(buf)
+            if match is None:
+                continue
+            quote = match.group(2)
+            buf = buf[match.end():]
+            mode = "value"
+        if mode == "value":
+            end = _find_closing_quote(buf, quote)
+            raw = buf if end is None else buf[:end]
+            safe = len(raw) if end is not None else _safe_escape_prefix(raw)
+            if safe:
+                text = _decode_string_body(raw[:safe], quote)
+                if text:
+                    yield text
+            buf = raw[safe:]
+            if end is not None:
+                mode = "done"
+    if mode == "detect" and buf.strip():
+        yield buf
+
+
+def _find_closing_quote(buf: str, quote: str) -> Optional[int]:
+    """查找未转义的结束引号位置"""
+    escape = False
+    for i, c in enumerate(buf):
+        if escape:
+            escape = False
+        elif c == "\\":
+            escape = True
+        elif c == quote:
+            return i
+    return None
+
+
+def _decode_string_body(raw: str, quote: str) -> str:
+    """解码字符串字面量内部（不含引号）的内容"""
+    try:
+        if quote == '"':
+            return json.loads('"' + raw + '"')
+        return ast.literal_eval("'" + raw + "'")
+    except Exception:
+        return raw
+
+
+def get_memory_usage_kb() -> dict:
+    """
+    读取当前进程的内存占用（KB）
+
+    Returns:
+        dict: rss（常驻内存）、anon（私有匿名页）、file（文件映射页）、shmem（共享内存页）；
+              非Linux系统只提供rss（峰值）
+    """
+    fields = {"VmRSS:": "rss", "RssAnon:": "anon", "RssFile:": "file", "RssShmem:": "shmem"}
+    usage = {}
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                parts = line.split()
+                if parts and parts[0] in fields:
+                    usage[fields[parts[0]]] = int(parts[1])
+    except OSError:
+        import resource
+        usage["rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage